@@ -15,21 +15,32 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import signal
 import sys
+import time
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import click
 from pydantic import ValidationError
 
 from discogs_alert import (
     __version__,
+    channels as da_channels,
     client as da_client,
     config as da_config,
+    coordinator as da_coordinator,
+    digest as da_digest,
     entities as da_entities,
     loop as da_loop,
+    outbox as da_outbox,
+    scheduler as da_scheduler,
+    state as da_state,
+    tenants as da_tenants,
+    workqueue as da_workqueue,
 )
-from discogs_alert.util import constants as dac
+from discogs_alert.alert import Alerter, get_alerter, reload_alerters
+from discogs_alert.util import constants as dac, currency as da_currency
 
 logger = logging.getLogger(__name__)
 
@@ -62,26 +73,10 @@ def _build_loop_kwargs(cfg: da_config.Config) -> dict:
     """Translate the validated Config into the kwargs that ``loop.loop`` accepts."""
 
     alerter_type = cfg.alerter.type.upper()
-    alerter_kwargs: dict = {}
-    if alerter_type == "PUSHBULLET":
-        alerter_kwargs = {"pushbullet_token": cfg.alerter.pushbullet.token}
-    elif alerter_type == "TELEGRAM":
-        alerter_kwargs = {
-            "telegram_token": cfg.alerter.telegram.token,
-            "telegram_chat_id": cfg.alerter.telegram.chat_id,
-        }
-    elif alerter_type == "NTFY":
-        alerter_kwargs = {
-            "ntfy_topic": cfg.alerter.ntfy.topic,
-            "ntfy_server": cfg.alerter.ntfy.server,
-            "ntfy_token": cfg.alerter.ntfy.token,
-        }
-    elif alerter_type == "GMAIL":
-        alerter_kwargs = {
-            "gmail_user": cfg.alerter.gmail.user,
-            "gmail_app_password": cfg.alerter.gmail.app_password,
-            "gmail_to": cfg.alerter.gmail.to,
-        }
+    alert_channels = [
+        da_channels.ChannelSpec(c.key, c.type.upper(), cfg.alerter.kwargs_for(c.type), c.max_price_ratio)
+        for c in cfg.alerter.channels
+    ]
 
     return dict(
         discogs_token=cfg.discogs_token,
@@ -101,11 +96,24 @@ def _build_loop_kwargs(cfg: da_config.Config) -> dict:
         country_whitelist=set(dac.COUNTRIES[c] for c in cfg.country_filters.whitelist),
         country_blacklist=set(dac.COUNTRIES[c] for c in cfg.country_filters.blacklist),
         alerter_type=alerter_type,
-        alerter_kwargs=alerter_kwargs,
+        alerter_kwargs=cfg.alerter.kwargs_for(alerter_type),
+        alert_channels=alert_channels,
         state_path=cfg.runtime.state_path,
         use_stats_gate=cfg.runtime.stats_gate,
         max_concurrency=cfg.runtime.max_concurrency,
         prune_after_days=cfg.runtime.prune_after_days,
+        parser_backend=cfg.runtime.parser,
+        parse_workers=cfg.runtime.parse_workers,
+        parse_executor=cfg.runtime.parse_executor,
+        api_requests_per_minute=cfg.runtime.api_requests_per_minute,
+        scrape_requests_per_minute=cfg.runtime.scrape_requests_per_minute,
+        stats_ttl=cfg.runtime.stats_ttl,
+        stats_dormant_ttl=cfg.runtime.stats_dormant_ttl,
+        alert_workers=cfg.runtime.alert_workers,
+        alert_queue_size=cfg.runtime.alert_queue_size,
+        alert_max_attempts=cfg.runtime.alert_max_attempts,
+        digest_mode=cfg.runtime.digest,
+        digest_window=cfg.runtime.digest_window,
         verbose=cfg.runtime.verbose,
     )
 
@@ -114,13 +122,14 @@ def _build_loop_kwargs(cfg: da_config.Config) -> dict:
 @click.option(
     "-c",
     "--config",
-    "config_path",
-    default=None,
+    "config_paths",
+    multiple=True,
     type=click.Path(dir_okay=False, file_okay=True, path_type=Path),
     envvar="DA_CONFIG_PATH",
     help=(
         "Path to a TOML config file. Defaults to ~/.discogs_alert/config.toml. "
-        "See examples/config.example.toml for the schema."
+        "See examples/config.example.toml for the schema. Repeat to serve "
+        "several users from one process, one config each."
     ),
 )
 @click.option(
@@ -151,6 +160,17 @@ def _build_loop_kwargs(cfg: da_config.Config) -> dict:
     type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
     help="Override the root log level.",
 )
+@click.option(
+    "--role",
+    default=None,
+    envvar="DA_ROLE",
+    type=click.Choice(da_workqueue.ROLES, case_sensitive=False),
+    help=(
+        "Override `runtime.role`: run everything here (standalone), only "
+        "schedule releases onto `runtime.work_queue` (coordinator), or only "
+        "check the releases queued there (worker)."
+    ),
+)
 @click.option(
     "--validate-config",
     is_flag=True,
@@ -163,10 +183,11 @@ def _build_loop_kwargs(cfg: da_config.Config) -> dict:
 )
 @click.version_option(__version__)
 def main(
-    config_path: Optional[Path],
+    config_paths: Tuple[Path, ...],
     once: bool,
     verbose: bool,
     log_level: Optional[str],
+    role: Optional[str],
     validate_config: bool,
     print_config: bool,
 ) -> None:
@@ -181,25 +202,38 @@ def main(
     """
 
     logging.basicConfig(level=logging.INFO)
-    cfg = _load_or_die(config_path)
+    cfgs = [_load_or_die(path) for path in config_paths] or [_load_or_die(None)]
 
     # Apply CLI overrides on top of the loaded config.
     if verbose:
-        cfg.runtime.verbose = True
+        for cfg in cfgs:
+            cfg.runtime.verbose = True
         if log_level is None:
             log_level = "DEBUG"
     if log_level is not None:
         logging.getLogger().setLevel(log_level.upper())
+    if role is not None:
+        for cfg in cfgs:
+            cfg.runtime.role = role.lower()
+    try:
+        _check_roles(cfgs)
+        if len(cfgs) > 1:
+            da_tenants.check_tenants(cfgs)
+    except ValueError as exc:
+        click.echo(f"Invalid config: {exc}", err=True)
+        sys.exit(2)
 
     if validate_config:
-        click.echo(f"Config valid. Alerter: {cfg.alerter.type}, frequency: {cfg.frequency}/h")
+        for cfg in cfgs:
+            click.echo(f"Config valid. Alerter: {cfg.alerter.type}, frequency: {cfg.frequency}/h")
         return
 
     if print_config:
-        click.echo(json.dumps(cfg.model_dump(), indent=2, default=str))
+        dumped = [cfg.model_dump() for cfg in cfgs]
+        click.echo(json.dumps(dumped[0] if len(dumped) == 1 else dumped, indent=2, default=str))
         return
 
-    loop_kwargs = _build_loop_kwargs(cfg)
+    all_loop_kwargs = [_build_loop_kwargs(cfg) for cfg in cfgs]
 
     logger.info(
         r"""
@@ -214,35 +248,356 @@ def main(
 """
     )
 
+    if len(cfgs) > 1:
+        asyncio.run(_run_tenants(list(zip(all_loop_kwargs, cfgs)), run_once=once))
+        return
+    [loop_kwargs], [cfg] = all_loop_kwargs, cfgs
     interval_seconds = max(1, int(3600 / cfg.frequency))
-    asyncio.run(_run(loop_kwargs, run_once=once, interval_seconds=interval_seconds, cfg=cfg))
+    work_queue = None
+    if cfg.runtime.role != "standalone":
+        work_queue = da_workqueue.open_work_queue(cfg.runtime.work_queue)
+    if cfg.runtime.role == "coordinator":
+        asyncio.run(_run_coordinator(loop_kwargs, once, interval_seconds, cfg, work_queue))
+        return
+    asyncio.run(_run(loop_kwargs, run_once=once, interval_seconds=interval_seconds, cfg=cfg, work_queue=work_queue))
+
+
+def _check_roles(cfgs: List[da_config.Config]) -> None:
+    """Raise ValueError unless every config's role can run as configured."""
+
+    for cfg in cfgs:
+        role = cfg.runtime.role
+        if role != "standalone" and not cfg.runtime.work_queue:
+            raise ValueError(f"runtime.role {role!r} needs runtime.work_queue")
+        if role != "standalone" and len(cfgs) > 1:
+            raise ValueError("serving several configs needs runtime.role 'standalone'")
+
+
+def _install_reload_handler(callback) -> bool:
+    """Call `callback` on SIGHUP, where the platform supports it."""
+
+    if not hasattr(signal, "SIGHUP"):
+        return False
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, callback)
+    except (NotImplementedError, RuntimeError, ValueError):
+        return False
+    return True
+
+
+def _reload_alerter(old: Alerter, loop_kwargs: dict) -> Alerter:
+    """Rediscover the alerter plugins and build a fresh, opened alerter to
+    replace `old`, which is closed. If the new one can't be built, `old` is
+    kept.
+    """
+
+    reload_alerters()
+    try:
+        new = get_alerter(loop_kwargs["alerter_type"], loop_kwargs["alerter_kwargs"])
+        new.open()
+    except Exception:
+        logger.exception("Reloading the alerter failed; keeping the current one")
+        return old
+    old.close()
+    logger.info("Reloaded alerter plugins")
+    return new
+
+
+def _reload_channels(old: List[da_channels.Channel], loop_kwargs: dict) -> List[da_channels.Channel]:
+    """Like `_reload_alerter`, for the extra alert channels (after the
+    registry has been reloaded). If any can't be built, `old` is kept.
+    """
+
+    try:
+        new = da_channels.open_channels(loop_kwargs.get("alert_channels", ()), get_alerter)
+    except Exception:
+        logger.exception("Reloading the alert channels failed; keeping the current ones")
+        return old
+    da_channels.close_channels(old)
+    return new
+
+
+def _start_retriers(state_path, alerter: Alerter, channels: List[da_channels.Channel]) -> List[asyncio.Task]:
+    """An outbox retrier for the main alerter and one per extra channel."""
+
+    return [da_outbox.start_retrier(state_path, alerter)] + [
+        da_outbox.start_retrier(state_path, channel.alerter, channel=channel.name) for channel in channels
+    ]
+
+
+class _Runner:
+    """What one config's loop keeps across iterations.
+
+    A single ``UserTokenClient`` so TLS handshakes amortize; with the adaptive
+    schedule on, a ``ReleaseScheduler``, and a ``DigestBuffer`` when the digest
+    window is longer than one iteration. When running continuously, one opened
+    alerter is shared by every iteration (keeping its connections alive
+    between alerts), and an outbox retrier task uses it to re-send alerts left
+    undelivered in the state DB (as does each extra alert channel).
+
+    A worker (see `da_workqueue`) checks the releases it claims from
+    `work_queue` instead of scheduling its own, and polls the queue again
+    straight away while it's finding work.
+
+    Currency rates come from one `RatesProvider`, so they're fetched at most
+    once an hour rather than once an iteration; tenants share theirs by
+    passing `rates_provider` (the runner then leaves closing it to them).
+    """
+
+    def __init__(
+        self,
+        loop_kwargs: dict,
+        run_once: bool,
+        interval_seconds: int,
+        cfg: da_config.Config,
+        work_queue: Optional[da_workqueue.WorkQueue] = None,
+        rates_provider: Optional[da_currency.RatesProvider] = None,
+    ) -> None:
+        self.loop_kwargs = loop_kwargs
+        self.run_once = run_once
+        self.interval_seconds = interval_seconds
+        self.cfg = cfg
+        self.work_queue = work_queue
+        self.checked = 0
+        self.user_token_client = da_client.UserTokenClient(
+            cfg.user_agent,
+            cfg.discogs_token,
+            cfg.runtime.api_requests_per_minute,
+            stats_ttl=cfg.runtime.stats_ttl,
+            stats_dormant_ttl=cfg.runtime.stats_dormant_ttl,
+        )
+        self.own_rates_provider = rates_provider is None
+        self.rates_provider = rates_provider or da_currency.RatesProvider()
+        self.scheduler = None
+        if cfg.runtime.adaptive_schedule and not run_once and work_queue is None:
+            self.scheduler = da_scheduler.ReleaseScheduler(
+                cfg.runtime.min_poll_interval, cfg.runtime.max_poll_interval
+            )
+        self.digest = None
+        if cfg.runtime.digest != "off" and cfg.runtime.digest_window > 0 and not run_once:
+            self.digest = da_digest.DigestBuffer(cfg.runtime.digest, cfg.runtime.digest_window)
+        self.alerter: Optional[Alerter] = None
+        self.channels: Optional[List[da_channels.Channel]] = None
+        self.retriers: List[asyncio.Task] = []
+
+    def open(self) -> None:
+        """Open the alerter and extra channels and start their retriers
+        (running continuously only; ``--once`` iterations open their own).
+
+        If they can't be opened, that's logged and each iteration tries to open
+        its own instead, as ``--once`` does, until a reload succeeds.
+        """
+
+        if self.run_once:
+            return
+        try:
+            self.alerter, self.channels = da_channels.open_alerters(
+                self.loop_kwargs["alerter_type"],
+                self.loop_kwargs["alerter_kwargs"],
+                self.loop_kwargs.get("alert_channels", ()),
+                get_alerter,
+            )
+        except Exception:
+            logger.exception("Opening the alerter failed; each iteration will open its own")
+            return
+        self.retriers = _start_retriers(self.cfg.runtime.state_path, self.alerter, self.channels)
+
+    async def iterate(self, client_anon) -> None:
+        """One loop iteration, scraping through `client_anon`."""
+
+        self.checked = await da_loop.loop(
+            **self.loop_kwargs,
+            user_token_client=self.user_token_client,
+            client_anon=client_anon,
+            scheduler=self.scheduler,
+            alerter=self.alerter,
+            digest=self.digest,
+            channels=self.channels,
+            work_queue=self.work_queue,
+            rates_provider=self.rates_provider,
+        )
+
+    def sleep_seconds(self) -> float:
+        if self.work_queue is not None:
+            return 0 if self.checked else da_workqueue.WORKER_POLL_SECONDS
+        return da_scheduler.sleep_seconds(self.interval_seconds, self.scheduler)
+
+    async def reload(self) -> None:
+        """Swap in a freshly built alerter and channels (see `_reload_alerter`),
+        or open them if `open` couldn't.
+        """
+
+        if self.alerter is None:
+            reload_alerters()
+            self.open()
+            return
+        await self._stop_retriers()
+        self.alerter = _reload_alerter(self.alerter, self.loop_kwargs)
+        self.channels = _reload_channels(self.channels, self.loop_kwargs)
+        self.retriers = _start_retriers(self.cfg.runtime.state_path, self.alerter, self.channels)
+
+    async def aclose(self) -> None:
+        await self._stop_retriers()
+        if self.channels:
+            da_channels.close_channels(self.channels)
+        if self.alerter is not None:
+            self.alerter.close()
+        await self.user_token_client.aclose()
+        if self.own_rates_provider:
+            await self.rates_provider.aclose()
+
+    async def _stop_retriers(self) -> None:
+        for retrier in self.retriers:
+            await da_outbox.stop_retrier(retrier)
+        self.retriers = []
 
 
 async def _run(
-    loop_kwargs: dict, run_once: bool, interval_seconds: int, cfg: da_config.Config
+    loop_kwargs: dict,
+    run_once: bool,
+    interval_seconds: int,
+    cfg: da_config.Config,
+    work_queue: Optional[da_workqueue.WorkQueue] = None,
 ) -> None:
-    """Drive the async loop. Holds a single ``UserTokenClient`` and ``AnonClient``
-    across all iterations so TLS handshakes amortize.
+    """Drive the async loop, holding a `_Runner` and a single ``AnonClient``
+    across all iterations.
+
+    With the adaptive schedule on, the loop wakes when the scheduler's next
+    release is due (at most ``interval_seconds`` apart) instead of re-checking
+    everything.
+
+    The alerter registry is cached for the life of the process. Send SIGHUP
+    after installing a new alerter plugin: before the next iteration, the
+    registry is rebuilt and the alerter replaced. (An upgraded plugin that's
+    already imported needs a restart.)
+
+    With a `work_queue` this process is a worker: each iteration checks the
+    releases it claims from the queue (see `da_workqueue`).
     """
 
-    user_token_client = da_client.UserTokenClient(cfg.user_agent, cfg.discogs_token)
-    anon_client = da_client.AnonClient(cfg.user_agent)
+    runner = _Runner(loop_kwargs, run_once, interval_seconds, cfg, work_queue)
+    anon_client = da_client.AnonClient(
+        cfg.user_agent,
+        parser_backend=cfg.runtime.parser,
+        parse_workers=cfg.runtime.parse_workers,
+        parse_executor=cfg.runtime.parse_executor,
+        requests_per_minute=cfg.runtime.scrape_requests_per_minute,
+    )
+    reload_requested = asyncio.Event()
+    reload_handler = False
     try:
-        await da_loop.loop(
-            **loop_kwargs,
-            user_token_client=user_token_client,
-            client_anon=anon_client,
-        )
+        runner.open()
+        if not run_once:
+            reload_handler = _install_reload_handler(reload_requested.set)
+        await runner.iterate(anon_client)
         while not run_once:
-            await asyncio.sleep(interval_seconds)
-            await da_loop.loop(
-                **loop_kwargs,
-                user_token_client=user_token_client,
-                client_anon=anon_client,
-            )
+            await asyncio.sleep(runner.sleep_seconds())
+            if reload_requested.is_set():
+                reload_requested.clear()
+                await runner.reload()
+            await runner.iterate(anon_client)
     finally:
+        if reload_handler:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        await runner.aclose()
         await anon_client.aclose()
+        if work_queue is not None:
+            work_queue.close()
+        da_state.close_shared_stores()
+
+
+async def _run_coordinator(
+    loop_kwargs: dict,
+    run_once: bool,
+    interval_seconds: int,
+    cfg: da_config.Config,
+    work_queue: da_workqueue.WorkQueue,
+) -> None:
+    """Schedule the wantlist onto `work_queue` for the workers to check (see
+    `da_workqueue.coordinate`), every ``interval_seconds`` or whenever the
+    adaptive schedule has a release due.
+    """
+
+    user_token_client = da_client.UserTokenClient(
+        cfg.user_agent,
+        cfg.discogs_token,
+        cfg.runtime.api_requests_per_minute,
+        stats_ttl=cfg.runtime.stats_ttl,
+        stats_dormant_ttl=cfg.runtime.stats_dormant_ttl,
+    )
+    scheduler = None
+    if cfg.runtime.adaptive_schedule and not run_once:
+        scheduler = da_scheduler.ReleaseScheduler(cfg.runtime.min_poll_interval, cfg.runtime.max_poll_interval)
+    try:
+        while True:
+            try:
+                wantlist = await da_loop.load_wantlist(
+                    loop_kwargs["list_id"], user_token_client, loop_kwargs["wantlist_path"]
+                )
+                da_workqueue.coordinate(work_queue, wantlist, scheduler, verbose=cfg.runtime.verbose)
+            except Exception:
+                logger.exception("Coordinator tick failed; continuing")
+            if run_once:
+                return
+            await asyncio.sleep(da_scheduler.sleep_seconds(interval_seconds, scheduler))
+    finally:
         await user_token_client.aclose()
+        work_queue.close()
+
+
+async def _run_tenants(tenants: List[Tuple[dict, da_config.Config]], run_once: bool) -> None:
+    """Run each ``(loop_kwargs, cfg)`` as a tenant of this process (see
+    `da_tenants`).
+
+    Tenants are checked in cycles: each one is due ``interval_seconds`` after
+    its last check (sooner with the adaptive schedule), and every tenant due
+    runs its iteration at the same time, through a `ReleaseCoordinator` that
+    scrapes each release at most once per cycle, however many of them want it.
+    Tenants with different intervals (or adaptive schedules) fall due in
+    different cycles, so the shared client also reuses pages younger than
+    `da_tenants.TENANT_PAGE_MAX_AGE` between cycles.
+    """
+
+    cfgs = [cfg for _loop_kwargs, cfg in tenants]
+    anon_client = da_tenants.shared_anon_client(cfgs)
+    coordinator = da_coordinator.ReleaseCoordinator(anon_client)
+    rates_provider = da_currency.RatesProvider()
+    runners = [
+        _Runner(loop_kwargs, run_once, max(1, int(3600 / cfg.frequency)), cfg, rates_provider=rates_provider)
+        for loop_kwargs, cfg in tenants
+    ]
+    next_due = [0.0] * len(runners)
+    reload_requested = asyncio.Event()
+    reload_handler = False
+    try:
+        for runner in runners:
+            runner.open()
+        if not run_once:
+            reload_handler = _install_reload_handler(reload_requested.set)
+        while True:
+            if reload_requested.is_set():
+                reload_requested.clear()
+                for runner in runners:
+                    await runner.reload()
+            due = [i for i, due_at in enumerate(next_due) if due_at <= time.monotonic()]
+            coordinator.begin_cycle()
+            try:
+                await da_tenants.run_all([runners[i].iterate(coordinator) for i in due])
+            finally:
+                coordinator.end_cycle()
+            if run_once:
+                return
+            for i in due:
+                next_due[i] = time.monotonic() + runners[i].sleep_seconds()
+            await asyncio.sleep(max(0.0, min(next_due) - time.monotonic()))
+    finally:
+        if reload_handler:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        for runner in runners:
+            await runner.aclose()
+        await anon_client.aclose()
+        await rates_provider.aclose()
+        da_state.close_shared_stores()
 
 
 if __name__ == "__main__":
@@ -16,14 +16,23 @@ The legacy ``AlerterType`` IntEnum is kept for back-compat with existing
 call sites, but the canonical "type" is now the alerter's registered name
 (a string). Pass either a string or an ``AlerterType`` member; both are
 accepted.
+
+Discovery is done once and cached: enumerating entry points walks every
+installed distribution's metadata and imports each plugin, which can take
+hundreds of milliseconds on a busy environment. Call `reload_alerters` after
+installing or removing a plugin to pick the change up (the CLI does so on
+SIGHUP). Modules already imported stay as they are, so upgrading a plugin
+still needs a restart.
 """
 
 from __future__ import annotations
 
 import enum
+import importlib
 import logging
+import threading
 from importlib.metadata import entry_points, EntryPoints
-from typing import Any, Dict, List, Type, Union
+from typing import Any, Dict, List, Optional, Type, Union
 
 from discogs_alert.alert.base import Alerter
 from discogs_alert.alert.gmail import GmailAlerter
@@ -43,6 +52,10 @@ _BUILTIN_ALERTERS: Dict[str, Type[Alerter]] = {
     "TELEGRAM": TelegramAlerter,
 }
 
+# `discover_alerters` result, built on first use; reset by `reload_alerters`.
+_registry: Optional[Dict[str, Type[Alerter]]] = None
+_registry_lock = threading.Lock()
+
 
 @enum.unique
 class AlerterType(enum.IntEnum):
@@ -93,11 +106,34 @@ def discover_alerters() -> Dict[str, Type[Alerter]]:
     """Return the full alerter registry: built-ins, then any entry-point
     additions. Entry points may NOT shadow built-ins (built-ins always win).
 
-    The result is recomputed each call so newly-installed plugins are picked up
-    without restarting the process — `entry_points()` is fast enough that the
-    cost is negligible.
+    The registry is built on the first call and cached for the life of the
+    process; `reload_alerters` rebuilds it. Callers get their own copy.
+    """
+
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = _build_registry()
+        return dict(_registry)
+
+
+def reload_alerters() -> Dict[str, Type[Alerter]]:
+    """Drop the cached registry and rediscover the alerters, e.g. after a
+    plugin was installed or removed. Plugins already imported are not
+    re-imported, so an upgraded one keeps its old code until a restart;
+    already-constructed alerters are not affected.
     """
 
+    global _registry
+    with _registry_lock:
+        _registry = None
+    # The import system caches directory listings; a plugin installed since
+    # startup wouldn't be importable otherwise.
+    importlib.invalidate_caches()
+    return discover_alerters()
+
+
+def _build_registry() -> Dict[str, Type[Alerter]]:
     registry: Dict[str, Type[Alerter]] = dict(_BUILTIN_ALERTERS)
     for name, cls in _load_entry_point_alerters().items():
         if name in registry:
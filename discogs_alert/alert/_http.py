@@ -0,0 +1,51 @@
+"""Pooled HTTP transport for the `requests`-based alerters.
+
+ntfy, Pushbullet and Telegram each deliver an alert with a single POST. Made
+with a bare `requests.post`, every one of those pays for a DNS lookup, a TCP
+connect and a TLS handshake — most of the latency of a send. `HttpAlerter`
+keeps one `requests.Session` (and so a keep-alive connection pool) for as long
+as the alerter is open.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from discogs_alert.alert.base import Alerter
+
+# Connections kept alive per host. Enough for the outbox's delivery workers and
+# the background retrier to post at once without queueing for a connection.
+POOL_MAXSIZE = 4
+
+
+class HttpAlerter(Alerter):
+    """Base class for alerters that deliver with an HTTP POST.
+
+    Subclasses send through `_post`, which uses the pooled session while the
+    alerter is open and falls back to a one-off `requests.post` otherwise.
+    `requests.Session` is safe to share between the worker threads
+    `send_alert_async` runs in.
+    """
+
+    _session: Optional[requests.Session] = None
+
+    def open(self) -> None:
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _post(self, url: str, **kwargs) -> requests.Response:
+        if self._session is not None:
+            return self._session.post(url, **kwargs)
+        return requests.post(url, **kwargs)
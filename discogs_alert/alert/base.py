@@ -8,14 +8,44 @@ history.
 
 from __future__ import annotations
 
+import asyncio
+
 
 class Alerter:
     """Base class for notification providers.
 
     Subclasses implement `send_alert`. Returning `True` indicates a successful send
-    (the loop will then record the alert in the local store). Returning `False`
-    means we should *not* mark the alert as sent — the loop will retry next iteration.
+    (the alert is then recorded in the local store). Returning `False` means we
+    should *not* mark the alert as sent — it stays in the store's durable outbox,
+    and `outbox.run_retrier` (or the next iteration) sends it again.
+
+    The loop delivers through `send_alert_async`, which by default runs `send_alert`
+    in a worker thread so a slow send doesn't block the event loop. Alerters with a
+    native async client can override it instead.
+
+    Long-running callers bracket a run of sends with `open` / `close` (or use the
+    alerter as a context manager). Between the two, alerters may keep connections
+    alive — a pooled HTTP session, an authenticated SMTP connection — instead of
+    paying for a fresh connect + handshake per alert. Sends outside that window
+    still work, connecting per message. Both hooks are no-ops by default and must
+    be safe to call more than once.
     """
 
+    def open(self) -> None:
+        """Acquire long-lived delivery resources (connections, sessions)."""
+
+    def close(self) -> None:
+        """Release whatever `open` acquired."""
+
+    def __enter__(self) -> "Alerter":
+        self.open()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
     def send_alert(self, message_title: str, message_body: str) -> bool:
         raise NotImplementedError
+
+    async def send_alert_async(self, message_title: str, message_body: str) -> bool:
+        return await asyncio.to_thread(self.send_alert, message_title, message_body)
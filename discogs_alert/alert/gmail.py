@@ -15,6 +15,12 @@ App-password recipe (you only do this once):
 
 Gmail's regular account password does NOT work for SMTP since 2022;
 that's a hard requirement to use a generated app password instead.
+
+While the alerter is open (see `Alerter.open`) it keeps one authenticated
+SMTP connection and sends every message over it, instead of a TLS handshake
+plus login per email. Gmail hangs up on idle sessions, so a connection that
+has sat unused for `SMTP_IDLE_SECONDS` is replaced before the next send, and
+one that turns out to have been dropped anyway is reconnected once.
 """
 
 from __future__ import annotations
@@ -22,7 +28,10 @@ from __future__ import annotations
 import logging
 import smtplib
 import ssl
+import threading
+import time
 from email.message import EmailMessage
+from typing import Optional
 
 from discogs_alert.alert.base import Alerter
 
@@ -31,6 +40,9 @@ logger = logging.getLogger(__name__)
 SMTP_HOST = "smtp.gmail.com"
 SMTP_PORT = 465  # implicit-TLS SMTPS; simpler than STARTTLS on 587
 SMTP_TIMEOUT_SECONDS = 15
+# Reconnect rather than reuse a connection idle for longer than this; Gmail
+# drops idle sessions after a few minutes.
+SMTP_IDLE_SECONDS = 60
 
 
 class GmailAlerter(Alerter):
@@ -55,6 +67,19 @@ class GmailAlerter(Alerter):
         self.gmail_user = gmail_user
         self.gmail_app_password = gmail_app_password
         self.gmail_to = gmail_to
+        self._keep_alive = False
+        self._server: Optional[smtplib.SMTP_SSL] = None
+        self._last_used = 0.0
+        # One SMTP conversation at a time: sends arrive from several threads.
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        self._keep_alive = True
+
+    def close(self) -> None:
+        with self._lock:
+            self._keep_alive = False
+            self._disconnect()
 
     def send_alert(self, message_title: str, message_body: str) -> bool:
         msg = EmailMessage()
@@ -63,12 +88,12 @@ class GmailAlerter(Alerter):
         msg["Subject"] = message_title
         msg.set_content(message_body)
         try:
-            ctx = ssl.create_default_context()
-            with smtplib.SMTP_SSL(
-                SMTP_HOST, SMTP_PORT, context=ctx, timeout=SMTP_TIMEOUT_SECONDS
-            ) as server:
-                server.login(self.gmail_user, self.gmail_app_password)
-                server.send_message(msg)
+            if self._keep_alive:
+                with self._lock:
+                    self._send_kept_alive(msg)
+            else:
+                with self._connect() as server:
+                    server.send_message(msg)
         except smtplib.SMTPAuthenticationError:
             # Most common cause: user pasted their regular Gmail password
             # instead of an app password, or 2-Step Verification isn't
@@ -84,3 +109,43 @@ class GmailAlerter(Alerter):
             logger.exception("Gmail SMTP send failed for %s", self.gmail_to)
             return False
         return True
+
+    def _connect(self) -> smtplib.SMTP_SSL:
+        ctx = ssl.create_default_context()
+        server = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, context=ctx, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            server.login(self.gmail_user, self.gmail_app_password)
+        except BaseException:
+            server.close()
+            raise
+        return server
+
+    def _disconnect(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
+
+    def _send_kept_alive(self, msg: EmailMessage) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > SMTP_IDLE_SECONDS:
+            self._disconnect()
+        reused = self._server is not None
+        try:
+            if self._server is None:
+                self._server = self._connect()
+            try:
+                self._server.send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                if not reused:
+                    raise
+                # The server dropped the connection while it sat idle; retry once on a fresh one.
+                self._disconnect()
+                self._server = self._connect()
+                self._server.send_message(msg)
+        except BaseException:
+            self._disconnect()
+            raise
+        self._last_used = time.monotonic()
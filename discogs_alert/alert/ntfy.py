@@ -17,8 +17,8 @@ import logging
 
 import requests
 
+from discogs_alert.alert._http import HttpAlerter
 from discogs_alert.alert._response import log_alerter_failure
-from discogs_alert.alert.base import Alerter
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +26,7 @@ DEFAULT_SERVER = "https://ntfy.sh"
 HTTP_TIMEOUT_SECONDS = 10
 
 
-class NtfyAlerter(Alerter):
+class NtfyAlerter(HttpAlerter):
     def __init__(self, ntfy_topic: str, ntfy_server: str = DEFAULT_SERVER, ntfy_token: str | None = None):
         if not ntfy_topic:
             raise ValueError("ntfy_topic is required")
@@ -44,7 +44,7 @@ class NtfyAlerter(Alerter):
         if self.ntfy_token:
             headers["Authorization"] = f"Bearer {self.ntfy_token}"
         try:
-            resp = requests.post(
+            resp = self._post(
                 url, data=message_body.encode("utf-8"), headers=headers, timeout=HTTP_TIMEOUT_SECONDS
             )
         except requests.exceptions.RequestException:
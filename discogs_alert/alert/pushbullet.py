@@ -11,8 +11,8 @@ import logging
 
 import requests
 
+from discogs_alert.alert._http import HttpAlerter
 from discogs_alert.alert._response import log_alerter_failure
-from discogs_alert.alert.base import Alerter
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +20,7 @@ PUSHBULLET_API_URL = "https://api.pushbullet.com/v2/pushes"
 HTTP_TIMEOUT_SECONDS = 10
 
 
-class PushbulletAlerter(Alerter):
+class PushbulletAlerter(HttpAlerter):
     def __init__(self, pushbullet_token: str):
         self.pushbullet_token = pushbullet_token
 
@@ -28,7 +28,7 @@ class PushbulletAlerter(Alerter):
         headers = {"Authorization": f"Bearer {self.pushbullet_token}", "Content-Type": "application/json"}
         message = {"type": "note", "title": message_title, "body": message_body}
         try:
-            resp = requests.post(
+            resp = self._post(
                 PUSHBULLET_API_URL, data=json.dumps(message), headers=headers, timeout=HTTP_TIMEOUT_SECONDS
             )
         except requests.exceptions.RequestException:
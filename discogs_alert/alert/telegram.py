@@ -6,8 +6,8 @@ import logging
 
 import requests
 
+from discogs_alert.alert._http import HttpAlerter
 from discogs_alert.alert._response import log_alerter_failure
-from discogs_alert.alert.base import Alerter
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +15,7 @@ TELEGRAM_API_BASE = "https://api.telegram.org"
 HTTP_TIMEOUT_SECONDS = 10
 
 
-class TelegramAlerter(Alerter):
+class TelegramAlerter(HttpAlerter):
     def __init__(self, telegram_token: str, telegram_chat_id: str):
         self.bot_token = telegram_token
         self.bot_chat_id = telegram_chat_id
@@ -25,7 +25,7 @@ class TelegramAlerter(Alerter):
         text = f"{message_title} ({message_body})"
         url = f"{TELEGRAM_API_BASE}/bot{self.bot_token}/sendMessage"
         try:
-            resp = requests.post(
+            resp = self._post(
                 url,
                 json={"chat_id": self.bot_chat_id, "parse_mode": "Markdown", "text": text},
                 timeout=HTTP_TIMEOUT_SECONDS,
@@ -0,0 +1,229 @@
+"""Columnar listing batches and a one-pass filter over them.
+
+`loop.process_release` used to run `entities.conditions_satisfied` and
+`Listing.convert_currency` on each listing in turn: a pydantic attribute
+lookup per field per listing, a currency-table lookup per price, and a set
+lookup per seller country. With several users sharing a process (see
+`da_tenants`) that's thousands of listings a cycle.
+
+A `ListingBatch` holds a release's listings as ``array`` columns instead
+(prices, shipping, conditions, seller rating and sales), with the
+per-listing strings — currencies, ships-from countries, availability —
+interned to small integer codes. `filter_batch` then evaluates every filter
+in a single pass over the columns; anything that depends only on a string
+(the conversion factor for a currency, whether a country passes the white-
+and blacklist) is worked out once per distinct value, not once per listing.
+
+The verdicts match `conditions_satisfied` plus the availability and price
+threshold checks `process_release` applies, in the same order; see
+`tests/test_batch.py`. NumPy isn't a dependency, so the columns are stdlib
+``array`` s.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from discogs_alert import entities as da_entities
+from discogs_alert.util import currency as da_currency
+
+logger = logging.getLogger(__name__)
+
+# Verdicts, one per listing (see `BatchVerdicts.reasons`).
+ACCEPTED = 0
+UNAVAILABLE = 1
+CONDITIONS = 2
+ABOVE_THRESHOLD = 3
+
+_NAN = float("nan")
+
+
+class _Interner:
+    """Maps strings to consecutive integer codes."""
+
+    def __init__(self) -> None:
+        self.codes: Dict[Optional[str], int] = {}
+        self.values: List[Optional[str]] = []
+
+    def __call__(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ListingBatch:
+    """A release's listings as parallel columns, in their original order.
+
+    Missing values are NaN (shipping, seller rating); string columns hold
+    indices into `currencies`, `countries` and `availabilities`.
+    """
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.media = array("b")
+        self.sleeve = array("b")
+        self.seller_sales = array("q")
+        self.seller_rating = array("d")
+        self.price = array("d")
+        self.shipping = array("d")
+        self.price_currency = array("H")
+        self.shipping_currency = array("H")
+        self.ships_from = array("H")
+        self.availability = array("H")
+        self.currencies: List[Optional[str]] = []
+        self.countries: List[Optional[str]] = []
+        self.availabilities: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[da_entities.ListingTuple]) -> "ListingBatch":
+        """Build a batch from `Listing.as_tuple` rows (the page cache's shape)."""
+
+        batch = cls()
+        currencies, countries, availabilities = _Interner(), _Interner(), _Interner()
+        for (
+            listing_id, availability, media_condition, sleeve_condition, _comment,
+            seller_num_ratings, seller_avg_rating, seller_ships_from,
+            currency, value, shipping_currency, shipping_value,
+        ) in rows:
+            batch.ids.append(listing_id)
+            batch.media.append(media_condition)
+            batch.sleeve.append(sleeve_condition)
+            batch.seller_sales.append(seller_num_ratings)
+            batch.seller_rating.append(_NAN if seller_avg_rating is None else seller_avg_rating)
+            batch.price.append(value)
+            batch.shipping.append(_NAN if shipping_value is None else shipping_value)
+            batch.price_currency.append(currencies(currency))
+            batch.shipping_currency.append(currencies(shipping_currency))
+            batch.ships_from.append(countries(seller_ships_from))
+            batch.availability.append(availabilities(availability))
+        batch.currencies = currencies.values
+        batch.countries = countries.values
+        batch.availabilities = availabilities.values
+        return batch
+
+    @classmethod
+    def from_listings(cls, listings: Iterable[da_entities.Listing]) -> "ListingBatch":
+        return cls.from_rows(listing.as_tuple() for listing in listings)
+
+
+class BatchVerdicts(NamedTuple):
+    """`filter_batch`'s result, one entry per listing of the batch."""
+
+    # ACCEPTED, or the first filter the listing failed.
+    reasons: array
+    # Indices of listings whose price couldn't be converted.
+    unconverted: Set[int]
+
+
+def _conversion_factors(
+    currencies: List[Optional[str]], conversions: da_currency.ConversionTable
+) -> List[Optional[float]]:
+    """The multiplier into the table's currency for each currency code (None
+    where the rate isn't available, or there's no currency).
+    """
+
+    factors: List[Optional[float]] = []
+    for code in currencies:
+        if code is None:
+            factors.append(None)
+            continue
+        try:
+            factors.append(conversions.factor(code))
+        except Exception:
+            logger.warning("Currency conversion from %s failed; continuing without.", code, exc_info=True)
+            factors.append(None)
+    return factors
+
+
+def _country_passes(countries: List[Optional[str]], whitelist: Set[str], blacklist: Set[str]) -> List[bool]:
+    return [
+        not (whitelist and country not in whitelist) and not (blacklist and country in blacklist)
+        for country in countries
+    ]
+
+
+def filter_batch(
+    batch: ListingBatch,
+    release: da_entities.Release,
+    currency: str,
+    country: str,
+    seller_filters: da_entities.SellerFilters,
+    record_filters: da_entities.RecordFilters,
+    country_whitelist: Set[str],
+    country_blacklist: Set[str],
+    conversions: Optional[da_currency.ConversionTable] = None,
+) -> BatchVerdicts:
+    """Convert every listing's price to `currency` and check it against the
+    user's filters, in one pass over `batch`.
+
+    A listing is rejected, in this order, if it's definitely unavailable in
+    `country`, if it fails `conditions_satisfied`, or if its converted total
+    is above the release's price threshold. A listing whose price couldn't be
+    converted is never rejected on price (it's reported in ``unconverted``).
+    No condition floor, from either the release or `record_filters`, means no
+    condition check.
+
+    Prices are converted with `conversions` (a `ConversionTable` into
+    `currency`); without one, a table is built for this call.
+    """
+
+    if conversions is None:
+        conversions = da_currency.ConversionTable(currency)
+    factors = _conversion_factors(batch.currencies, conversions)
+    unavailable = [availability == f"Unavailable in {country}" for availability in batch.availabilities]
+    country_ok = _country_passes(batch.countries, country_whitelist, country_blacklist)
+    min_rating = seller_filters.min_seller_rating
+    min_sales = seller_filters.min_seller_sales
+    min_media = release.min_media_condition or record_filters.min_media_condition
+    min_sleeve = release.min_sleeve_condition or record_filters.min_sleeve_condition
+    min_media = -math.inf if min_media is None else int(min_media)
+    min_sleeve = -math.inf if min_sleeve is None else int(min_sleeve)
+    threshold = math.inf if release.price_threshold is None else release.price_threshold
+
+    n = len(batch)
+    reasons = array("b", bytes(n))
+    unconverted: Set[int] = set()
+    for i, (price, shipping, price_code, shipping_code, ships_from, availability) in enumerate(
+        zip(
+            batch.price, batch.shipping, batch.price_currency, batch.shipping_currency,
+            batch.ships_from, batch.availability,
+        )
+    ):
+        factor = factors[price_code]
+        if factor is not None:
+            price *= factor
+        if shipping == shipping:  # not NaN
+            shipping_factor = factors[shipping_code]
+            if shipping_factor is not None:
+                shipping *= shipping_factor
+            elif factor is not None:
+                unconverted.add(i)
+            total = price + shipping
+        else:
+            total = price
+        if factor is None:
+            unconverted.add(i)
+
+        if unavailable[availability]:
+            reasons[i] = UNAVAILABLE
+        elif (
+            not country_ok[ships_from]
+            # NaN (a new seller) compares False, so it's never below the floor.
+            or (min_rating is not None and batch.seller_rating[i] < min_rating)
+            or (min_sales is not None and batch.seller_sales[i] < min_sales)
+            or batch.media[i] < min_media
+            or batch.sleeve[i] < min_sleeve
+        ):
+            reasons[i] = CONDITIONS
+        elif i not in unconverted and total > threshold:
+            reasons[i] = ABOVE_THRESHOLD
+    return BatchVerdicts(reasons, unconverted)
+
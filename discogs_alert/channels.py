@@ -0,0 +1,116 @@
+"""Extra alert channels with per-channel routing.
+
+The main alerter (``alerter.type``) is told about every qualifying listing.
+Extra channels (``[[alerter.channels]]``) sit alongside it, each with its own
+alerter and an optional routing predicate — e.g. ntfy for every hit, plus
+Gmail only for listings under half the release's price threshold.
+
+Every channel delivers through its own `AlertOutbox` (its own workers and
+queue), so a slow channel never holds up a fast one, and keeps its own alert
+history in the `AlertStore`: dedup is per ``(listing_id, channel)``, keyed by
+the channel's name. The main alerter is the `state.DEFAULT_CHANNEL`.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from discogs_alert import entities as da_entities
+from discogs_alert.alert import Alerter, get_alerter
+
+logger = logging.getLogger(__name__)
+
+# Decides whether a listing (already converted to the user's currency) of a
+# release should be sent to a channel.
+Predicate = Callable[[da_entities.Listing, da_entities.Release], bool]
+
+
+@dataclasses.dataclass
+class ChannelSpec:
+    """How to build a channel: what `__main__._build_loop_kwargs` passes the loop."""
+
+    name: str
+    alerter_type: str
+    alerter_kwargs: Dict[str, Any]
+    max_price_ratio: Optional[float] = None
+
+    def predicate(self) -> Optional[Predicate]:
+        if self.max_price_ratio is None:
+            return None
+        return price_ratio_at_most(self.max_price_ratio)
+
+
+@dataclasses.dataclass
+class Channel:
+    """A named alerter plus the predicate routing listings to it (None: every listing)."""
+
+    name: str
+    alerter: Alerter
+    predicate: Optional[Predicate] = None
+    # What `predicate` depends on, JSON-serialisable, for `loop.evaluation_key`.
+    routing: Optional[Dict[str, Any]] = None
+
+    def accepts(self, listing: da_entities.Listing, release: da_entities.Release) -> bool:
+        return self.predicate is None or self.predicate(listing, release)
+
+
+def price_ratio_at_most(ratio: float) -> Predicate:
+    """Route listings whose total price is at most `ratio` times the release's
+    price threshold. Releases without a threshold never match.
+    """
+
+    def predicate(listing: da_entities.Listing, release: da_entities.Release) -> bool:
+        return release.price_threshold is not None and listing.total_price <= ratio * release.price_threshold
+
+    return predicate
+
+
+def open_channels(
+    specs: Sequence[ChannelSpec], make_alerter: Callable[[str, Dict[str, Any]], Alerter] = get_alerter
+) -> List[Channel]:
+    """Build and open a channel per spec. If one fails to build, the ones
+    already opened are closed again before the error propagates.
+    """
+
+    channels: List[Channel] = []
+    try:
+        for spec in specs:
+            alerter = make_alerter(spec.alerter_type, spec.alerter_kwargs)
+            alerter.open()
+            channels.append(
+                Channel(spec.name, alerter, spec.predicate(), routing={"max_price_ratio": spec.max_price_ratio})
+            )
+    except BaseException:
+        close_channels(channels)
+        raise
+    return channels
+
+
+def open_alerters(
+    alerter_type: str,
+    alerter_kwargs: Dict[str, Any],
+    specs: Sequence[ChannelSpec],
+    make_alerter: Callable[[str, Dict[str, Any]], Alerter] = get_alerter,
+) -> Tuple[Alerter, List[Channel]]:
+    """Build and open the main alerter and the channels for `specs`, all or
+    nothing: if any of them fails, the rest are closed again before the error
+    propagates.
+    """
+
+    alerter = make_alerter(alerter_type, alerter_kwargs)
+    alerter.open()
+    try:
+        return alerter, open_channels(specs, make_alerter)
+    except BaseException:
+        alerter.close()
+        raise
+
+
+def close_channels(channels: Sequence[Channel]) -> None:
+    for channel in channels:
+        try:
+            channel.alerter.close()
+        except Exception:
+            logger.exception("Closing alert channel %r failed", channel.name)
@@ -12,41 +12,129 @@ Two clients live here:
   ``curl_cffi.requests.AsyncSession`` to impersonate a real Chrome's TLS/JA3
   fingerprint so the challenge passes.
 
-Both clients are async-context-manager-aware (``async with``), and the
-rate-limit guard sleeps cooperatively with an internal ``asyncio.Lock`` so a
-fan-out of concurrent requests doesn't overshoot the per-minute floor.
+Both clients are async-context-manager-aware (``async with``), and each paces
+its requests through its own ``TokenBucket``, so a fan-out of concurrent
+requests is spread evenly over the minute instead of overshooting the
+per-minute limit and stalling.
+
+Parsing a marketplace page is CPU-bound (tens of milliseconds with bs4) and by
+default runs on the event loop, stalling every other in-flight fetch while it
+does. ``AnonClient(parse_workers=N)`` moves it into a worker pool instead.
+
+Most marketplace pages don't change between polls, so ``AnonClient`` also keeps
+a per-release page cache: HTTP validators (``ETag`` / ``Last-Modified``) for
+conditional requests, plus a hash of the listings table for servers (like
+Discogs behind Cloudflare) that don't honour them. An unchanged page skips the
+parse entirely, and callers can ask to skip their own downstream work too.
+
+One ``AnonClient`` can serve several users' loops at once (see
+`discogs_alert.tenants`): concurrent fetches of the same release share one
+request, and ``fetch_page`` hands back the fetched page's cache entry for each
+of them to read its listings from, so `discogs_alert.coordinator` can fetch
+each release once per cycle for all of them. With ``page_max_age`` a page
+fetched moments ago is served from the cache instead of being fetched again.
 """
 
 from __future__ import annotations
 
+import asyncio
+import collections
+import dataclasses
+import hashlib
 import logging
-from typing import Optional, Union
+import multiprocessing
+import time
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Hashable, List, Optional, Set, Union
 
 import httpx
 from curl_cffi.requests import AsyncSession as CurlAsyncSession
 
 from discogs_alert import entities as da_entities, scrape as da_scrape
-from discogs_alert.util.rate_limit import RateLimitGuard
+from discogs_alert.util.rate_limit import DEFAULT_API_REQUESTS_PER_MINUTE, RateLimitGuard, TokenBucket
 
 logger = logging.getLogger(__name__)
 
+PARSE_EXECUTORS = ("process", "thread")
+DEFAULT_SCRAPE_BURST = 2
+DEFAULT_STATS_TTL = 0
+DEFAULT_STATS_DORMANT_TTL = 0
+
+
+@dataclasses.dataclass
+class _PageCacheEntry:
+    """What `AnonClient` remembers about the last fetch of one release's page."""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    # blake2b of the raw `table.mpitems` HTML ("" when the page had no table).
+    digest: str
+    rows: List[da_entities.ListingRecord]
+    fetched_at: float = 0.0
+    # Opaque tokens of the callers that have seen this version of the page —
+    # see `get_marketplace_listings`.
+    contexts: Set[Hashable] = dataclasses.field(default_factory=set)
+
+    def records(
+        self, skip_if_unchanged: bool = False, context: Hashable = None
+    ) -> Optional[List[da_entities.ListingRecord]]:
+        """The page's listings, as `AnonClient.get_marketplace_records` returns
+        them for a caller in `context`.
+        """
+
+        if skip_if_unchanged and context in self.contexts:
+            return None
+        self.contexts.add(context)
+        return list(self.rows)
+
+
+@dataclasses.dataclass
+class _StatsCacheEntry:
+    stats: da_entities.ReleaseStats
+    fetched_at: float
+    expires_at: float
+
 
 class UserTokenClient:
     """Async client for ``api.discogs.com``.
 
     Uses a long-lived ``httpx.AsyncClient`` so TLS handshakes are paid once
-    per process. Wraps each request in a ``RateLimitGuard`` that watches the
-    Discogs ``X-Discogs-Ratelimit-*`` headers and proactively (and
-    cooperatively) sleeps if we're close to the per-minute floor.
+    per process. Paces requests through a ``TokenBucket`` at
+    `requests_per_minute`; a ``RateLimitGuard`` tracks the Discogs
+    ``X-Discogs-Ratelimit-*`` headers, which correct the bucket when Discogs
+    has counted more usage than we have.
+
+    `get_release_stats` results are cached per release: for `stats_ttl`
+    seconds normally, and for `stats_dormant_ttl` seconds when the release has
+    nothing for sale or the caller marks it dormant (see
+    `mark_release_stats_dormant`). Dormant releases are the bulk of a typical
+    wantlist, so this is where most of the API budget goes. Only the
+    `STATS_CACHE_SIZE` most recently used releases' stats are kept, so releases
+    that have left the wantlist eventually drop out.
     """
 
     BASE_URL = "https://api.discogs.com"
     HTTP_TIMEOUT_SECONDS = 15
-
-    def __init__(self, user_agent: str, user_token: str) -> None:
+    STATS_CACHE_SIZE = 5000
+
+    def __init__(
+        self,
+        user_agent: str,
+        user_token: str,
+        requests_per_minute: int = DEFAULT_API_REQUESTS_PER_MINUTE,
+        stats_ttl: float = DEFAULT_STATS_TTL,
+        stats_dormant_ttl: float = DEFAULT_STATS_DORMANT_TTL,
+    ) -> None:
+        if stats_ttl < 0 or stats_dormant_ttl < 0:
+            raise ValueError("stats TTLs must be non-negative")
         self.user_agent = user_agent
         self.user_token = user_token
         self.rate_limit_guard = RateLimitGuard()
+        self.rate_limiter = TokenBucket(requests_per_minute)
+        self.stats_ttl = stats_ttl
+        self.stats_dormant_ttl = stats_dormant_ttl
+        # Least recently used first.
+        self._stats_cache: collections.OrderedDict[int, _StatsCacheEntry] = collections.OrderedDict()
         self._client = httpx.AsyncClient(
             params={"token": user_token},
             headers={"User-Agent": user_agent},
@@ -67,7 +155,7 @@ class UserTokenClient:
         await self.aclose()
 
     async def _get(self, url: str) -> Union[dict, list, bool]:
-        await self.rate_limit_guard.before_request_async()
+        await self.rate_limiter.acquire()
         try:
             resp = await self._client.get(url)
         except httpx.HTTPError as exc:
@@ -77,6 +165,12 @@ class UserTokenClient:
         self.rate_limit = self.rate_limit_guard.limit
         self.rate_limit_used = self.rate_limit_guard.used
         self.rate_limit_remaining = self.rate_limit_guard.remaining
+        remaining = None
+        if resp.status_code == 429:
+            remaining = 0
+        elif "X-Discogs-Ratelimit-Remaining" in resp.headers:
+            remaining = self.rate_limit_remaining
+        self.rate_limiter.correct(limit=self.rate_limit, remaining=remaining)
         if resp.status_code != 200:
             logger.info("ERROR: status_code: %s, content: %r", resp.status_code, resp.content[:200])
             return False
@@ -103,13 +197,35 @@ class UserTokenClient:
     ) -> Union[da_entities.ReleaseStats, bool]:
         """Fetch the marketplace stats for a release. Returns False if the API
         call fails (e.g. a 404 on a non-existent release), otherwise a
-        ``ReleaseStats``.
+        ``ReleaseStats`` — possibly a cached one (see the class docstring).
+        Failures aren't cached.
         """
 
+        now = time.monotonic()
+        entry = self._stats_cache.get(release_id)
+        if entry is not None and now < entry.expires_at:
+            self._stats_cache.move_to_end(release_id)
+            return entry.stats
         data = await self._get(f"{self.BASE_URL}/marketplace/stats/{release_id}")
         if not isinstance(data, dict):
+            self._stats_cache.pop(release_id, None)
             return False
-        return da_entities.ReleaseStats.model_validate(data)
+        stats = da_entities.ReleaseStats.model_validate(data)
+        ttl = self.stats_dormant_ttl if stats.num_for_sale == 0 else self.stats_ttl
+        self._stats_cache[release_id] = _StatsCacheEntry(stats, now, now + ttl)
+        self._stats_cache.move_to_end(release_id)
+        while len(self._stats_cache) > self.STATS_CACHE_SIZE:
+            self._stats_cache.popitem(last=False)
+        return stats
+
+    def mark_release_stats_dormant(self, release_id: int) -> None:
+        """Keep the release's cached stats for `stats_dormant_ttl` seconds from
+        when they were fetched — for callers that know the release isn't worth
+        re-checking soon (e.g. its cheapest copy is far over the user's price).
+        """
+
+        if (entry := self._stats_cache.get(release_id)) is not None:
+            entry.expires_at = max(entry.expires_at, entry.fetched_at + self.stats_dormant_ttl)
 
 
 class AnonClient:
@@ -126,24 +242,90 @@ class AnonClient:
             but should match a real browser of the same era.
         impersonate: which browser fingerprint to impersonate. Defaults to a
             recent Chrome release; ``curl_cffi`` keeps these up to date.
+        parser_backend: which HTML parser to run over marketplace pages; one of
+            ``discogs_alert.scrape.PARSER_BACKENDS``.
+        parse_workers: size of the pool marketplace pages are parsed in. ``0``
+            (the default) parses inline on the event loop.
+        parse_executor: ``"process"`` (parsing scales across cores) or
+            ``"thread"`` (no process start-up cost; only frees the event loop).
+        requests_per_minute: pace marketplace fetches through a token bucket at
+            this rate. ``0`` (the default) doesn't pace them.
+        page_max_age: serve a page fetched less than this many seconds ago
+            from the cache without re-fetching it. ``0`` (the default) always
+            fetches.
+
+    The page cache keeps the `PAGE_CACHE_SIZE` most recently fetched
+    releases, so pages of releases that have left the wantlist eventually
+    drop out.
     """
 
     BASE_URL = "https://www.discogs.com"
     HTTP_TIMEOUT_SECONDS = 20
     # `chrome124` is the highest target supported across curl_cffi 0.5–0.7.
     DEFAULT_IMPERSONATE = "chrome124"
-
-    def __init__(self, user_agent: str, impersonate: str = DEFAULT_IMPERSONATE) -> None:
+    PAGE_CACHE_SIZE = 5000
+
+    def __init__(
+        self,
+        user_agent: str,
+        impersonate: str = DEFAULT_IMPERSONATE,
+        parser_backend: str = da_scrape.DEFAULT_PARSER_BACKEND,
+        parse_workers: int = 0,
+        parse_executor: str = "process",
+        requests_per_minute: int = 0,
+        page_max_age: float = 0,
+    ) -> None:
+        if parse_workers < 0:
+            raise ValueError("parse_workers must be non-negative")
+        if parse_executor not in PARSE_EXECUTORS:
+            raise ValueError(f"Unknown parse executor {parse_executor!r}; available: {list(PARSE_EXECUTORS)}")
         self.user_agent = user_agent
         self.impersonate = impersonate
+        # Resolve once so an unknown name fails at startup, not on every scrape.
+        self.parser_backend = da_scrape.resolve_parser_backend(parser_backend)
+        self.parse_workers = parse_workers
+        self.parse_executor = parse_executor
+        self._parse_pool = self._new_parse_pool()
+        if requests_per_minute < 0:
+            raise ValueError("requests_per_minute must be non-negative")
+        if page_max_age < 0:
+            raise ValueError("page_max_age must be non-negative")
+        self.page_max_age = float(page_max_age)
+        # Scrapes don't count against the API limit, but Cloudflare notices
+        # bursts. Unpaced, only the loop's concurrency cap holds them back.
+        self.rate_limiter: Optional[TokenBucket] = None
+        if requests_per_minute:
+            self.rate_limiter = TokenBucket(requests_per_minute, burst=DEFAULT_SCRAPE_BURST)
         self._session = CurlAsyncSession(impersonate=impersonate)
         self._session.headers["User-Agent"] = user_agent
+        # Least recently fetched first.
+        self._page_cache: collections.OrderedDict[int, _PageCacheEntry] = collections.OrderedDict()
+        # Fetches under way, by release; later callers wait on these instead
+        # of issuing the same request again.
+        self._inflight: Dict[int, asyncio.Task] = {}
+
+    def _new_parse_pool(self) -> Optional[Executor]:
+        if not self.parse_workers:
+            return None
+        if self.parse_executor == "process":
+            # "spawn" rather than the Linux default "fork": forking a process
+            # that holds a running event loop and curl handles is asking for
+            # trouble. Workers start lazily, on the first submitted page.
+            return ProcessPoolExecutor(
+                max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return ThreadPoolExecutor(max_workers=self.parse_workers, thread_name_prefix="discogs-alert-parse")
 
     async def aclose(self) -> None:
+        for task in list(self._inflight.values()):
+            task.cancel()
         try:
             await self._session.close()
         except Exception:
             logger.warning("error closing curl_cffi async session", exc_info=True)
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
 
     async def __aenter__(self) -> "AnonClient":
         return self
@@ -151,19 +333,158 @@ class AnonClient:
     async def __aexit__(self, *_exc) -> None:
         await self.aclose()
 
-    async def get_marketplace_listings(self, release_id: int) -> da_entities.Listings:
-        """Fetch the marketplace HTML for a release and parse the listings."""
+    async def get_marketplace_listings(
+        self,
+        release_id: int,
+        skip_if_unchanged: bool = False,
+        context: Hashable = None,
+    ) -> Optional[da_entities.Listings]:
+        """Fetch the marketplace HTML for a release and parse the listings.
+
+        A page that's unchanged since the last fetch (a 304, or an identical
+        listings table) isn't re-parsed; its listings are rebuilt from the cache.
+
+        Args:
+            release_id: the release whose ``/sell/release/{id}`` page to fetch.
+            skip_if_unchanged: return ``None`` instead of the listings when the
+                page is unchanged since a call with the same `context`, i.e.
+                the caller has already acted on exactly this page.
+            context: anything else the caller's decision depends on (e.g. its
+                filters, and which user it is); a new context makes an
+                unchanged page count as new.
+
+        Returns:
+            The listings (``[]`` on fetch failure), or ``None`` as above.
+        """
+
+        records = await self.get_marketplace_records(release_id, skip_if_unchanged, context)
+        return None if records is None else [record.to_listing() for record in records]
+
+    async def get_marketplace_records(
+        self,
+        release_id: int,
+        skip_if_unchanged: bool = False,
+        context: Hashable = None,
+    ) -> Optional[List[da_entities.ListingRecord]]:
+        """`get_marketplace_listings`, as the cached `ListingRecord`s: no
+        pydantic models are built.
+        """
+
+        if await self._page(release_id) is None:
+            return []
+        return self.cached_records(release_id, skip_if_unchanged, context)
+
+    async def fetch_page(self, release_id: int) -> Optional[_PageCacheEntry]:
+        """Bring the release's cached page up to date (subject to
+        `page_max_age`) without building any listings, and return its cache
+        entry; ``None`` if the fetch failed. The entry stays readable through
+        `_PageCacheEntry.records` even if the page is forgotten meanwhile.
+        """
+
+        return await self._page(release_id)
+
+    def cached_records(
+        self,
+        release_id: int,
+        skip_if_unchanged: bool = False,
+        context: Hashable = None,
+    ) -> Optional[List[da_entities.ListingRecord]]:
+        """`get_marketplace_records` from the cache alone: the records of the
+        page last fetched, ``[]`` if there isn't one.
+        """
 
+        entry = self._page_cache.get(release_id)
+        return [] if entry is None else entry.records(skip_if_unchanged, context)
+
+    async def _page(self, release_id: int) -> Optional[_PageCacheEntry]:
+        """The current cache entry for the release's page, fetching it unless
+        it's younger than `page_max_age`. Only one fetch per release is ever in
+        flight. Returns ``None`` on fetch failure.
+        """
+
+        entry = self._page_cache.get(release_id)
+        if entry is not None and self.page_max_age and time.monotonic() - entry.fetched_at < self.page_max_age:
+            return entry
+        task = self._inflight.get(release_id)
+        if task is None:
+            # A task of its own, so one caller being cancelled doesn't cancel
+            # the fetch under the others.
+            task = asyncio.ensure_future(self._fetch_page(release_id))
+            self._inflight[release_id] = task
+            task.add_done_callback(lambda _task: self._inflight.pop(release_id, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_page(self, release_id: int) -> Optional[_PageCacheEntry]:
         url = f"{self.BASE_URL}/sell/release/{release_id}?ev=rb&sort=price%2Casc"
+        entry = self._page_cache.get(release_id)
+        headers = {}
+        if entry is not None:
+            if entry.etag is not None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                headers["If-Modified-Since"] = entry.last_modified
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
         try:
-            resp = await self._session.get(url, timeout=self.HTTP_TIMEOUT_SECONDS)
+            resp = await self._session.get(url, headers=headers, timeout=self.HTTP_TIMEOUT_SECONDS)
         except Exception:
             logger.warning("Marketplace fetch for release %s raised", release_id, exc_info=True)
-            return []
-        if resp.status_code != 200:
+            return None
+
+        if resp.status_code == 200:
+            table_html = da_scrape.listings_table_html(resp.text) or ""
+            digest = hashlib.blake2b(table_html.encode("utf-8"), digest_size=16).hexdigest()
+            if entry is None or entry.digest != digest:
+                rows = await self._parse(resp.text, release_id)
+                if rows is None:
+                    return None
+                entry = _PageCacheEntry(etag=None, last_modified=None, digest=digest, rows=rows)
+                self._page_cache[release_id] = entry
+                while len(self._page_cache) > self.PAGE_CACHE_SIZE:
+                    self._page_cache.popitem(last=False)
+            entry.etag = resp.headers.get("ETag")
+            entry.last_modified = resp.headers.get("Last-Modified")
+        elif entry is None or resp.status_code != 304:
             logger.warning(
                 "Marketplace fetch for release %s failed with status %s",
                 release_id, resp.status_code,
             )
-            return []
-        return da_scrape.scrape_listings_from_marketplace(resp.text, release_id)
+            return None
+        entry.fetched_at = time.monotonic()
+        # Unless it was forgotten while we fetched.
+        if self._page_cache.get(release_id) is entry:
+            self._page_cache.move_to_end(release_id)
+        return entry
+
+    def forget_page(self, release_id: int) -> None:
+        """Drop the cached page for `release_id`, so the next fetch counts as
+        changed. Callers use this when they couldn't finish acting on a page
+        (e.g. a price couldn't be converted) and need to see it again.
+        """
+
+        self._page_cache.pop(release_id, None)
+
+    async def _parse(self, html: str, release_id: int) -> Optional[List[da_entities.ListingRecord]]:
+        """Parse `html` into `ListingRecord`s — inline, or in the worker pool if
+        there is one. Returns ``None`` if the pool failed.
+        """
+
+        if self._parse_pool is None:
+            return da_scrape.scrape_listing_tuples(html, release_id, self.parser_backend)
+        pool = self._parse_pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, da_scrape.scrape_listing_tuples, html, release_id, self.parser_backend
+            )
+        except BrokenExecutor:
+            # A worker died (OOM, say) and took the pool with it: every later
+            # submission would fail too. Start a new one for the next page
+            # and parse this one inline.
+            logger.warning("Parse pool broke on release %s; replacing it", release_id, exc_info=True)
+            if self._parse_pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._parse_pool = self._new_parse_pool()
+            return da_scrape.scrape_listing_tuples(html, release_id, self.parser_backend)
+        except Exception:
+            logger.warning("Worker-pool parse of release %s failed", release_id, exc_info=True)
+            return None
@@ -24,9 +24,9 @@ from __future__ import annotations
 import os
 import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 if sys.version_info >= (3, 11):
     import tomllib
@@ -89,19 +89,64 @@ class GmailConfig(BaseModel):
     to: Optional[str] = None           # destination address
 
 
+class ChannelConfig(BaseModel):
+    """An extra alert channel, on top of the main ``alerter.type``.
+
+    Its credentials come from the matching ``[alerter.<type>]`` section.
+    ``name`` keys the channel's alert history (so renaming one re-alerts);
+    ``max_price_ratio`` routes only listings priced at most that fraction of
+    the release's price threshold to it.
+    """
+
+    type: str
+    name: Optional[str] = None
+    max_price_ratio: Optional[float] = None
+
+    @property
+    def key(self) -> str:
+        return self.name or self.type.lower()
+
+
 class AlerterConfig(BaseModel):
     """Choice of alerter and per-alerter configuration.
 
-    Only the section corresponding to ``type`` is used; the others are kept
-    around so a user can switch alerters without losing their config.
+    Only the sections corresponding to ``type`` (and to any extra
+    ``channels``) are used; the others are kept around so a user can switch
+    alerters without losing their config.
     """
 
     type: str = "NTFY"
+    channels: List[ChannelConfig] = Field(default_factory=list)
     pushbullet: PushbulletConfig = Field(default_factory=PushbulletConfig)
     telegram: TelegramConfig = Field(default_factory=TelegramConfig)
     ntfy: NtfyConfig = Field(default_factory=NtfyConfig)
     gmail: GmailConfig = Field(default_factory=GmailConfig)
 
+    @model_validator(mode="after")
+    def _unique_channel_names(self) -> "AlerterConfig":
+        names = [channel.key for channel in self.channels]
+        if len(set(names)) != len(names):
+            raise ValueError(f"alert channel names must be unique, got {names}")
+        return self
+
+    def kwargs_for(self, alerter_type: str) -> dict:
+        """Constructor kwargs for a built-in alerter, from its section."""
+
+        alerter_type = alerter_type.upper()
+        if alerter_type == "PUSHBULLET":
+            return {"pushbullet_token": self.pushbullet.token}
+        if alerter_type == "TELEGRAM":
+            return {"telegram_token": self.telegram.token, "telegram_chat_id": self.telegram.chat_id}
+        if alerter_type == "NTFY":
+            return {"ntfy_topic": self.ntfy.topic, "ntfy_server": self.ntfy.server, "ntfy_token": self.ntfy.token}
+        if alerter_type == "GMAIL":
+            return {
+                "gmail_user": self.gmail.user,
+                "gmail_app_password": self.gmail.app_password,
+                "gmail_to": self.gmail.to,
+            }
+        return {}
+
 
 class RuntimeConfig(BaseModel):
     """Things the runtime cares about that aren't user preferences."""
@@ -110,6 +155,40 @@ class RuntimeConfig(BaseModel):
     stats_gate: bool = True
     max_concurrency: int = 6
     prune_after_days: int = 90
+    # Marketplace HTML parser: "auto" (lxml if installed, else bs4), "lxml" or "bs4".
+    parser: Literal["auto", "lxml", "bs4"] = "auto"
+    # Parse marketplace pages in a pool of this many workers instead of on the
+    # event loop. 0 disables the pool. `parse_executor` is "process" or "thread".
+    parse_workers: int = 0
+    parse_executor: Literal["process", "thread"] = "process"
+    # Token-bucket pacing (requests per minute) for the Discogs API and for
+    # marketplace scrapes. 0 leaves scrapes unpaced.
+    api_requests_per_minute: int = 60
+    scrape_requests_per_minute: int = 0
+    # Seconds to reuse a /marketplace/stats result: `stats_ttl` normally,
+    # `stats_dormant_ttl` when nothing is for sale or it's far over threshold.
+    # 0 (the defaults) always asks.
+    stats_ttl: int = 0
+    stats_dormant_ttl: int = 0
+    # Alert delivery: concurrent senders, queue bound, and tries per alert.
+    alert_workers: int = 2
+    alert_queue_size: int = 100
+    alert_max_attempts: int = 3
+    # Coalesce alerts: "off", "release" (one per release) or "all" (one per
+    # check), holding listings up to `digest_window` seconds (0: one iteration).
+    digest: Literal["off", "release", "all"] = "off"
+    digest_window: int = 0
+    # Give each release its own polling interval, between these bounds (seconds),
+    # adapted to how busy its marketplace page is. Off (the default): every
+    # release every iteration.
+    adaptive_schedule: bool = False
+    min_poll_interval: int = 60
+    max_poll_interval: int = 3600
+    # Split the loop across processes: "standalone" (everything in this one),
+    # "coordinator" (schedule releases onto `work_queue`) or "worker" (check
+    # the releases queued there). `work_queue` is a URL, e.g. "sqlite:///q.db".
+    role: Literal["standalone", "coordinator", "worker"] = "standalone"
+    work_queue: Optional[str] = None
     verbose: bool = False
     log_level: str = "INFO"
 
@@ -194,6 +273,23 @@ _ENV_OVERRIDES = {
     "DA_STATS_GATE": "runtime.stats_gate",
     "DA_MAX_CONCURRENCY": "runtime.max_concurrency",
     "DA_PRUNE_AFTER_DAYS": "runtime.prune_after_days",
+    "DA_PARSER": "runtime.parser",
+    "DA_PARSE_WORKERS": "runtime.parse_workers",
+    "DA_PARSE_EXECUTOR": "runtime.parse_executor",
+    "DA_API_REQUESTS_PER_MINUTE": "runtime.api_requests_per_minute",
+    "DA_SCRAPE_REQUESTS_PER_MINUTE": "runtime.scrape_requests_per_minute",
+    "DA_STATS_TTL": "runtime.stats_ttl",
+    "DA_STATS_DORMANT_TTL": "runtime.stats_dormant_ttl",
+    "DA_ALERT_WORKERS": "runtime.alert_workers",
+    "DA_ALERT_QUEUE_SIZE": "runtime.alert_queue_size",
+    "DA_ALERT_MAX_ATTEMPTS": "runtime.alert_max_attempts",
+    "DA_DIGEST": "runtime.digest",
+    "DA_DIGEST_WINDOW": "runtime.digest_window",
+    "DA_ADAPTIVE_SCHEDULE": "runtime.adaptive_schedule",
+    "DA_MIN_POLL_INTERVAL": "runtime.min_poll_interval",
+    "DA_MAX_POLL_INTERVAL": "runtime.max_poll_interval",
+    "DA_ROLE": "runtime.role",
+    "DA_WORK_QUEUE": "runtime.work_queue",
     "DA_LOG_LEVEL": "runtime.log_level",
 }
 
@@ -0,0 +1,114 @@
+"""Cross-user release dedup: each unique release scraped once per cycle.
+
+Wantlists overlap heavily — a classic pressing can be on dozens of them — and
+with every tenant (see `da_tenants`) scraping its own wantlist, a release is
+fetched once per subscriber. In multi-tenant mode the runner instead checks
+the tenants in cycles: every tenant due for a check runs its loop iteration
+at the same time, through one `ReleaseCoordinator`.
+
+The coordinator stands in for the ``AnonClient`` those iterations would
+use. The first subscriber to ask for a release in a cycle fetches and parses
+its ``/sell/release/{id}`` page; every other subscriber asking for it in the
+same cycle waits on that fetch and then evaluates the same parsed rows
+against its own filters (`loop.process_release` runs `filter_batch` per
+subscriber as usual). Scrapes per cycle therefore drop from the sum of the
+due wantlists to the size of their union; releases a subscriber's stats gate
+rules out aren't requested at all.
+
+The shared rows are immutable `ListingRecord`s. A subscriber only promotes the
+rows it's going to alert on to `Listing` objects, its own, which it converts
+to its currency in place.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, Hashable, List, Optional, Set
+
+from discogs_alert import client as da_client, entities as da_entities
+
+logger = logging.getLogger(__name__)
+
+
+class ReleaseCoordinator:
+    """Per-cycle, once-per-release access to a shared ``AnonClient``.
+
+    Intended use, once per cycle:
+
+        coordinator.begin_cycle()
+        await asyncio.gather(*(loop(..., client_anon=coordinator) for each subscriber))
+        coordinator.end_cycle()
+
+    Args:
+        client: the ``AnonClient`` pages are fetched through. It's left open.
+    """
+
+    def __init__(self, client: da_client.AnonClient) -> None:
+        self.client = client
+        # This cycle's fetches, by release: the page's cache entry, or None if
+        # it couldn't be fetched.
+        self._fetches: Dict[int, asyncio.Task] = {}
+        # Releases to drop from the client's page cache once the cycle's over.
+        self._forgotten: Set[int] = set()
+        self.requests = 0
+
+    @property
+    def fetched(self) -> int:
+        """Unique releases fetched this cycle."""
+
+        return len(self._fetches)
+
+    def begin_cycle(self) -> None:
+        self._fetches = {}
+        self._forgotten = set()
+        self.requests = 0
+
+    def end_cycle(self) -> None:
+        if self.requests:
+            logger.info(
+                "cycle fetched %d unique release(s) for %d subscriber request(s)", self.fetched, self.requests
+            )
+        for release_id in self._forgotten:
+            self.client.forget_page(release_id)
+        self._fetches = {}
+        self._forgotten = set()
+
+    async def get_marketplace_records(
+        self,
+        release_id: int,
+        skip_if_unchanged: bool = False,
+        context: Hashable = None,
+    ) -> Optional[List[da_entities.ListingRecord]]:
+        """Same contract as `AnonClient.get_marketplace_records`, but the page
+        is fetched at most once this cycle.
+        """
+
+        self.requests += 1
+        task = self._fetches.get(release_id)
+        if task is None:
+            task = asyncio.ensure_future(self.client.fetch_page(release_id))
+            self._fetches[release_id] = task
+        entry = await asyncio.shield(task)
+        if entry is None:
+            return []
+        return entry.records(skip_if_unchanged, context)
+
+    async def get_marketplace_listings(
+        self,
+        release_id: int,
+        skip_if_unchanged: bool = False,
+        context: Hashable = None,
+    ) -> Optional[da_entities.Listings]:
+        """`get_marketplace_records`, promoted to `Listing`s."""
+
+        records = await self.get_marketplace_records(release_id, skip_if_unchanged, context)
+        return None if records is None else [record.to_listing() for record in records]
+
+    def forget_page(self, release_id: int) -> None:
+        """Drop the cached page at the end of the cycle, so every subscriber
+        sees it as changed next cycle (this cycle's fetch stands, for the
+        subscribers yet to read it too).
+        """
+
+        self._forgotten.add(release_id)
@@ -0,0 +1,146 @@
+"""Coalescing alerts into digests.
+
+When a popular release restocks, a dozen listings can qualify in the same
+iteration, and one notification per listing runs straight into Pushbullet's
+and Telegram's rate limits (see `alert._response.log_alerter_failure`). In
+digest mode `loop.process_release` hands qualifying listings to a
+`DigestBuffer` instead of alerting on each one, and the loop turns the buffer
+into one notification per release (``"release"``) or one per user
+(``"all"``) once the digest window has passed.
+
+Each digest is a single durable-outbox entry covering all of its listings
+(`AlertStore.enqueue_alert` takes any number), so every coalesced listing is
+recorded in the `AlertStore` when the digest is delivered. Digests are built
+per alert channel (see `discogs_alert.channels`), from the listings routed to
+it.
+
+With a ``window`` of 0 the buffer is drained at the end of every iteration.
+With a longer window a runner keeps one buffer across iterations, and a
+group is sent at the end of the first iteration at least ``window`` seconds
+after its oldest listing was buffered. Buffered listings are held out of the
+release's listing snapshot until then, so if the process stops first they're
+simply evaluated again after the restart.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import time
+from typing import Callable, Dict, List, Tuple
+
+from discogs_alert import state as da_state
+
+DIGEST_MODES = ("off", "release", "all")
+
+
+@dataclasses.dataclass
+class DigestItem:
+    listing_id: int
+    release_id: int
+    release_title: str
+    price: str
+    url: str
+    buffered_at: float
+    channel: str = da_state.DEFAULT_CHANNEL
+
+
+@dataclasses.dataclass
+class Digest:
+    """One coalesced notification for `channel` and the ``(listing_id,
+    release_id)`` pairs it covers.
+    """
+
+    title: str
+    body: str
+    listings: List[Tuple[int, int]]
+    channel: str = da_state.DEFAULT_CHANNEL
+
+
+class DigestBuffer:
+    """Qualifying listings waiting to be sent as digests.
+
+    Args:
+        mode: ``"release"`` for one digest per release, ``"all"`` for a single
+            digest covering every release.
+        window: seconds a group of listings is held before it's sent.
+        clock: time source (overridable for tests).
+    """
+
+    def __init__(self, mode: str, window: float = 0, clock: Callable[[], float] = time.monotonic) -> None:
+        if mode not in DIGEST_MODES or mode == "off":
+            raise ValueError(f"Unknown digest mode {mode!r}; available: {list(DIGEST_MODES[1:])}")
+        if window < 0:
+            raise ValueError("window must be non-negative")
+        self.mode = mode
+        self.window = float(window)
+        self._clock = clock
+        # Keyed by (listing_id, channel).
+        self._items: Dict[Tuple[int, str], DigestItem] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, listing_id: object) -> bool:
+        """Whether `listing_id` is buffered for any channel."""
+
+        return any(key[0] == listing_id for key in self._items)
+
+    def add(
+        self,
+        listing_id: int,
+        release_id: int,
+        release_title: str,
+        price: str,
+        url: str,
+        channel: str = da_state.DEFAULT_CHANNEL,
+    ) -> None:
+        """Buffer a qualifying listing for `channel` (a listing already buffered
+        for it keeps its place).
+        """
+
+        key = (listing_id, channel)
+        if key not in self._items:
+            self._items[key] = DigestItem(listing_id, release_id, release_title, price, url, self._clock(), channel)
+
+    def drain(self, force: bool = False) -> List[Digest]:
+        """Remove and return the digests whose window has passed (all of them
+        with `force`), oldest first.
+        """
+
+        groups: Dict[Tuple[str, object], List[DigestItem]] = {}
+        for item in self._items.values():
+            key = (item.channel, item.release_id if self.mode == "release" else None)
+            groups.setdefault(key, []).append(item)
+        now = self._clock()
+        digests: List[Digest] = []
+        for items in sorted(groups.values(), key=lambda group: group[0].buffered_at):
+            if not force and now - items[0].buffered_at < self.window:
+                continue
+            for item in items:
+                del self._items[(item.listing_id, item.channel)]
+            digests.append(_format(items))
+        return digests
+
+
+def _format(items: List[DigestItem]) -> Digest:
+    listings = [(item.listing_id, item.release_id) for item in items]
+    if len(items) == 1:
+        # Same wording as an un-coalesced alert.
+        item = items[0]
+        return Digest(
+            f"Now For Sale: {item.release_title}", f"Listing available: {item.url}", listings, item.channel
+        )
+
+    by_release: Dict[int, List[DigestItem]] = {}
+    for item in items:
+        by_release.setdefault(item.release_id, []).append(item)
+    if len(by_release) == 1:
+        title = f"Now For Sale: {items[0].release_title} ({len(items)} listings)"
+        body = "\n".join(f"{item.price} — {item.url}" for item in items)
+    else:
+        title = f"Now For Sale: {len(items)} listings across {len(by_release)} releases"
+        body = "\n\n".join(
+            "\n".join([group[0].release_title] + [f"{item.price} — {item.url}" for item in group])
+            for group in by_release.values()
+        )
+    return Digest(title, body, listings, items[0].channel)
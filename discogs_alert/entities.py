@@ -20,7 +20,7 @@ Construction: ``Release.model_validate(dict)`` (replaces
 from __future__ import annotations
 
 import enum
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
 
 from pydantic import BaseModel, ConfigDict
 
@@ -185,10 +185,115 @@ class Listing(_Base):
         self.price = self.price.convert_currency(new_currency)
         return self
 
+    def as_tuple(self) -> "ListingRecord":
+        """Flatten into a `ListingRecord` — the compact shape listings are
+        scraped, cached and filtered in (see `ListingRecord`).
+        """
+
+        shipping = self.price.shipping
+        return ListingRecord(
+            self.id,
+            self.availability,
+            int(self.media_condition),
+            int(self.sleeve_condition),
+            self.comment,
+            self.seller_num_ratings,
+            self.seller_avg_rating,
+            self.seller_ships_from,
+            self.price.currency,
+            self.price.value,
+            None if shipping is None else shipping.currency,
+            None if shipping is None else shipping.value,
+        )
+
+    @classmethod
+    def from_tuple(cls, row: "ListingTuple") -> "Listing":
+        """Inverse of `as_tuple`. Uses ``model_construct`` (no validation): the
+        tuple was produced from an already-validated `Listing`, or by the
+        scraper, which builds each field with its final type.
+        """
+
+        (
+            listing_id, availability, media_condition, sleeve_condition, comment,
+            seller_num_ratings, seller_avg_rating, seller_ships_from,
+            currency, value, shipping_currency, shipping_value,
+        ) = row
+        shipping = None
+        if shipping_currency is not None:
+            shipping = ShippingPrice.model_construct(currency=shipping_currency, value=shipping_value)
+        return cls.model_construct(
+            id=listing_id,
+            availability=availability,
+            media_condition=CONDITION(media_condition),
+            sleeve_condition=CONDITION(sleeve_condition),
+            comment=comment,
+            seller_num_ratings=seller_num_ratings,
+            seller_avg_rating=seller_avg_rating,
+            seller_ships_from=seller_ships_from,
+            price=ListingPrice.model_construct(currency=currency, value=value, shipping=shipping),
+        )
+
 
 Listings = List[Listing]
 
 
+class ListingRecord(NamedTuple):
+    """A scraped listing as a plain tuple: what the scraper produces, the
+    `AnonClient` page cache holds and `loop.process_release` filters.
+
+    Building a pydantic `Listing` (and its nested `ListingPrice` and
+    `ShippingPrice`) for every row on every poll is wasted work when most
+    rows are filtered out straight away, so a record is only promoted with
+    `to_listing` once it's going to be alerted on. Records pickle cheaply,
+    too, which matters for the parse pool. Conditions are plain ints.
+    """
+
+    id: int
+    availability: Optional[str]
+    media_condition: int
+    sleeve_condition: int
+    comment: str
+    seller_num_ratings: int
+    seller_avg_rating: Optional[float]
+    seller_ships_from: str
+    currency: str
+    value: float
+    shipping_currency: Optional[str]
+    shipping_value: Optional[float]
+
+    @property
+    def url(self) -> str:
+        return f"https://www.discogs.com/sell/item/{self.id}"
+
+    def to_listing(self) -> Listing:
+        return Listing.from_tuple(self)
+
+    def in_currency(self, conversions: da_currency.ConversionTable) -> "ListingRecord":
+        """A copy with the price (and shipping) converted into the table's
+        currency. Raises like `ConversionTable.convert`.
+        """
+
+        shipping_currency, shipping_value = self.shipping_currency, self.shipping_value
+        if shipping_currency is not None:
+            shipping_currency, shipping_value = conversions.currency, conversions.convert(
+                shipping_value, shipping_currency
+            )
+        return self._replace(
+            currency=conversions.currency,
+            value=conversions.convert(self.value, self.currency),
+            shipping_currency=shipping_currency,
+            shipping_value=shipping_value,
+        )
+
+
+# (id, availability, media_condition, sleeve_condition, comment, seller_num_ratings,
+#  seller_avg_rating, seller_ships_from, price_currency, price_value,
+#  shipping_currency, shipping_value) — a `ListingRecord`, or a plain tuple in its shape.
+ListingTuple = Tuple[
+    int, Optional[str], int, int, str, int, Optional[float], str, str, float, Optional[str], Optional[float]
+]
+
+
 def conditions_satisfied(
     listing: Listing,
     release: Release,
@@ -20,18 +20,32 @@ import logging
 import random
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
 import httpx
 
-from discogs_alert import client as da_client, entities as da_entities, state as da_state
+from discogs_alert import (
+    batch as da_batch,
+    channels as da_channels,
+    client as da_client,
+    digest as da_digest,
+    entities as da_entities,
+    outbox as da_outbox,
+    scheduler as da_scheduler,
+    scrape as da_scrape,
+    state as da_state,
+    workqueue as da_workqueue,
+)
 from discogs_alert.alert import Alerter, get_alerter
-from discogs_alert.util import constants as dac, currency as da_currency
+from discogs_alert.util import constants as dac, currency as da_currency, rate_limit as da_rate_limit
 from discogs_alert.util.wantlist_directives import apply_directives
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_MAX_CONCURRENCY = 6
+# Cheapest copy at this multiple of the price threshold (or more): the release's
+# stats are cached for the client's dormant TTL.
+DORMANT_PRICE_RATIO = 2.0
 
 
 async def load_wantlist(
@@ -67,7 +81,10 @@ async def load_wantlist(
 
 
 def stats_skip_reason(
-    stats: da_entities.ReleaseStats, release: da_entities.Release, currency: str
+    stats: da_entities.ReleaseStats,
+    release: da_entities.Release,
+    currency: str,
+    conversions: Optional[da_currency.ConversionTable] = None,
 ) -> Optional[str]:
     """Return a human-readable reason to skip the marketplace scrape for a release based
     on its lightweight `/marketplace/stats/{release_id}` summary. ``None`` means "don't
@@ -78,14 +95,30 @@ def stats_skip_reason(
         return "no listings for sale"
     if stats.blocked_from_sale:
         return "release is blocked from sale"
-    if release.price_threshold is None or stats.lowest_price is None:
+    if release.price_threshold is None:
+        return None
+    lowest = _stats_lowest_price(stats, currency, conversions)
+    if lowest is not None and lowest > release.price_threshold:
+        return f"lowest price {lowest:.2f} {currency} > threshold {release.price_threshold}"
+    return None
+
+
+def _stats_lowest_price(
+    stats: da_entities.ReleaseStats,
+    currency: str,
+    conversions: Optional[da_currency.ConversionTable] = None,
+) -> Optional[float]:
+    """`stats.lowest_price` converted to `currency` (with `conversions`, if
+    given), or None if there isn't one or it can't be converted.
+    """
+
+    if stats.lowest_price is None:
         return None
     try:
-        # Currency conversion is sync (cheap when cached, rare when not). Run
-        # it in a thread when uncached so we don't block the event loop.
-        lowest = da_currency.convert_currency(
-            stats.lowest_price.value, stats.lowest_price.currency, currency
-        )
+        if conversions is None:
+            lowest = da_currency.convert_currency(stats.lowest_price.value, stats.lowest_price.currency, currency)
+        else:
+            lowest = conversions.convert(stats.lowest_price.value, stats.lowest_price.currency)
     except da_currency.InvalidCurrencyException:
         # Unknown stats currency: don't gate on price.
         return None
@@ -94,9 +127,53 @@ def stats_skip_reason(
         # scrape happen so we still notice listings.
         logger.warning("currency provider unreachable; skipping price gate", exc_info=True)
         return None
-    if lowest > release.price_threshold:
-        return f"lowest price {lowest:.2f} {currency} > threshold {release.price_threshold}"
-    return None
+    return lowest
+
+
+def evaluation_key(
+    release: da_entities.Release,
+    currency: str,
+    country: str,
+    seller_filters: da_entities.SellerFilters,
+    record_filters: da_entities.RecordFilters,
+    country_whitelist: Set[str],
+    country_blacklist: Set[str],
+    channels: Sequence[da_channels.Channel] = (),
+) -> str:
+    """A stable string identifying every input `process_release` judges a
+    listing by, other than the listing itself. If it changes (the user edited a
+    `@max=` directive, or added an alert channel, say), listings judged under
+    the old key must be judged again.
+    """
+
+    return json.dumps(
+        [
+            [[channel.name, channel.routing] for channel in sorted(channels, key=lambda channel: channel.name)],
+            release.min_media_condition,
+            release.min_sleeve_condition,
+            release.price_threshold,
+            currency,
+            country,
+            seller_filters.model_dump(mode="json"),
+            record_filters.model_dump(mode="json"),
+            sorted(country_whitelist),
+            sorted(country_blacklist),
+        ],
+        sort_keys=True,
+    )
+
+
+def price_key(record: da_entities.ListingRecord, currency: str, period: str) -> str:
+    """What a listing's verdict depends on besides the filters: its price and
+    shipping, plus the rates `period` (see `da_currency.rates_period`) when
+    either is in a currency other than `currency`. A listing whose price key
+    changes, a price cut or a new week's exchange rates, is judged again.
+    """
+
+    key = f"{record.value} {record.currency} {record.shipping_value} {record.shipping_currency}"
+    if record.currency != currency or (record.shipping_value is not None and record.shipping_currency != currency):
+        key += f" @{period}"
+    return key
 
 
 async def process_release(
@@ -108,50 +185,110 @@ async def process_release(
     record_filters: da_entities.RecordFilters,
     country_whitelist: Set[str],
     country_blacklist: Set[str],
-    alerter: Alerter,
+    outbox: da_outbox.AlertOutbox,
     store: da_state.AlertStore,
     verbose: bool = False,
+    scheduler: Optional[da_scheduler.ReleaseScheduler] = None,
+    digest: Optional[da_digest.DigestBuffer] = None,
+    channels: Sequence[Tuple[da_channels.Channel, da_outbox.AlertOutbox]] = (),
+    conversions: Optional[da_currency.ConversionTable] = None,
 ) -> int:
-    """Find listings for a single release that satisfy the user's filters,
-    alert on them if we haven't already, and record successful alerts in the
-    local store. Returns the number of new alerts sent.
+    """Find listings for a single release that satisfy the user's filters and
+    queue alerts on them if we haven't already. Returns the number of new
+    alerts queued (or buffered).
+
+    Each alert is written to the store's durable outbox and queued on
+    `outbox` (or, if that's full, left for the channel's retrier); the
+    outbox's callbacks then record delivery (see `loop`). Listings already
+    alerted on, or with an alert waiting in the durable outbox, are skipped.
+
+    With a `digest`, qualifying listings are buffered there instead of alerted
+    on one by one; `loop` later sends them as coalesced digests. Buffered
+    listings are held out of the snapshot until then.
+
+    `channels` are extra alert channels, each paired with its own outbox.
+    Each qualifying listing also goes to every channel whose predicate accepts
+    it and that hasn't been alerted about it yet (dedup is per channel).
+
+    If the release's marketplace page hasn't changed since we last fully
+    processed it under the same filters (and rates period), the whole pipeline
+    is skipped. When it has changed, only listings missing from the store's
+    snapshot of this release, or whose `price_key` has changed since, are
+    evaluated, together, as one `da_batch.ListingBatch`. Either way the
+    `scheduler`, if given, learns whether the release's listings churned.
+
+    Prices are converted into `currency` with `conversions` (`loop` builds
+    one per iteration), without touching the shared listing records.
     """
 
-    new_alerts = 0
-    listings = await client_anon.get_marketplace_listings(release.id)
-    for listing in listings:
-        try:
-            listing = listing.convert_currency(currency)
-        except Exception:
-            logger.warning("Currency conversion failed; continuing without.", exc_info=True)
-
-        if listing.is_definitely_unavailable(country):
-            if verbose:
-                logger.info(
-                    "Listing found that's unavailable in %s:\n\tRelease: %s\n\tListing: %s",
-                    country, release.display_title, listing.url,
-                )
+    # Listings whose price couldn't be converted, so have no definitive
+    # verdict. They're left out of the snapshot, and the page isn't skipped
+    # as "unchanged" next time, so they get evaluated again.
+    unsettled: Set[int] = set()
+    key = evaluation_key(
+        release, currency, country, seller_filters, record_filters, country_whitelist, country_blacklist,
+        [channel for channel, _channel_outbox in channels],
+    )
+    period = da_currency.rates_period()
+    # The store is part of the context: a client shared between users (see
+    # `da_tenants`) mustn't skip a page for one user because another, with
+    # the same filters, has already acted on it. So is the rates period, so
+    # that prices in other currencies are judged again at new rates.
+    records = await client_anon.get_marketplace_records(
+        release.id, skip_if_unchanged=True, context=(store.path, key, period)
+    )
+    if records is None:
+        if verbose:
+            logger.info("Marketplace page for %s unchanged since last check; skipping", release.display_title)
+        if scheduler is not None:
+            scheduler.observe_listings(release.id, changed=False)
+        return 0
+    if conversions is None:
+        conversions = da_currency.ConversionTable(currency)
+    already_evaluated = store.listing_snapshot(release.id, key)
+    price_keys = {record.id: price_key(record, currency, period) for record in records}
+    fresh = [record for record in records if already_evaluated.get(record.id) != price_keys[record.id]]
+    batch = da_batch.ListingBatch.from_rows(fresh)
+    await conversions.ensure_loaded(batch.currencies)
+    verdicts = da_batch.filter_batch(
+        batch, release, currency, country,
+        seller_filters, record_filters, country_whitelist, country_blacklist, conversions,
+    )
+    unsettled.update(fresh[i].id for i in verdicts.unconverted)
+    candidates: da_entities.Listings = []
+    for i, (record, reason) in enumerate(zip(fresh, verdicts.reasons)):
+        if reason == da_batch.ACCEPTED:
+            # Only listings we might alert on become pydantic models.
+            if i not in verdicts.unconverted:
+                record = record.in_currency(conversions)
+            candidates.append(record.to_listing())
             continue
-
-        if not da_entities.conditions_satisfied(
-            listing, release, seller_filters, record_filters, country_whitelist, country_blacklist
-        ):
-            if verbose:
-                logger.info(
-                    "Listing found that doesn't satisfy conditions:\n\tRelease: %s\n\tListing: %s",
-                    release.display_title, listing.url,
-                )
-            continue
-
-        if listing.price.currency == currency and listing.price_is_above_threshold(release.price_threshold):
-            if verbose:
-                logger.info(
-                    "Listing found that's above the price threshold:\n\tRelease: %s\n\tListing: %s",
-                    release.display_title, listing.url,
-                )
-            continue
-
-        if store.has_seen(listing.id):
+        if verbose:
+            problem = {
+                da_batch.UNAVAILABLE: f"that's unavailable in {country}",
+                da_batch.CONDITIONS: "that doesn't satisfy conditions",
+                da_batch.ABOVE_THRESHOLD: "that's above the price threshold",
+            }[reason]
+            logger.info(
+                "Listing found %s:\n\tRelease: %s\n\tListing: %s", problem, release.display_title, record.url
+            )
+
+    candidate_ids = [listing.id for listing in candidates]
+    already_alerted = store.has_seen_many(candidate_ids) | store.pending_many(candidate_ids)
+    channel_alerted = {
+        channel.name: store.has_seen_many(candidate_ids, channel.name) | store.pending_many(candidate_ids, channel.name)
+        for channel, _channel_outbox in channels
+    }
+    queued = 0
+    held: Set[int] = set()
+    for listing in candidates:
+        to_main = listing.id not in already_alerted
+        to_channels = [
+            (channel, channel_outbox)
+            for channel, channel_outbox in channels
+            if listing.id not in channel_alerted[channel.name] and channel.accepts(listing, release)
+        ]
+        if not to_main and not to_channels:
             if verbose:
                 logger.info("Listing %s for %s already alerted; skipping", listing.id, release.display_title)
             continue
@@ -159,13 +296,45 @@ async def process_release(
         message_title = f"Now For Sale: {release.display_title}"
         message_body = f"Listing available: {listing.url}"
         price_string = f"{dac.CURRENCIES_REVERSED[listing.price.currency]}{listing.total_price:.2f}"
+        if digest is not None:
+            if verbose and listing.id not in digest:
+                logger.info("Buffering listing %s for %s for the next digest", listing.id, release.display_title)
+            targets = ([da_state.DEFAULT_CHANNEL] if to_main else []) + [channel.name for channel, _ in to_channels]
+            for channel_name in targets:
+                digest.add(listing.id, release.id, release.display_title, price_string, listing.url, channel_name)
+            held.add(listing.id)
+            continue
         logger.info("%s (%s) — %s", message_title, price_string, message_body)
-        # Alerters are sync (HTTP calls inside, but rare and serial). If they
-        # become a bottleneck, wrap in `asyncio.to_thread`.
-        if alerter.send_alert(message_title, message_body):
-            store.mark_seen(listing.id, release.id, message_title, message_body)
-            new_alerts += 1
-    return new_alerts
+        pair = [(listing.id, release.id)]
+        queues = [(channel.name, channel_outbox) for channel, channel_outbox in to_channels]
+        if to_main:
+            queues.insert(0, (da_state.DEFAULT_CHANNEL, outbox))
+        for channel_name, target in queues:
+            outbox_id = store.enqueue_alert(
+                message_title, message_body, pair, lease_seconds=da_outbox.OUTBOX_LEASE_SECONDS, channel=channel_name
+            )
+            if outbox_id is None:
+                continue
+            queued += 1
+            # Never wait on a backed-up channel while holding a scrape slot;
+            # the alert is in the durable outbox, so its retrier can have it.
+            if not target.offer(da_outbox.PendingAlert(message_title, message_body, pair, outbox_id=outbox_id)):
+                logger.info("Outbox for channel %r is full; leaving %r to its retrier", channel_name, message_title)
+                store.defer_alert(outbox_id, 0, attempts=0)
+
+    evaluated = {
+        listing_id: listing_price_key
+        for listing_id, listing_price_key in price_keys.items()
+        if listing_id not in unsettled and listing_id not in held
+    }
+    departed = store.save_listing_snapshot(release.id, key, price_keys.keys(), evaluated)
+    if departed and verbose:
+        logger.info("%d listing(s) for %s disappeared since last check", len(departed), release.display_title)
+    if scheduler is not None:
+        scheduler.observe_listings(release.id, changed=bool(departed or fresh))
+    if unsettled:
+        client_anon.forget_page(release.id)
+    return queued + len(held)
 
 
 async def _gated_process_release(
@@ -179,13 +348,18 @@ async def _gated_process_release(
     record_filters: da_entities.RecordFilters,
     country_whitelist: Set[str],
     country_blacklist: Set[str],
-    alerter: Alerter,
+    outbox: da_outbox.AlertOutbox,
     store: da_state.AlertStore,
     use_stats_gate: bool,
     verbose: bool,
+    scheduler: Optional[da_scheduler.ReleaseScheduler] = None,
+    digest: Optional[da_digest.DigestBuffer] = None,
+    channels: Sequence[Tuple[da_channels.Channel, da_outbox.AlertOutbox]] = (),
+    conversions: Optional[da_currency.ConversionTable] = None,
 ) -> int:
     """One release end-to-end: optional /marketplace/stats gate, then a
-    semaphore-capped marketplace scrape if the gate doesn't skip.
+    semaphore-capped marketplace scrape if the gate doesn't skip. The stats
+    are passed on to the `scheduler`, if given.
     """
 
     if use_stats_gate:
@@ -194,7 +368,19 @@ async def _gated_process_release(
             if verbose:
                 logger.info("stats lookup failed for release %s; scraping anyway", release.id)
         else:
-            skip_reason = stats_skip_reason(stats, release, currency)
+            if conversions is not None and stats.lowest_price is not None:
+                await conversions.ensure_loaded([stats.lowest_price.currency])
+            lowest = _stats_lowest_price(stats, currency, conversions)
+            price_ratio = None
+            if lowest is not None and release.price_threshold:
+                price_ratio = lowest / release.price_threshold
+            if scheduler is not None:
+                scheduler.observe_stats(release.id, stats.num_for_sale, price_ratio)
+            if price_ratio is not None and price_ratio >= DORMANT_PRICE_RATIO:
+                # Far out of reach: a few new listings won't bring it under
+                # the threshold, so these stats can be reused for longer.
+                user_token_client.mark_release_stats_dormant(release.id)
+            skip_reason = stats_skip_reason(stats, release, currency, conversions)
             if skip_reason is not None:
                 if verbose:
                     logger.info(
@@ -207,10 +393,31 @@ async def _gated_process_release(
         return await process_release(
             release, client_anon, currency, country,
             seller_filters, record_filters, country_whitelist, country_blacklist,
-            alerter, store, verbose=verbose,
+            outbox, store, verbose=verbose, scheduler=scheduler, digest=digest, channels=channels,
+            conversions=conversions,
         )
 
 
+async def _send_digests(
+    digests: List[da_digest.Digest], store: da_state.AlertStore, outboxes: Dict[str, da_outbox.AlertOutbox]
+) -> None:
+    """Write each digest to the durable outbox and queue it on its channel's outbox."""
+
+    for digest in digests:
+        outbox_id = store.enqueue_alert(
+            digest.title,
+            digest.body,
+            digest.listings,
+            lease_seconds=da_outbox.OUTBOX_LEASE_SECONDS,
+            channel=digest.channel,
+        )
+        if outbox_id is None:
+            continue
+        logger.info("%s (digest of %d listing(s))", digest.title, len(digest.listings))
+        pending = da_outbox.PendingAlert(digest.title, digest.body, digest.listings, outbox_id=outbox_id)
+        await outboxes[digest.channel].put(pending)
+
+
 async def loop(
     discogs_token: str,
     list_id: Optional[int],
@@ -228,10 +435,29 @@ async def loop(
     use_stats_gate: bool = True,
     max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
     prune_after_days: int = 90,
+    parser_backend: str = da_scrape.DEFAULT_PARSER_BACKEND,
+    parse_workers: int = 0,
+    parse_executor: str = "process",
+    api_requests_per_minute: int = da_rate_limit.DEFAULT_API_REQUESTS_PER_MINUTE,
+    scrape_requests_per_minute: int = 0,
+    stats_ttl: float = da_client.DEFAULT_STATS_TTL,
+    stats_dormant_ttl: float = da_client.DEFAULT_STATS_DORMANT_TTL,
+    alert_workers: int = da_outbox.DEFAULT_WORKERS,
+    alert_queue_size: int = da_outbox.DEFAULT_QUEUE_SIZE,
+    alert_max_attempts: int = da_outbox.DEFAULT_MAX_ATTEMPTS,
+    digest_mode: str = "off",
+    digest_window: float = 0,
+    alert_channels: Sequence[da_channels.ChannelSpec] = (),
     user_token_client: Optional[da_client.UserTokenClient] = None,
     client_anon: Optional[da_client.AnonClient] = None,
+    scheduler: Optional[da_scheduler.ReleaseScheduler] = None,
+    alerter: Optional[Alerter] = None,
+    digest: Optional[da_digest.DigestBuffer] = None,
+    channels: Optional[List[da_channels.Channel]] = None,
+    work_queue: Optional[da_workqueue.WorkQueue] = None,
+    rates_provider: Optional[da_currency.RatesProvider] = None,
     verbose: bool = False,
-):
+) -> int:
     """One loop iteration. Async: fans out the per-release work via
     ``asyncio.gather`` with a semaphore that caps Cloudflare-facing parallelism.
 
@@ -239,74 +465,197 @@ async def loop(
     so that the long-lived process holding them survives across iterations.
     If they aren't passed, this function makes its own and closes them at the
     end — that path is fine for ``--once`` runs but inefficient for repeated
-    iterations.
+    iterations. The same goes for the ``alerter``: a caller that passes one
+    owns its `open` / `close` lifecycle (and so its kept-alive connections);
+    otherwise one is built from ``alerter_type`` / ``alerter_kwargs`` and
+    opened for this iteration only. Likewise the extra alert ``channels``,
+    built from ``alert_channels`` when not passed (see `da_channels`). And the
+    ``rates_provider`` prices are converted through: pass a long-lived one so
+    that currency rates stay cached (and are refreshed in the background)
+    between iterations.
+
+    Alerts go through an ``AlertOutbox``: ``alert_workers`` delivery tasks
+    drain a queue of at most ``alert_queue_size`` alerts, retrying each up to
+    ``alert_max_attempts`` times, while the scrapes carry on; every extra
+    channel gets an outbox of its own, so a slow one can't hold the others
+    up. Each alert is in the store's durable outbox until it's delivered, and
+    is recorded as seen the moment it is, before its lease can run out; one
+    that's still failing is left there for `da_outbox.run_retrier` or a later
+    iteration, which starts by re-queueing any that are due.
+
+    With ``digest_mode`` "release" or "all", qualifying listings are coalesced
+    into one alert per release, or one per iteration, instead (see
+    `da_digest`). A runner keeps a ``digest`` buffer across iterations to
+    honour a ``digest_window`` longer than one iteration; without one, this
+    iteration's digests are all sent before it ends.
+
+    Without a ``scheduler`` every release on the wantlist is checked, in random
+    order. With one, only the releases it says are due are checked (most
+    overdue first), and each is rescheduled afterwards from what was observed.
+
+    On a worker (see `da_workqueue`) the releases come from ``work_queue``
+    instead: up to ``max_concurrency`` claimed jobs, each completed with what
+    was observed while checking it.
+
+    Returns the number of releases checked.
     """
 
     start_time = time.time()
+    checked = 0
     if verbose:
         logger.info("running loop")
 
     own_clients = user_token_client is None and client_anon is None
     if own_clients:
-        client_anon = da_client.AnonClient(user_agent)
-        user_token_client = da_client.UserTokenClient(user_agent, discogs_token)
+        client_anon = da_client.AnonClient(
+            user_agent,
+            parser_backend=parser_backend,
+            parse_workers=parse_workers,
+            parse_executor=parse_executor,
+            requests_per_minute=scrape_requests_per_minute,
+        )
+        user_token_client = da_client.UserTokenClient(
+            user_agent,
+            discogs_token,
+            api_requests_per_minute,
+            stats_ttl=stats_ttl,
+            stats_dormant_ttl=stats_dormant_ttl,
+        )
 
+    own_rates_provider = rates_provider is None
+    if own_rates_provider:
+        rates_provider = da_currency.RatesProvider()
+    own_alerter = alerter is None
+    own_channels = channels is None
+    own_digest = digest is None
+    if own_digest and digest_mode != "off":
+        digest = da_digest.DigestBuffer(digest_mode, digest_window)
     try:
-        alerter = get_alerter(alerter_type, alerter_kwargs)
-        with da_state.AlertStore(state_path) as store:
-            if prune_after_days > 0:
-                pruned = store.prune_older_than(prune_after_days)
-                if pruned and verbose:
-                    logger.info(
-                        "pruned %d alert record(s) older than %d days from %s",
-                        pruned, prune_after_days, store.path,
-                    )
-            if verbose:
-                s = store.stats()
+        if own_alerter:
+            alerter = get_alerter(alerter_type, alerter_kwargs)
+            alerter.open()
+        if own_channels:
+            channels = da_channels.open_channels(alert_channels, get_alerter)
+        # Process-wide store: the connection outlives the iteration (see `da_state.shared_store`).
+        store = da_state.shared_store(state_path)
+        if prune_after_days > 0:
+            pruned = store.prune_older_than(prune_after_days)
+            if pruned and verbose:
                 logger.info(
-                    "alert store at %s: %d total (last 24h: %d, last 7d: %d)",
-                    store.path, s["total"], s["last_24h"], s["last_7d"],
+                    "pruned %d alert record(s) older than %d days from %s",
+                    pruned, prune_after_days, store.path,
                 )
+        if verbose:
+            s = store.stats()
+            logger.info(
+                "alert store at %s: %d total (last 24h: %d, last 7d: %d), seen cache %.1f KiB",
+                store.path, s["total"], s["last_24h"], s["last_7d"], s["seen_cache_bytes"] / 1024,
+            )
+        jobs: List[da_workqueue.Job] = []
+        if work_queue is not None:
+            # The coordinator did the scheduling; record what it needs to know.
+            jobs = work_queue.claim(max_concurrency)
+            wantlist_items = [job.release for job in jobs]
+            wantlist_size = len(wantlist_items)
+            observations = da_workqueue.Observations()
+            scheduler = observations
+        else:
             wantlist_items = await load_wantlist(list_id, user_token_client, wantlist_path)
-            random.shuffle(wantlist_items)
-            if verbose:
-                logger.info(
-                    "wantlist: %d releases, max_concurrency=%d, stats_gate=%s",
-                    len(wantlist_items), max_concurrency, use_stats_gate,
-                )
-
-            semaphore = asyncio.Semaphore(max_concurrency)
-            tasks = [
-                _gated_process_release(
-                    semaphore, release, user_token_client, client_anon, currency,
-                    country, seller_filters, record_filters,
-                    country_whitelist, country_blacklist, alerter, store,
-                    use_stats_gate, verbose,
+            wantlist_size = len(wantlist_items)
+            if scheduler is None:
+                random.shuffle(wantlist_items)
+            else:
+                scheduler.sync(release.id for release in wantlist_items)
+                by_id = {release.id: release for release in wantlist_items}
+                wantlist_items = [by_id[release_id] for release_id in scheduler.pop_due()]
+        if verbose:
+            logger.info(
+                "wantlist: %d releases (%d due), max_concurrency=%d, stats_gate=%s",
+                wantlist_size, len(wantlist_items), max_concurrency, use_stats_gate,
+            )
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        def _undelivered(alert: da_outbox.PendingAlert) -> None:
+            delay = da_outbox.retry_delay(alert.prior_attempts + alert.attempts)
+            store.defer_alert(alert.outbox_id, delay, attempts=alert.attempts)
+
+        def _outbox(channel_alerter: Alerter) -> da_outbox.AlertOutbox:
+            return da_outbox.AlertOutbox(
+                channel_alerter,
+                on_delivered=lambda alert: store.complete_alert(alert.outbox_id),
+                on_failed=_undelivered,
+                on_attempt=lambda alert: store.renew_lease(
+                    alert.outbox_id, alert.lease, da_outbox.OUTBOX_LEASE_SECONDS
+                ),
+                workers=alert_workers,
+                queue_size=alert_queue_size,
+                max_attempts=alert_max_attempts,
+            )
+
+        outbox = _outbox(alerter)
+        routes = [(channel, _outbox(channel.alerter)) for channel in channels]
+        outboxes = {da_state.DEFAULT_CHANNEL: outbox, **{channel.name: o for channel, o in routes}}
+        # One set of rates for every price this iteration.
+        conversions = da_currency.ConversionTable(currency, provider=rates_provider)
+        tasks = [
+            _gated_process_release(
+                semaphore, release, user_token_client, client_anon, currency,
+                country, seller_filters, record_filters,
+                country_whitelist, country_blacklist, outbox, store,
+                use_stats_gate, verbose, scheduler, digest, routes, conversions,
+            )
+            for release in wantlist_items
+        ]
+        for channel_outbox in outboxes.values():
+            channel_outbox.start()
+        try:
+            try:
+                for channel_name, channel_outbox in outboxes.items():
+                    due = store.claim_due_alerts(alert_queue_size, da_outbox.OUTBOX_LEASE_SECONDS, channel_name)
+                    for entry in due:
+                        await channel_outbox.put(da_outbox.PendingAlert.from_entry(entry))
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                if digest is not None:
+                    await _send_digests(digest.drain(force=own_digest), store, outboxes)
+            finally:
+                await asyncio.gather(*(channel_outbox.close() for channel_outbox in outboxes.values()))
+        finally:
+            if work_queue is not None:
+                for job in jobs:
+                    work_queue.complete(job.id, observations.pop(job.release.id))
+            elif scheduler is not None:
+                for release in wantlist_items:
+                    scheduler.reschedule(release.id)
+        checked = len(wantlist_items)
+        for release, result in zip(wantlist_items, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    "Release %s (%s) raised: %r",
+                    release.id, release.display_title, result,
                 )
-                for release in wantlist_items
-            ]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            new_alerts_total = 0
-            for release, result in zip(wantlist_items, results):
-                if isinstance(result, Exception):
-                    logger.warning(
-                        "Release %s (%s) raised: %r",
-                        release.id, release.display_title, result,
-                    )
-                else:
-                    new_alerts_total += result
-            if verbose:
-                logger.info("loop iteration sent %d new alert(s)", new_alerts_total)
+        if verbose:
+            logger.info(
+                "loop iteration delivered %d new alert(s) (%d failed)",
+                sum(o.delivered for o in outboxes.values()), sum(o.failed for o in outboxes.values()),
+            )
 
     except (httpx.NetworkError, httpx.TimeoutException):
         logger.info("Network error: looping will continue as usual", exc_info=True)
     except Exception:
         logger.exception("Unexpected exception in loop; continuing")
     finally:
+        if own_alerter and alerter is not None:
+            alerter.close()
+        if own_channels and channels:
+            da_channels.close_channels(channels)
         if own_clients:
             if client_anon is not None:
                 await client_anon.aclose()
             if user_token_client is not None:
                 await user_token_client.aclose()
+        if own_rates_provider:
+            await rates_provider.aclose()
 
     logger.info("\t took %.2fs", time.time() - start_time)
+    return checked
@@ -22,16 +22,21 @@ import logging
 import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from discogs_alert import (
+    channels as da_channels,
     client as da_client,
     config as da_config,
+    digest as da_digest,
     entities as da_entities,
     loop as da_loop,
+    outbox as da_outbox,
+    scheduler as da_scheduler,
     state as da_state,
 )
-from discogs_alert.util import constants as dac
+from discogs_alert.alert import Alerter
+from discogs_alert.util import constants as dac, currency as da_currency
 
 logger = logging.getLogger(__name__)
 
@@ -103,26 +108,6 @@ class MenubarController:
         """
 
         cfg = self.cfg
-        alerter_kwargs: dict = {}
-        if cfg.alerter.type.upper() == "PUSHBULLET":
-            alerter_kwargs = {"pushbullet_token": cfg.alerter.pushbullet.token}
-        elif cfg.alerter.type.upper() == "TELEGRAM":
-            alerter_kwargs = {
-                "telegram_token": cfg.alerter.telegram.token,
-                "telegram_chat_id": cfg.alerter.telegram.chat_id,
-            }
-        elif cfg.alerter.type.upper() == "NTFY":
-            alerter_kwargs = {
-                "ntfy_topic": cfg.alerter.ntfy.topic,
-                "ntfy_server": cfg.alerter.ntfy.server,
-                "ntfy_token": cfg.alerter.ntfy.token,
-            }
-        elif cfg.alerter.type.upper() == "GMAIL":
-            alerter_kwargs = {
-                "gmail_user": cfg.alerter.gmail.user,
-                "gmail_app_password": cfg.alerter.gmail.app_password,
-                "gmail_to": cfg.alerter.gmail.to,
-            }
         return dict(
             discogs_token=cfg.discogs_token,
             list_id=cfg.wantlist.list_id,
@@ -141,11 +126,27 @@ class MenubarController:
             country_whitelist=set(dac.COUNTRIES[c] for c in cfg.country_filters.whitelist),
             country_blacklist=set(dac.COUNTRIES[c] for c in cfg.country_filters.blacklist),
             alerter_type=cfg.alerter.type.upper(),
-            alerter_kwargs=alerter_kwargs,
+            alerter_kwargs=cfg.alerter.kwargs_for(cfg.alerter.type),
+            alert_channels=[
+                da_channels.ChannelSpec(c.key, c.type.upper(), cfg.alerter.kwargs_for(c.type), c.max_price_ratio)
+                for c in cfg.alerter.channels
+            ],
             state_path=cfg.runtime.state_path,
             use_stats_gate=cfg.runtime.stats_gate,
             max_concurrency=cfg.runtime.max_concurrency,
             prune_after_days=cfg.runtime.prune_after_days,
+            parser_backend=cfg.runtime.parser,
+            parse_workers=cfg.runtime.parse_workers,
+            parse_executor=cfg.runtime.parse_executor,
+            api_requests_per_minute=cfg.runtime.api_requests_per_minute,
+            scrape_requests_per_minute=cfg.runtime.scrape_requests_per_minute,
+            stats_ttl=cfg.runtime.stats_ttl,
+            stats_dormant_ttl=cfg.runtime.stats_dormant_ttl,
+            alert_workers=cfg.runtime.alert_workers,
+            alert_queue_size=cfg.runtime.alert_queue_size,
+            alert_max_attempts=cfg.runtime.alert_max_attempts,
+            digest_mode=cfg.runtime.digest,
+            digest_window=cfg.runtime.digest_window,
             verbose=cfg.runtime.verbose,
         )
 
@@ -153,18 +154,27 @@ class MenubarController:
         self,
         user_token_client: da_client.UserTokenClient,
         anon_client: da_client.AnonClient,
+        scheduler: Optional[da_scheduler.ReleaseScheduler] = None,
+        alerter: Optional[Alerter] = None,
+        digest: Optional[da_digest.DigestBuffer] = None,
+        channels: Optional[List[da_channels.Channel]] = None,
+        rates_provider: Optional[da_currency.RatesProvider] = None,
     ) -> None:
         await da_loop.loop(
             **self._build_loop_kwargs(),
             user_token_client=user_token_client,
             client_anon=anon_client,
+            scheduler=scheduler,
+            alerter=alerter,
+            digest=digest,
+            channels=channels,
+            rates_provider=rates_provider,
         )
         with self._lock:
             self.last_check_at = datetime.now()
             self.last_error = None
             try:
-                with da_state.AlertStore(self.cfg.runtime.state_path) as store:
-                    s = store.stats()
+                s = da_state.shared_store(self.cfg.runtime.state_path).stats()
                 self.last_alerts_24h = s["last_24h"]
                 self.last_alerts_total = s["total"]
             except Exception:
@@ -174,9 +184,11 @@ class MenubarController:
         """The async main loop the worker thread runs.
 
         Two ways out of the inter-iteration sleep:
-        1. The interval expires (normal cadence).
+        1. The interval expires (normal cadence), or — with the adaptive
+           schedule on — the next release falls due, if that's sooner.
         2. ``self._tick_event`` fires — set via ``check_now()`` from the
-           AppKit thread when the user clicks "Check now".
+           AppKit thread when the user clicks "Check now". That makes every
+           release due, so the check covers the whole wantlist.
         """
 
         interval_seconds = max(1, int(3600 / self.cfg.frequency))
@@ -184,13 +196,53 @@ class MenubarController:
         self._asyncio_loop = asyncio.get_running_loop()
         self._tick_event = asyncio.Event()
         user_token_client = da_client.UserTokenClient(
-            self.cfg.user_agent, self.cfg.discogs_token
+            self.cfg.user_agent,
+            self.cfg.discogs_token,
+            self.cfg.runtime.api_requests_per_minute,
+            stats_ttl=self.cfg.runtime.stats_ttl,
+            stats_dormant_ttl=self.cfg.runtime.stats_dormant_ttl,
         )
-        anon_client = da_client.AnonClient(self.cfg.user_agent)
+        anon_client = da_client.AnonClient(
+            self.cfg.user_agent,
+            parser_backend=self.cfg.runtime.parser,
+            parse_workers=self.cfg.runtime.parse_workers,
+            parse_executor=self.cfg.runtime.parse_executor,
+            requests_per_minute=self.cfg.runtime.scrape_requests_per_minute,
+        )
+        rates_provider = da_currency.RatesProvider()
+        scheduler = None
+        if self.cfg.runtime.adaptive_schedule:
+            scheduler = da_scheduler.ReleaseScheduler(
+                self.cfg.runtime.min_poll_interval, self.cfg.runtime.max_poll_interval
+            )
+        digest = None
+        if self.cfg.runtime.digest != "off" and self.cfg.runtime.digest_window > 0:
+            digest = da_digest.DigestBuffer(self.cfg.runtime.digest, self.cfg.runtime.digest_window)
+        # Without an alerter of our own, each iteration opens (or fails to
+        # open, and reports) its own.
+        alerter: Optional[Alerter] = None
+        channels: Optional[List[da_channels.Channel]] = None
+        retriers: List[asyncio.Task] = []
         try:
+            loop_kwargs = self._build_loop_kwargs()
+            try:
+                alerter, channels = da_channels.open_alerters(
+                    loop_kwargs["alerter_type"], loop_kwargs["alerter_kwargs"], loop_kwargs["alert_channels"]
+                )
+            except Exception as exc:
+                logger.exception("opening the alerter failed")
+                with self._lock:
+                    self.last_error = repr(exc)
+            else:
+                retriers = [da_outbox.start_retrier(self.cfg.runtime.state_path, alerter)] + [
+                    da_outbox.start_retrier(self.cfg.runtime.state_path, channel.alerter, channel=channel.name)
+                    for channel in channels
+                ]
             while not self._stop_event.is_set():
                 try:
-                    await self._run_one_iteration(user_token_client, anon_client)
+                    await self._run_one_iteration(
+                        user_token_client, anon_client, scheduler, alerter, digest, channels, rates_provider
+                    )
                 except Exception as exc:
                     logger.exception("iteration failed")
                     with self._lock:
@@ -198,13 +250,25 @@ class MenubarController:
                 # Sleep until either the interval expires or someone sets
                 # the tick event from another thread (e.g. "Check now").
                 try:
-                    await asyncio.wait_for(self._tick_event.wait(), timeout=interval_seconds)
+                    await asyncio.wait_for(
+                        self._tick_event.wait(), timeout=da_scheduler.sleep_seconds(interval_seconds, scheduler)
+                    )
+                    if scheduler is not None:
+                        scheduler.expedite()
                 except asyncio.TimeoutError:
                     pass
                 self._tick_event.clear()
         finally:
+            for retrier in retriers:
+                await da_outbox.stop_retrier(retrier)
+            if channels:
+                da_channels.close_channels(channels)
+            if alerter is not None:
+                alerter.close()
             await anon_client.aclose()
             await user_token_client.aclose()
+            await rates_provider.aclose()
+            da_state.close_shared_stores()
 
     def check_now(self) -> bool:
         """Threadsafe: poke the worker thread to skip the rest of its sleep
@@ -0,0 +1,320 @@
+"""Asynchronous alert delivery.
+
+Sending an alert means an HTTP call (ntfy, Telegram, Pushbullet) or an SMTP
+handshake (Gmail) — tens of milliseconds to several seconds, and it used to
+happen inline in `loop.process_release`, stalling that release's scrape slot
+(and, for the synchronous alerters, the whole event loop) until it finished.
+
+An `AlertOutbox` decouples the two: `process_release` enqueues a
+`PendingAlert` and moves on, and a small pool of delivery workers drains the
+queue through `Alerter.send_alert_async`, retrying failures with exponential
+backoff. Only once an alert is confirmed delivered does the outbox hand it to
+its `on_delivered` callback (which records it in the `AlertStore`); alerts
+that exhaust their retries go to `on_failed` instead, which leaves them in the
+durable outbox (below) for a later attempt.
+
+The queue is bounded: if delivery falls far behind, `put` waits for room
+rather than letting undelivered alerts pile up in memory, and `offer` turns the
+alert away so that the caller (which has already written it to the durable
+outbox) can leave it to the retrier instead of waiting on one slow channel.
+
+The queue itself is in memory, but `loop` writes each alert to the state DB's
+durable outbox (`AlertStore.enqueue_alert`) before queueing it. An alert that's
+still undelivered when its retries run out — or when the process dies — stays
+there, and `run_retrier` (or the next iteration) picks it up again without
+re-scraping anything. Whoever is delivering a row holds a lease on it, renewed
+before every attempt (`AlertStore.renew_lease`); if the lease ran out while the
+alert sat in the queue and the retrier claimed it, the worker drops it rather
+than send it twice.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from discogs_alert import state as da_state
+from discogs_alert.alert import Alerter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 3
+# Delay before the first retry; doubled for each one after, up to the cap.
+RETRY_BACKOFF_SECONDS = 2.0
+RETRY_BACKOFF_MAX_SECONDS = 60.0
+# Durable-outbox retries back off further, up to an hour apart.
+DURABLE_RETRY_MAX_SECONDS = 3600.0
+# How long a delivery attempt owns a durable-outbox alert before anyone else
+# may claim it (i.e. how soon after a crash it's retried). Renewed before every
+# attempt, so it only needs to outlast one send plus one backoff.
+OUTBOX_LEASE_SECONDS = 300
+DEFAULT_RETRY_INTERVAL = 60
+
+
+@dataclasses.dataclass
+class PendingAlert:
+    """One notification waiting to be delivered.
+
+    `listings` holds the `(listing_id, release_id)` pairs the notification
+    covers, all of which count as alerted once it's delivered.
+    """
+
+    title: str
+    body: str
+    listings: List[Tuple[int, int]]
+    attempts: int = 0
+    # Row in the durable outbox, if it's been written there.
+    outbox_id: Optional[int] = None
+    # Failed attempts recorded in the durable outbox before this one was queued.
+    prior_attempts: int = 0
+    # The claim on the durable-outbox row this delivery holds.
+    lease: int = 0
+
+    @classmethod
+    def from_entry(cls, entry: da_state.OutboxEntry) -> "PendingAlert":
+        return cls(
+            entry.title, entry.body, entry.listings,
+            outbox_id=entry.id, prior_attempts=entry.attempts, lease=entry.lease,
+        )
+
+
+class AlertOutbox:
+    """Bounded queue of `PendingAlert`s drained by `workers` delivery tasks.
+
+    Intended use (within a running event loop):
+
+        outbox = AlertOutbox(alerter, on_delivered=..., on_failed=...)
+        outbox.start()
+        await outbox.put(PendingAlert(...))     # waits if the queue is full
+        ...
+        await outbox.close()                     # drains, then stops workers
+
+    Args:
+        alerter: delivers the alerts.
+        on_delivered: called with each alert once `alerter` confirms delivery.
+        on_failed: called with each alert that's still undelivered after
+            `max_attempts` tries.
+        on_attempt: called before each delivery attempt; if it returns False
+            the alert is dropped unsent (someone else has claimed it).
+        workers: number of concurrent delivery tasks.
+        queue_size: how many undelivered alerts may be queued.
+        max_attempts: delivery attempts per alert, including the first.
+        sleep_fn: async sleep used between retries (overridable for tests).
+    """
+
+    def __init__(
+        self,
+        alerter: Alerter,
+        on_delivered: Callable[[PendingAlert], None],
+        on_failed: Optional[Callable[[PendingAlert], None]] = None,
+        on_attempt: Optional[Callable[[PendingAlert], bool]] = None,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        sleep_fn=asyncio.sleep,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.alerter = alerter
+        self.on_delivered = on_delivered
+        self.on_failed = on_failed
+        self.on_attempt = on_attempt
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._sleep = sleep_fn
+        self._queue: asyncio.Queue[PendingAlert] = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self.delivered = 0
+        self.failed = 0
+
+    async def __aenter__(self) -> "AlertOutbox":
+        self.start()
+        return self
+
+    async def __aexit__(self, *_exc) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """Spawn the delivery workers (idempotent)."""
+
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"discogs-alert-outbox-{i}") for i in range(self.workers)
+            ]
+
+    async def put(self, alert: PendingAlert) -> None:
+        """Queue `alert` for delivery, waiting for room if the queue is full."""
+
+        await self._queue.put(alert)
+
+    def offer(self, alert: PendingAlert) -> bool:
+        """Queue `alert` if there's room, without waiting. Returns False if the
+        queue is full.
+        """
+
+        try:
+            self._queue.put_nowait(alert)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def join(self) -> None:
+        """Wait until every queued alert has been delivered or given up on."""
+
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """Drain the queue, then stop the workers. The workers are stopped even
+        if the wait is cancelled; anything still queued is then dropped.
+        """
+
+        try:
+            if self._tasks:
+                await self.join()
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            alert = await self._queue.get()
+            try:
+                await self._deliver(alert)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, alert: PendingAlert) -> None:
+        delay = RETRY_BACKOFF_SECONDS
+        while True:
+            if not self._still_ours(alert):
+                logger.info("Alert %r was claimed elsewhere; leaving it to them", alert.title)
+                return
+            alert.attempts += 1
+            try:
+                ok = await self.alerter.send_alert_async(alert.title, alert.body)
+            except Exception:
+                logger.warning("Alerter raised delivering %r", alert.title, exc_info=True)
+                ok = False
+            if ok:
+                self.delivered += 1
+                self._callback(self.on_delivered, alert)
+                return
+            if alert.attempts >= self.max_attempts:
+                self.failed += 1
+                logger.warning("Giving up on alert %r after %d attempt(s)", alert.title, alert.attempts)
+                self._callback(self.on_failed, alert)
+                return
+            logger.info("Alert %r not delivered; retrying in %.0fs", alert.title, delay)
+            await self._sleep(delay)
+            delay = min(delay * 2, RETRY_BACKOFF_MAX_SECONDS)
+
+    def _still_ours(self, alert: PendingAlert) -> bool:
+        if self.on_attempt is None:
+            return True
+        try:
+            return self.on_attempt(alert)
+        except Exception:
+            # Better a possible duplicate than a lost alert.
+            logger.exception("Outbox on_attempt failed for alert %r", alert.title)
+            return True
+
+    @staticmethod
+    def _callback(callback: Optional[Callable[[PendingAlert], None]], alert: PendingAlert) -> None:
+        if callback is None:
+            return
+        try:
+            callback(alert)
+        except Exception:
+            logger.exception("Outbox callback failed for alert %r", alert.title)
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before retrying a durable-outbox alert that has failed
+    `attempts` times in total.
+    """
+
+    return min(RETRY_BACKOFF_SECONDS * 2 ** max(0, attempts), DURABLE_RETRY_MAX_SECONDS)
+
+
+async def retry_pending(
+    store: da_state.AlertStore,
+    alerter: Alerter,
+    limit: int = DEFAULT_QUEUE_SIZE,
+    channel: str = da_state.DEFAULT_CHANNEL,
+) -> int:
+    """One pass over `channel`'s durable outbox: try each due alert once,
+    recording deliveries and deferring failures. Returns the number delivered.
+    """
+
+    delivered = 0
+    for entry in store.claim_due_alerts(limit, OUTBOX_LEASE_SECONDS, channel=channel):
+        # A slow pass can outlive the lease on the alerts at its tail.
+        if not store.renew_lease(entry.id, entry.lease, OUTBOX_LEASE_SECONDS):
+            continue
+        try:
+            ok = await alerter.send_alert_async(entry.title, entry.body)
+        except Exception:
+            logger.warning("Alerter raised retrying %r", entry.title, exc_info=True)
+            ok = False
+        if ok:
+            store.complete_alert(entry.id)
+            delivered += 1
+        else:
+            store.defer_alert(entry.id, retry_delay(entry.attempts + 1))
+    return delivered
+
+
+async def run_retrier(
+    store: da_state.AlertStore,
+    alerter: Alerter,
+    interval: float = DEFAULT_RETRY_INTERVAL,
+    channel: str = da_state.DEFAULT_CHANNEL,
+) -> None:
+    """Retry `channel`'s durable outbox every `interval` seconds until cancelled.
+
+    Runs alongside the loop (started by the CLI and menubar runners) so an
+    alert stuck behind a flaky endpoint goes out as soon as the endpoint
+    recovers, whatever the scrape schedule.
+    """
+
+    while True:
+        try:
+            if delivered := await retry_pending(store, alerter, channel=channel):
+                logger.info("delivered %d alert(s) from the outbox", delivered)
+        except Exception:
+            logger.exception("outbox retry pass failed")
+        await asyncio.sleep(interval)
+
+
+def start_retrier(
+    state_path,
+    alerter: Alerter,
+    interval: float = DEFAULT_RETRY_INTERVAL,
+    channel: str = da_state.DEFAULT_CHANNEL,
+) -> asyncio.Task:
+    """Start `run_retrier` as a task on the running loop for the runners; the
+    caller cancels it on the way out (see `stop_retrier`).
+    """
+
+    return asyncio.create_task(
+        run_retrier(da_state.shared_store(state_path), alerter, interval, channel),
+        name=f"discogs-alert-outbox-retrier{'-' + channel if channel else ''}",
+    )
+
+
+async def stop_retrier(task: Optional[asyncio.Task]) -> None:
+    """Cancel a task from `start_retrier` and wait for it to finish."""
+
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
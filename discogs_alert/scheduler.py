@@ -0,0 +1,194 @@
+"""Adaptive per-release polling schedule.
+
+Sweeping the whole wantlist every iteration spends the same Cloudflare / API
+budget on a release nobody has listed in years as on one whose listings turn
+over every few minutes. `ReleaseScheduler` instead gives every release its own
+next-check time, kept in a min-heap, and derives each release's polling
+interval from what the last checks saw:
+
+- **churn** — an exponential moving average of "did the marketplace page show
+  new or departed listings?" over recent scrapes;
+- **supply** — ``num_for_sale`` from ``/marketplace/stats`` (nothing for sale
+  means nothing to catch, so the release goes dormant);
+- **price proximity** — the stats' ``lowest_price`` relative to the release's
+  ``price_threshold`` (a release already at or under its threshold is hot).
+
+Those combine into a "heat" in ``[0, 1]``, and the interval is interpolated
+geometrically between ``max_interval`` (heat 0) and ``min_interval`` (heat 1).
+With the defaults a hot release is checked every minute and a dormant one once
+an hour.
+
+The scheduler is plain synchronous bookkeeping; `loop.loop` asks it which
+releases are due, feeds it observations while processing them, and reschedules
+them once the iteration is done.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_MIN_INTERVAL = 60
+DEFAULT_MAX_INTERVAL = 3600
+
+# Weight of the newest observation in the churn moving average.
+CHURN_SMOOTHING = 0.3
+# `num_for_sale` at (and above) which supply counts as fully "hot".
+SUPPLY_SATURATION = 50
+# `lowest_price / price_threshold` at (and above) which price proximity counts as cold.
+PRICE_RATIO_COLD = 3.0
+# Heat contributed by a signal we have no observation for yet.
+UNKNOWN_HEAT = 0.5
+
+
+class _ReleaseState:
+    __slots__ = ("due_at", "churn", "num_for_sale", "price_ratio")
+
+    def __init__(self, due_at: float) -> None:
+        self.due_at = due_at
+        self.churn: Optional[float] = None
+        self.num_for_sale: Optional[int] = None
+        self.price_ratio: Optional[float] = None
+
+
+class ReleaseScheduler:
+    """Min-heap of per-release next-check times with adaptive intervals.
+
+    Args:
+        min_interval: seconds between checks of the hottest releases.
+        max_interval: seconds between checks of dormant releases.
+        clock: monotonic time source (overridable for tests).
+    """
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("need 0 < min_interval <= max_interval")
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max_interval)
+        self._clock = clock
+        self._releases: Dict[int, _ReleaseState] = {}
+        # (due_at, release_id). Entries go stale when a release is rescheduled
+        # or dropped; they're skipped lazily when they reach the top.
+        self._heap: List[Tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._releases)
+
+    def sync(self, release_ids: Iterable[int]) -> None:
+        """Track exactly `release_ids`: new releases are due immediately, and
+        releases no longer on the wantlist are forgotten.
+        """
+
+        wanted = set(release_ids)
+        for release_id in list(self._releases):
+            if release_id not in wanted:
+                del self._releases[release_id]
+        now = self._clock()
+        for release_id in wanted - self._releases.keys():
+            self._releases[release_id] = _ReleaseState(now)
+            heapq.heappush(self._heap, (now, release_id))
+
+    def pop_due(self) -> List[int]:
+        """Return the releases due for a check, most overdue first.
+
+        Popped releases stay tracked but leave the heap until `reschedule`
+        puts them back, so a release is never handed out twice.
+        """
+
+        now = self._clock()
+        due: List[int] = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, release_id = heapq.heappop(self._heap)
+            state = self._releases.get(release_id)
+            if state is not None and state.due_at == due_at:
+                due.append(release_id)
+        return due
+
+    def seconds_until_next_due(self) -> float:
+        """Seconds until the next release is due (0 if one already is);
+        `max_interval` when nothing is scheduled.
+        """
+
+        while self._heap:
+            due_at, release_id = self._heap[0]
+            state = self._releases.get(release_id)
+            if state is not None and state.due_at == due_at:
+                return max(0.0, due_at - self._clock())
+            heapq.heappop(self._heap)
+        return self.max_interval
+
+    def expedite(self) -> None:
+        """Make every tracked release due now (e.g. the user asked for a check)."""
+
+        now = self._clock()
+        self._heap = [(now, release_id) for release_id in self._releases]
+        heapq.heapify(self._heap)
+        for state in self._releases.values():
+            state.due_at = now
+
+    def observe_stats(self, release_id: int, num_for_sale: int, price_ratio: Optional[float]) -> None:
+        """Record a ``/marketplace/stats`` result. `price_ratio` is the lowest
+        price over the release's price threshold, None if either is unknown.
+        """
+
+        if (state := self._releases.get(release_id)) is not None:
+            state.num_for_sale = num_for_sale
+            state.price_ratio = price_ratio
+
+    def observe_listings(self, release_id: int, changed: bool) -> None:
+        """Record whether a marketplace scrape found new or departed listings."""
+
+        if (state := self._releases.get(release_id)) is not None:
+            sample = 1.0 if changed else 0.0
+            if state.churn is None:
+                state.churn = sample
+            else:
+                state.churn += CHURN_SMOOTHING * (sample - state.churn)
+
+    def interval(self, release_id: int) -> float:
+        """The polling interval the release's observations currently warrant."""
+
+        state = self._releases[release_id]
+        heat = _heat(state)
+        return self.max_interval * (self.min_interval / self.max_interval) ** heat
+
+    def reschedule(self, release_id: int) -> None:
+        """Schedule the release's next check one `interval` from now."""
+
+        if (state := self._releases.get(release_id)) is None:
+            return
+        state.due_at = self._clock() + self.interval(release_id)
+        heapq.heappush(self._heap, (state.due_at, release_id))
+
+
+def _heat(state: _ReleaseState) -> float:
+    if state.num_for_sale == 0:
+        return 0.0
+    if state.num_for_sale is None:
+        supply = UNKNOWN_HEAT
+    else:
+        supply = min(1.0, math.log1p(state.num_for_sale) / math.log1p(SUPPLY_SATURATION))
+    if state.price_ratio is None:
+        price = UNKNOWN_HEAT
+    else:
+        price = min(1.0, max(0.0, (PRICE_RATIO_COLD - state.price_ratio) / (PRICE_RATIO_COLD - 1.0)))
+    churn = state.churn if state.churn is not None else 0.0
+    return max(churn, (supply + price) / 2)
+
+
+def sleep_seconds(interval_seconds: float, scheduler: Optional[ReleaseScheduler]) -> float:
+    """How long a runner should sleep between loop iterations: the fixed
+    `interval_seconds`, or until the scheduler's next release is due if that's
+    sooner (but at least a second).
+    """
+
+    if scheduler is None:
+        return interval_seconds
+    return max(1.0, min(float(interval_seconds), scheduler.seconds_until_next_due()))
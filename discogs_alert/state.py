@@ -10,52 +10,321 @@ Moving dedup into a local SQLite database keyed on Discogs `listing_id` (which i
 globally unique across the marketplace) eliminates the recurring history scan,
 fixes Telegram dedup as a side-effect, and decouples the alerters from the question
 of "have I sent this before?".
+
+The same database holds a per-release snapshot of the listing IDs the loop has
+already evaluated (whether or not they were alerted on) and the price each was
+judged at, so each poll only has to judge listings that are new or repriced since
+the previous one. Listings that drop out of a
+snapshot are logged to `departed_listings` for later analysis (how long do
+listings of a release stay up?).
+
+The database runs in WAL mode with ``synchronous=NORMAL``: readers (the menubar's
+stats refresh) don't block the loop's writes, and a commit no longer costs an fsync
+of the main database file. Opening a store is cheap — the schema is versioned in
+`schema_version` and only migrations newer than the recorded version run — and
+`shared_store` hands out one long-lived store per database path for the whole
+process.
+
+Nearly every listing the loop looks at has been alerted on before, so each store
+keeps the alerted listing IDs in memory as well (a sorted `array('q')`, 8 bytes per
+ID): `has_seen` answers those from memory and only goes to SQLite on a miss.
+
+Alerts awaiting delivery live in the `outbox` table until the alerter confirms
+them, at which point they move to `sent_alerts` in the same transaction. An
+alert whose delivery keeps failing therefore survives restarts, and is retried
+from the outbox rather than by re-scraping its release.
+
+With extra alert channels configured (see `discogs_alert.channels`), alerts
+and outbox entries are tracked per ``(listing_id, channel)``: each channel is
+alerted about a listing at most once, independently of the others. The main
+alerter delivers on the default channel, ``""``, which is where every alert
+recorded before channels existed lives.
 """
 
 from __future__ import annotations
 
+import bisect
+import functools
+import heapq
 import logging
 import sqlite3
+import sys
+import threading
+from array import array
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_STATE_DIR = Path.home() / ".discogs_alert"
 DEFAULT_STATE_PATH = DEFAULT_STATE_DIR / "state.db"
 
-_SCHEMA = """
-CREATE TABLE IF NOT EXISTS sent_alerts (
-    listing_id INTEGER PRIMARY KEY,
-    release_id INTEGER NOT NULL,
-    title      TEXT    NOT NULL,
-    body       TEXT    NOT NULL,
-    sent_at    TEXT    NOT NULL DEFAULT (datetime('now'))
-);
-CREATE INDEX IF NOT EXISTS idx_sent_alerts_release_id ON sent_alerts(release_id);
-CREATE INDEX IF NOT EXISTS idx_sent_alerts_sent_at   ON sent_alerts(sent_at);
-"""
+# Keep `IN (...)` lists under SQLite's historical 999-bound-parameter limit.
+_MAX_IN_PARAMS = 500
+
+# (listing_id, release_id, title, body) — one row for `AlertStore.mark_seen_many`.
+SeenRecord = Tuple[int, int, str, str]
+
+# The channel a single-alerter setup delivers on; see the module docstring.
+DEFAULT_CHANNEL = ""
+
+
+class OutboxEntry(NamedTuple):
+    """An undelivered alert claimed from the outbox (see `AlertStore.claim_due_alerts`)."""
+
+    id: int
+    title: str
+    body: str
+    attempts: int
+    # (listing_id, release_id) pairs the alert covers.
+    listings: List[Tuple[int, int]]
+    channel: str = DEFAULT_CHANNEL
+    # Which claim of the alert this is (see `AlertStore.renew_lease`).
+    lease: int = 0
+
+
+# Size of each connection's prepared-statement cache. The loop cycles through a
+# couple of dozen distinct statements; the default (128) is plenty, but say so.
+STATEMENT_CACHE_SIZE = 128
+
+# Ordered schema migrations; the database is at version `len(_MIGRATIONS)` once
+# they've all been applied. Append new ones — never edit or reorder old ones.
+# The early ones keep `IF NOT EXISTS` so databases created before the schema was
+# versioned (which have the tables but no `schema_version`) migrate cleanly.
+_MIGRATIONS: Tuple[Tuple[str, ...], ...] = (
+    # 1: alert log
+    (
+        """
+        CREATE TABLE IF NOT EXISTS sent_alerts (
+            listing_id INTEGER PRIMARY KEY,
+            release_id INTEGER NOT NULL,
+            title      TEXT    NOT NULL,
+            body       TEXT    NOT NULL,
+            sent_at    TEXT    NOT NULL DEFAULT (datetime('now'))
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_sent_alerts_release_id ON sent_alerts(release_id)",
+        "CREATE INDEX IF NOT EXISTS idx_sent_alerts_sent_at ON sent_alerts(sent_at)",
+    ),
+    # 2: per-release listing snapshots + departure log
+    (
+        """
+        CREATE TABLE IF NOT EXISTS release_snapshots (
+            release_id     INTEGER PRIMARY KEY,
+            evaluation_key TEXT    NOT NULL,
+            updated_at     TEXT    NOT NULL DEFAULT (datetime('now'))
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS snapshot_listings (
+            release_id    INTEGER NOT NULL,
+            listing_id    INTEGER NOT NULL,
+            first_seen_at TEXT    NOT NULL DEFAULT (datetime('now')),
+            PRIMARY KEY (release_id, listing_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS departed_listings (
+            release_id    INTEGER NOT NULL,
+            listing_id    INTEGER NOT NULL,
+            first_seen_at TEXT    NOT NULL,
+            departed_at   TEXT    NOT NULL DEFAULT (datetime('now')),
+            PRIMARY KEY (release_id, listing_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_departed_listings_departed_at ON departed_listings(departed_at)",
+    ),
+    # 3: durable outbox of alerts awaiting delivery
+    (
+        """
+        CREATE TABLE outbox (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            title           TEXT    NOT NULL,
+            body            TEXT    NOT NULL,
+            attempts        INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT    NOT NULL DEFAULT (datetime('now')),
+            created_at      TEXT    NOT NULL DEFAULT (datetime('now'))
+        )
+        """,
+        "CREATE INDEX idx_outbox_next_attempt_at ON outbox(next_attempt_at)",
+        """
+        CREATE TABLE outbox_listings (
+            listing_id INTEGER PRIMARY KEY,
+            release_id INTEGER NOT NULL,
+            outbox_id  INTEGER NOT NULL
+        )
+        """,
+        "CREATE INDEX idx_outbox_listings_outbox_id ON outbox_listings(outbox_id)",
+    ),
+    # 4: per-channel alerts — (listing_id, channel) keys for sent alerts and the outbox
+    (
+        """
+        CREATE TABLE sent_alerts_v4 (
+            listing_id INTEGER NOT NULL,
+            channel    TEXT    NOT NULL DEFAULT '',
+            release_id INTEGER NOT NULL,
+            title      TEXT    NOT NULL,
+            body       TEXT    NOT NULL,
+            sent_at    TEXT    NOT NULL DEFAULT (datetime('now')),
+            PRIMARY KEY (listing_id, channel)
+        )
+        """,
+        "INSERT INTO sent_alerts_v4 (listing_id, release_id, title, body, sent_at) "
+        "SELECT listing_id, release_id, title, body, sent_at FROM sent_alerts",
+        "DROP TABLE sent_alerts",
+        "ALTER TABLE sent_alerts_v4 RENAME TO sent_alerts",
+        "CREATE INDEX idx_sent_alerts_release_id ON sent_alerts(release_id)",
+        "CREATE INDEX idx_sent_alerts_sent_at ON sent_alerts(sent_at)",
+        "ALTER TABLE outbox ADD COLUMN channel TEXT NOT NULL DEFAULT ''",
+        "CREATE INDEX idx_outbox_channel_next_attempt_at ON outbox(channel, next_attempt_at)",
+        """
+        CREATE TABLE outbox_listings_v4 (
+            listing_id INTEGER NOT NULL,
+            channel    TEXT    NOT NULL DEFAULT '',
+            release_id INTEGER NOT NULL,
+            outbox_id  INTEGER NOT NULL,
+            PRIMARY KEY (listing_id, channel)
+        )
+        """,
+        "INSERT INTO outbox_listings_v4 (listing_id, release_id, outbox_id) "
+        "SELECT listing_id, release_id, outbox_id FROM outbox_listings",
+        "DROP TABLE outbox_listings",
+        "ALTER TABLE outbox_listings_v4 RENAME TO outbox_listings",
+        "CREATE INDEX idx_outbox_listings_outbox_id ON outbox_listings(outbox_id)",
+    ),
+    # 5: the price each snapshot entry was judged at (see `loop.price_key`)
+    ("ALTER TABLE snapshot_listings ADD COLUMN price_key TEXT NOT NULL DEFAULT ''",),
+    # 6: a counter bumped on every claim of an outbox alert
+    ("ALTER TABLE outbox ADD COLUMN lease INTEGER NOT NULL DEFAULT 0",),
+)
+
+SCHEMA_VERSION = len(_MIGRATIONS)
+
+
+class _SeenIdCache:
+    """Sorted `array('q')` of listing IDs with set-style membership tests.
+
+    A fraction of the memory of a `set[int]` (8 bytes per ID instead of ~60),
+    at the cost of O(log n) lookups and O(n) inserts — fine for a set that
+    gains a handful of IDs per loop iteration and is read thousands of times.
+    """
+
+    def __init__(self, sorted_ids: Iterable[int] = ()) -> None:
+        self._ids = array("q", sorted_ids)
+
+    def __contains__(self, listing_id: int) -> bool:
+        i = bisect.bisect_left(self._ids, listing_id)
+        return i < len(self._ids) and self._ids[i] == listing_id
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add_many(self, listing_ids: Iterable[int]) -> None:
+        new = sorted({i for i in listing_ids if i not in self})
+        if len(new) == 1:
+            bisect.insort(self._ids, new[0])
+        elif new:
+            self._ids = array("q", heapq.merge(self._ids, new))
+
+    def nbytes(self) -> int:
+        """Memory held by the cache, including the array's spare capacity."""
+
+        return sys.getsizeof(self._ids)
+
+
+def _locked(method):
+    """Serialise an `AlertStore` method on the store's lock (see `AlertStore`)."""
+
+    @functools.wraps(method)
+    def wrapper(self: "AlertStore", *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class AlertStore:
     """SQLite-backed log of alerts we've already delivered.
 
-    The store is intentionally small and synchronous — there's no concurrent writer
-    in this project (the loop runs serially), and a single-table SQLite database is
-    enough that we don't need to involve a heavier dependency.
+    The store is intentionally small and synchronous — a process's loop writes to it
+    serially, and SQLite is enough that we don't need to involve a heavier
+    dependency. Several processes may share a database (workers, see
+    `discogs_alert.workqueue`); the outbox operations that must not interleave
+    between them lock the database for their whole transaction. A store may still be
+    shared between threads (the menubar reads `stats()` from outside the loop), so
+    every method holds the store's lock for the duration of its statement(s).
 
-    Records are keyed by `listing_id` (globally unique on Discogs); all other fields
-    are stored for forensics.
+    Records are keyed by `listing_id` (globally unique on Discogs) and channel
+    (`DEFAULT_CHANNEL` unless several are configured); all other fields are
+    stored for forensics.
     """
 
     def __init__(self, path: Optional[Path] = None) -> None:
         self.path = Path(path) if path is not None else DEFAULT_STATE_PATH
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        self._conn = sqlite3.connect(self.path)
-        self._conn.executescript(_SCHEMA)
-        self._conn.commit()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._load_seen()
+
+    def _load_seen(self) -> None:
+        """(Re)build the in-memory caches: `_seen` for the default channel,
+        `_channel_seen` for the others.
+        """
+
+        cur = self._conn.execute("SELECT channel, listing_id FROM sent_alerts ORDER BY channel, listing_id")
+        by_channel: Dict[str, List[int]] = {}
+        for channel, listing_id in cur:
+            by_channel.setdefault(channel, []).append(listing_id)
+        self._seen = _SeenIdCache(by_channel.pop(DEFAULT_CHANNEL, ()))
+        self._channel_seen: Dict[str, _SeenIdCache] = {
+            channel: _SeenIdCache(ids) for channel, ids in by_channel.items()
+        }
+
+    def _cache(self, channel: str) -> _SeenIdCache:
+        if channel == DEFAULT_CHANNEL:
+            return self._seen
+        return self._channel_seen.setdefault(channel, _SeenIdCache())
+
+    def _migrate(self) -> None:
+        """Apply every migration newer than the database's recorded version, each
+        in its own transaction alongside the version bump.
+        """
+
+        self._conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+        row = self._conn.execute("SELECT version FROM schema_version").fetchone()
+        current = int(row[0]) if row is not None else 0
+        if current > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"{self.path} is at schema version {current}, newer than this version of discogs_alert "
+                f"understands ({SCHEMA_VERSION})"
+            )
+        for version in range(current + 1, SCHEMA_VERSION + 1):
+            self._conn.execute("BEGIN")
+            try:
+                for statement in _MIGRATIONS[version - 1]:
+                    self._conn.execute(statement)
+                self._conn.execute("DELETE FROM schema_version")
+                self._conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+            logger.debug("migrated %s to schema version %d", self.path, version)
 
+    @_locked
+    def schema_version(self) -> int:
+        """Return the schema version recorded in the database."""
+
+        return int(self._conn.execute("SELECT version FROM schema_version").fetchone()[0])
+
+    @_locked
     def close(self) -> None:
+        with _shared_lock:
+            if _shared_stores.get(self.path.resolve()) is self:
+                del _shared_stores[self.path.resolve()]
         self._conn.close()
 
     def __enter__(self) -> "AlertStore":
@@ -64,32 +333,323 @@ class AlertStore:
     def __exit__(self, *_exc: object) -> None:
         self.close()
 
-    def has_seen(self, listing_id: int) -> bool:
-        """Return True if we've already delivered an alert for this listing."""
+    @_locked
+    def has_seen(self, listing_id: int, channel: str = DEFAULT_CHANNEL) -> bool:
+        """Return True if we've already delivered an alert for this listing on
+        `channel`.
+
+        Answered from the in-memory cache when it knows the listing; a miss still
+        checks SQLite, in case another process sharing the database alerted on it.
+        """
+
+        return int(listing_id) in self.has_seen_many((listing_id,), channel)
+
+    @_locked
+    def has_seen_many(self, listing_ids: Iterable[int], channel: str = DEFAULT_CHANNEL) -> Set[int]:
+        """Set-based `has_seen`: return the subset of `listing_ids` we've already
+        delivered alerts for on `channel`, in one ``WHERE listing_id IN (...)``
+        query per `_MAX_IN_PARAMS` IDs rather than one query per listing.
+        """
+
+        ids: List[int] = sorted({int(i) for i in listing_ids})
+        cache = self._cache(channel)
+        seen = {i for i in ids if i in cache}
+        ids = [i for i in ids if i not in seen]
+        from_db: Set[int] = set()
+        for start in range(0, len(ids), _MAX_IN_PARAMS):
+            chunk = ids[start : start + _MAX_IN_PARAMS]
+            cur = self._conn.execute(
+                f"SELECT listing_id FROM sent_alerts "
+                f"WHERE channel = ? AND listing_id IN ({','.join('?' * len(chunk))})",
+                [channel, *chunk],
+            )
+            from_db.update(listing_id for (listing_id,) in cur)
+        cache.add_many(from_db)
+        return seen | from_db
+
+    @_locked
+    def mark_seen(
+        self, listing_id: int, release_id: int, title: str, body: str, channel: str = DEFAULT_CHANNEL
+    ) -> None:
+        """Record that we've delivered an alert for `listing_id` on `channel`.
+        Idempotent: re-marking an existing listing is a no-op (kept as INSERT OR
+        IGNORE so a partial duplicate delivery doesn't blow up).
+        """
+
+        self.mark_seen_many([(listing_id, release_id, title, body)], channel)
+
+    @_locked
+    def mark_seen_many(self, records: Iterable[SeenRecord], channel: str = DEFAULT_CHANNEL) -> None:
+        """Batched `mark_seen`: record every `(listing_id, release_id, title, body)`
+        in `records` in a single transaction (one fsync instead of one per alert).
+        Same INSERT OR IGNORE idempotency.
+        """
+
+        rows = [
+            (int(listing_id), channel, int(release_id), title, body)
+            for listing_id, release_id, title, body in records
+        ]
+        if not rows:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sent_alerts (listing_id, channel, release_id, title, body) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        self._cache(channel).add_many(row[0] for row in rows)
+
+    @_locked
+    def enqueue_alert(
+        self,
+        title: str,
+        body: str,
+        listings: Iterable[Tuple[int, int]],
+        lease_seconds: float = 0,
+        channel: str = DEFAULT_CHANNEL,
+    ) -> Optional[int]:
+        """Add an alert for `channel` covering `listings` (``(listing_id,
+        release_id)`` pairs) to the outbox and return its ID.
+
+        Listings already waiting in the outbox for `channel` under another alert,
+        or already alerted on, are left out; if that's all of them, nothing is
+        added and None is returned. Both checks happen in the insert itself, so
+        they hold between processes sharing the database (see `da_workqueue`).
+        The new alert isn't due for retry (see `claim_due_alerts`) for
+        `lease_seconds` — the caller's own delivery attempt owns it until then.
+        """
+
+        with self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO outbox (title, body, channel, next_attempt_at) VALUES (?, ?, ?, datetime('now', ?))",
+                (title, body, channel, f"+{int(lease_seconds)} seconds"),
+            )
+            outbox_id = int(cur.lastrowid)
+            cur = self._conn.executemany(
+                "INSERT OR IGNORE INTO outbox_listings (listing_id, channel, release_id, outbox_id) "
+                "SELECT ?1, ?2, ?3, ?4 WHERE NOT EXISTS "
+                "(SELECT 1 FROM sent_alerts WHERE listing_id = ?1 AND channel = ?2)",
+                [(int(listing_id), channel, int(release_id), outbox_id) for listing_id, release_id in listings],
+            )
+            if cur.rowcount <= 0:
+                self._conn.execute("DELETE FROM outbox WHERE id = ?", (outbox_id,))
+                return None
+        return outbox_id
+
+    @_locked
+    def pending_many(self, listing_ids: Iterable[int], channel: str = DEFAULT_CHANNEL) -> Set[int]:
+        """Return the subset of `listing_ids` with an alert for `channel` waiting
+        in the outbox.
+        """
+
+        ids: List[int] = sorted({int(i) for i in listing_ids})
+        pending: Set[int] = set()
+        for start in range(0, len(ids), _MAX_IN_PARAMS):
+            chunk = ids[start : start + _MAX_IN_PARAMS]
+            cur = self._conn.execute(
+                f"SELECT listing_id FROM outbox_listings "
+                f"WHERE channel = ? AND listing_id IN ({','.join('?' * len(chunk))})",
+                [channel, *chunk],
+            )
+            pending.update(listing_id for (listing_id,) in cur)
+        return pending
+
+    @_locked
+    def claim_due_alerts(
+        self, limit: int, lease_seconds: float, channel: str = DEFAULT_CHANNEL
+    ) -> List[OutboxEntry]:
+        """Return up to `limit` of `channel`'s outbox alerts due for another
+        attempt, oldest first, and push each one's next attempt `lease_seconds`
+        out so that nothing else claims it while the caller is delivering it.
+        Each claim supersedes the last; see `renew_lease`.
+        """
+
+        with self._conn:
+            # Take the write lock before reading, so another process sharing
+            # the database can't claim the same alerts in between.
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                "SELECT id, title, body, attempts, lease + 1 FROM outbox "
+                "WHERE channel = ? AND next_attempt_at <= datetime('now') "
+                "ORDER BY next_attempt_at, id LIMIT ?",
+                (channel, int(limit)),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE outbox SET next_attempt_at = datetime('now', ?), lease = lease + 1 WHERE id = ?",
+                [(f"+{int(lease_seconds)} seconds", row[0]) for row in rows],
+            )
+        entries = []
+        for outbox_id, title, body, attempts, lease in rows:
+            listings = self._conn.execute(
+                "SELECT listing_id, release_id FROM outbox_listings WHERE outbox_id = ? ORDER BY listing_id",
+                (outbox_id,),
+            ).fetchall()
+            entries.append(
+                OutboxEntry(outbox_id, title, body, attempts, [tuple(pair) for pair in listings], channel, lease)
+            )
+        return entries
+
+    @_locked
+    def renew_lease(self, outbox_id: int, lease: int, lease_seconds: float) -> bool:
+        """Push an outbox alert's next attempt `lease_seconds` out again, if
+        the caller's claim on it (`lease`: 0 for the `enqueue_alert` that
+        wrote it, else `OutboxEntry.lease`) is still the latest one.
+
+        False means the alert has been delivered, or its lease ran out and it's
+        been claimed again since; the caller should leave it alone.
+        """
+
+        with self._conn:
+            cur = self._conn.execute(
+                "UPDATE outbox SET next_attempt_at = datetime('now', ?) WHERE id = ? AND lease = ?",
+                (f"+{int(lease_seconds)} seconds", int(outbox_id), int(lease)),
+            )
+        return cur.rowcount > 0
+
+    @_locked
+    def complete_alert(self, outbox_id: int) -> None:
+        """Record a delivered outbox alert: its listings move to `sent_alerts`
+        and the alert leaves the outbox, in one transaction.
+        """
+
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT l.listing_id, l.channel, l.release_id, o.title, o.body FROM outbox_listings l "
+                "JOIN outbox o ON o.id = l.outbox_id WHERE l.outbox_id = ?",
+                (int(outbox_id),),
+            ).fetchall()
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sent_alerts (listing_id, channel, release_id, title, body) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute("DELETE FROM outbox_listings WHERE outbox_id = ?", (int(outbox_id),))
+            self._conn.execute("DELETE FROM outbox WHERE id = ?", (int(outbox_id),))
+        for listing_id, channel, *_rest in rows:
+            self._cache(channel).add_many((listing_id,))
+
+    @_locked
+    def defer_alert(self, outbox_id: int, delay_seconds: float, attempts: int = 1) -> None:
+        """Record `attempts` more failed delivery attempts for an outbox alert
+        and make it due again in `delay_seconds`.
+        """
+
+        with self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET attempts = attempts + ?, next_attempt_at = datetime('now', ?) WHERE id = ?",
+                (int(attempts), f"+{int(delay_seconds)} seconds", int(outbox_id)),
+            )
+
+    @_locked
+    def outbox_count(self) -> int:
+        """Return the number of alerts waiting in the outbox."""
+
+        cur = self._conn.execute("SELECT COUNT(*) FROM outbox")
+        return int(cur.fetchone()[0])
+
+    @_locked
+    def listing_snapshot(self, release_id: int, evaluation_key: str) -> Dict[int, str]:
+        """Return `release_id`'s listings already evaluated under
+        `evaluation_key` (see `loop.evaluation_key`), each mapped to the price
+        key it was judged at (see `loop.price_key`). A snapshot taken under a
+        different key — the filters have changed since — counts as empty.
+        """
+
+        cur = self._conn.execute(
+            "SELECT evaluation_key FROM release_snapshots WHERE release_id = ?", (int(release_id),)
+        )
+        row = cur.fetchone()
+        if row is None or row[0] != evaluation_key:
+            return {}
+        cur = self._conn.execute(
+            "SELECT listing_id, price_key FROM snapshot_listings WHERE release_id = ?", (int(release_id),)
+        )
+        return dict(cur.fetchall())
+
+    @_locked
+    def save_listing_snapshot(
+        self,
+        release_id: int,
+        evaluation_key: str,
+        present_ids: Iterable[int],
+        evaluated: Mapping[int, str],
+    ) -> Set[int]:
+        """Replace `release_id`'s snapshot after a poll, in one transaction.
 
-        cur = self._conn.execute("SELECT 1 FROM sent_alerts WHERE listing_id = ? LIMIT 1", (listing_id,))
-        return cur.fetchone() is not None
+        Args:
+            release_id: the release polled.
+            evaluation_key: the key the listings were evaluated under.
+            present_ids: every listing currently on the release's page.
+            evaluated: the subset that got a definitive verdict this poll, each
+                mapped to the price key it was judged at. Snapshot entries
+                from a previous poll under the same key are kept as long as
+                the listing is still present.
 
-    def mark_seen(self, listing_id: int, release_id: int, title: str, body: str) -> None:
-        """Record that we've delivered an alert for `listing_id`. Idempotent: re-marking
-        an existing listing is a no-op (kept as INSERT OR IGNORE so a partial duplicate
-        delivery doesn't blow up).
+        Returns:
+            IDs that were in the previous snapshot but are no longer present.
+            They're also recorded in `departed_listings`.
         """
 
+        release_id = int(release_id)
+        present = {int(i) for i in present_ids}
+        evaluated = {int(i): price_key for i, price_key in evaluated.items() if int(i) in present}
         with self._conn:
+            cur = self._conn.execute(
+                "SELECT evaluation_key FROM release_snapshots WHERE release_id = ?", (release_id,)
+            )
+            row = cur.fetchone()
+            previous = {
+                listing_id
+                for (listing_id,) in self._conn.execute(
+                    "SELECT listing_id FROM snapshot_listings WHERE release_id = ?", (release_id,)
+                )
+            }
+            departed = previous - present
+            keep = set(evaluated)
+            if row is not None and row[0] == evaluation_key:
+                keep |= previous & present
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO departed_listings (release_id, listing_id, first_seen_at) "
+                "SELECT release_id, listing_id, first_seen_at FROM snapshot_listings "
+                "WHERE release_id = ? AND listing_id = ?",
+                [(release_id, listing_id) for listing_id in departed],
+            )
+            self._conn.executemany(
+                "DELETE FROM snapshot_listings WHERE release_id = ? AND listing_id = ?",
+                [(release_id, listing_id) for listing_id in previous - keep],
+            )
+            self._conn.executemany(
+                "INSERT INTO snapshot_listings (release_id, listing_id, price_key) VALUES (?, ?, ?) "
+                "ON CONFLICT(release_id, listing_id) DO UPDATE SET price_key = excluded.price_key",
+                [(release_id, listing_id, price_key) for listing_id, price_key in evaluated.items()],
+            )
             self._conn.execute(
-                "INSERT OR IGNORE INTO sent_alerts (listing_id, release_id, title, body) VALUES (?, ?, ?, ?)",
-                (int(listing_id), int(release_id), title, body),
+                "INSERT INTO release_snapshots (release_id, evaluation_key) VALUES (?, ?) "
+                "ON CONFLICT(release_id) DO UPDATE SET "
+                "evaluation_key = excluded.evaluation_key, updated_at = excluded.updated_at",
+                (release_id, evaluation_key),
             )
+        return departed
 
+    @_locked
+    def departed_count(self) -> int:
+        """Return the number of recorded listing departures."""
+
+        cur = self._conn.execute("SELECT COUNT(*) FROM departed_listings")
+        return int(cur.fetchone()[0])
+
+    @_locked
     def count(self) -> int:
         """Return the number of recorded alerts (mostly useful for tests/debug logs)."""
 
         cur = self._conn.execute("SELECT COUNT(*) FROM sent_alerts")
         return int(cur.fetchone()[0])
 
+    @_locked
     def stats(self) -> dict[str, int]:
-        """Return a dict of total / last-24h / last-7d alert counts.
+        """Return a dict of total / last-24h / last-7d alert counts, plus the
+        memory held by the in-memory seen-listing cache (`seen_cache_bytes`).
 
         Used by `loop.loop` at startup (in verbose mode) so the operator can see
         at-a-glance whether the dedup store is actually firing — a sudden jump in
@@ -113,8 +673,10 @@ class AlertStore:
             "total": int(total or 0),
             "last_24h": int(last_24h or 0),
             "last_7d": int(last_7d or 0),
+            "seen_cache_bytes": self._seen.nbytes() + sum(c.nbytes() for c in self._channel_seen.values()),
         }
 
+    @_locked
     def prune_older_than(self, days: int) -> int:
         """Delete alert records older than `days` days. Returns the number of rows
         deleted.
@@ -122,13 +684,63 @@ class AlertStore:
         The store grows ~slowly (one row per delivered alert) but there's no good
         reason to keep records forever. Listings that disappeared from Discogs months
         ago will never reappear, so old rows are pure baggage.
+
+        Departure history, the snapshots of releases not polled within the same
+        window (i.e. dropped from the wantlist) and outbox alerts that have gone
+        undelivered that long are pruned alongside; only the alert rows are
+        counted in the return value.
         """
 
         if days < 0:
             raise ValueError("`days` must be non-negative")
+        cutoff = (f"-{int(days)} days",)
         with self._conn:
-            cur = self._conn.execute(
-                "DELETE FROM sent_alerts WHERE sent_at < datetime('now', ?)",
-                (f"-{int(days)} days",),
+            cur = self._conn.execute("DELETE FROM sent_alerts WHERE sent_at < datetime('now', ?)", cutoff)
+            self._conn.execute("DELETE FROM departed_listings WHERE departed_at < datetime('now', ?)", cutoff)
+            self._conn.execute(
+                "DELETE FROM snapshot_listings WHERE release_id IN "
+                "(SELECT release_id FROM release_snapshots WHERE updated_at < datetime('now', ?))",
+                cutoff,
+            )
+            self._conn.execute("DELETE FROM release_snapshots WHERE updated_at < datetime('now', ?)", cutoff)
+            self._conn.execute(
+                "DELETE FROM outbox_listings WHERE outbox_id IN "
+                "(SELECT id FROM outbox WHERE created_at < datetime('now', ?))",
+                cutoff,
             )
-            return int(cur.rowcount)
+            self._conn.execute("DELETE FROM outbox WHERE created_at < datetime('now', ?)", cutoff)
+            deleted = int(cur.rowcount)
+        if deleted:
+            self._load_seen()
+        return deleted
+
+
+_shared_stores: Dict[Path, AlertStore] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_store(path: Optional[Path] = None) -> AlertStore:
+    """Return the process-wide store for `path` (default: `DEFAULT_STATE_PATH`),
+    opening it on first use.
+
+    Long-running callers — `loop.loop` every iteration, the menubar's stats
+    refresh — use this rather than opening their own `AlertStore`, so the
+    connection (and its statement cache) lives as long as the process. Closing a
+    shared store drops it from the registry; the next call opens a fresh one.
+    """
+
+    key = (Path(path) if path is not None else DEFAULT_STATE_PATH).resolve()
+    with _shared_lock:
+        store = _shared_stores.get(key)
+        if store is None:
+            store = _shared_stores[key] = AlertStore(key)
+        return store
+
+
+def close_shared_stores() -> None:
+    """Close every store handed out by `shared_store` (at process shutdown)."""
+
+    with _shared_lock:
+        stores = list(_shared_stores.values())
+    for store in stores:
+        store.close()
@@ -0,0 +1,83 @@
+"""Multi-tenant mode: one process serving several users' configs.
+
+Running one ``python -m discogs_alert`` per collector means one curl session,
+one page cache and one currency cache per collector, and a release on five
+wantlists is scraped five times. Passing several ``--config`` files instead
+runs every user's loop in one process (``__main__._run_tenants``):
+
+- each tenant keeps what's personal to it — its ``UserTokenClient`` (its own
+  Discogs token and API rate limit), alerters, schedule and state DB;
+- all tenants share one ``AnonClient``, so the marketplace session, parse
+  pool, scrape rate limit and page cache are paid for once, and a
+  `da_coordinator.ReleaseCoordinator` in front of it scrapes a release wanted
+  by several tenants once per cycle. Tenants on their own schedules don't
+  always fall due in the same cycle, so a page fetched in the last
+  `TENANT_PAGE_MAX_AGE` seconds is served from the cache across cycles too;
+- the currency rates cache (`util.currency`) is per process, so it's shared
+  already.
+
+Dedup stays per tenant: each one needs a state DB of its own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Awaitable, Sequence
+
+from discogs_alert import client as da_client, config as da_config, state as da_state
+
+logger = logging.getLogger(__name__)
+
+# How long a marketplace page fetched for one tenant is reused for the others.
+TENANT_PAGE_MAX_AGE = 60
+
+
+def check_tenants(cfgs: Sequence[da_config.Config]) -> None:
+    """Raise ValueError unless every tenant has a state DB of its own."""
+
+    seen = {}
+    for i, cfg in enumerate(cfgs):
+        path = Path(cfg.runtime.state_path or da_state.DEFAULT_STATE_PATH).expanduser().resolve()
+        if path in seen:
+            raise ValueError(
+                f"configs {seen[path] + 1} and {i + 1} share the state DB {path}; "
+                "set a distinct runtime.state_path for each"
+            )
+        seen[path] = i
+
+
+def shared_anon_client(cfgs: Sequence[da_config.Config]) -> da_client.AnonClient:
+    """The ``AnonClient`` every tenant scrapes through.
+
+    Scraping settings come from the first config; its scrape rate limit now
+    covers every tenant's requests, as they all leave from the same address.
+    """
+
+    runtime = cfgs[0].runtime
+    return da_client.AnonClient(
+        cfgs[0].user_agent,
+        parser_backend=runtime.parser,
+        parse_workers=runtime.parse_workers,
+        parse_executor=runtime.parse_executor,
+        requests_per_minute=runtime.scrape_requests_per_minute,
+        page_max_age=TENANT_PAGE_MAX_AGE,
+    )
+
+
+async def run_all(runs: Sequence[Awaitable[None]]) -> None:
+    """Run the tenants' loops concurrently. If one fails, the others are
+    cancelled and its error propagates.
+    """
+
+    tasks = [asyncio.ensure_future(run) for run in runs]
+    try:
+        done, _pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
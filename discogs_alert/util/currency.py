@@ -11,18 +11,32 @@ Two layers of caching:
    single process.
 2. On-disk weekly cache under `CACHE_DIR` — survives process restarts (cron
    deployments, container restarts) and keeps the rate of upstream calls down
-   to roughly one per (currency, week).
+   to roughly one a week. Every week's rates live in one
+   memory-mapped `RatesStore` file, so when Frankfurter is down the newest
+   stale rates are found without scanning a directory.
+
+Whatever the base currency, only `REFERENCE_CURRENCY`'s rates are fetched;
+the rest are cross rates derived from them.
+
+`get_currency_rates` blocks; the loop fetches through an async
+`RatesProvider` instead, which keeps its own in-memory copy (refreshed in the
+background ahead of expiry) on top of the same disk cache. A `ConversionTable`
+snapshots one target currency's rates for the duration of a loop iteration.
 """
 
-import json
+import asyncio
+import dataclasses
 import logging
 import os
 import pathlib
+import time
 from datetime import datetime
-from typing import Union
+from typing import Any, Callable, Dict, Iterable, Optional, Union
 
+import httpx
 import requests
 
+from discogs_alert.util import rates_store as da_rates_store
 from discogs_alert.util.constants import CURRENCY_CHOICES
 from discogs_alert.util.system import time_cache
 
@@ -30,12 +44,24 @@ CurrencyRates = dict[str, Union[int, float]]
 
 FRANKFURTER_BASE_URL = "https://api.frankfurter.app"
 HTTP_TIMEOUT_SECONDS = 10
-
-# Directory in which to store weekly CurrencyRates JSON caches. Same env-var name
-# as the previous freecurrencyapi-based implementation, for ergonomic continuity.
+# `RatesProvider`: how long rates are kept, how long before expiry they're
+# refreshed in the background, and how long to wait after a failed refresh.
+DEFAULT_RATES_TTL = 3600
+DEFAULT_RATES_REFRESH_AHEAD = 300
+RATES_RETRY_SECONDS = 60
+# The only base currency rates are fetched (and cached) against: the ECB's own,
+# which Frankfurter's other bases are derived from anyway. Rates against any
+# other base are cross rates (see `cross_rates`).
+REFERENCE_CURRENCY = "EUR"
+
+# Directory holding the weekly rates store (see `da_rates_store`). Same env-var
+# name as the previous freecurrencyapi-based implementation, for ergonomic
+# continuity.
 CACHE_DIR = pathlib.Path(
     os.getenv("DA_CURRENCY_CACHE_DIR", pathlib.Path(__file__).parent.parent.parent.resolve() / ".currency_cache")
 )
+RATES_STORE_FILE = "rates.bin"
+_stores: Dict[pathlib.Path, da_rates_store.RatesStore] = {}
 
 logger = logging.getLogger(__name__)
 
@@ -48,27 +74,115 @@ class CurrencyProviderError(Exception):
     """Raised when the upstream currency provider is unreachable or returns an unexpected payload."""
 
 
-def _disk_cache_path(base_currency: str) -> pathlib.Path:
-    now = datetime.now().isocalendar()
-    return CACHE_DIR / f"{now.year}-{now.week}-{base_currency}.json"
+def _rates_store() -> da_rates_store.RatesStore:
+    """The `RatesStore` under (the current) `CACHE_DIR`."""
+
+    path = CACHE_DIR / RATES_STORE_FILE
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = da_rates_store.RatesStore(path, REFERENCE_CURRENCY)
+    return store
+
+
+def rates_period() -> str:
+    """The week the current rates belong to (ISO date of its Monday): rates
+    are fetched, and cached on disk, once a week, so they don't move within it.
+    """
+
+    return da_rates_store.week_of(datetime.now().date()).isoformat()
+
+
+def _check_base(base_currency: str) -> None:
+    if base_currency not in CURRENCY_CHOICES:
+        raise InvalidCurrencyException(
+            f"{base_currency} is not a supported currency (see `discogs_alert/util/constants.py`)."
+        )
+
+
+def _read_disk_cache() -> Optional[CurrencyRates]:
+    """This week's on-disk `REFERENCE_CURRENCY` rates, if there are any."""
 
+    try:
+        return _rates_store().get(datetime.now().date())
+    except (OSError, ValueError):
+        logger.warning("Failed to read currency cache %s; refetching", _rates_store().path, exc_info=True)
+    return None
 
-def _newest_stale_cache(base_currency: str) -> pathlib.Path | None:
-    """Return the most recent on-disk cache for `base_currency`, regardless of week.
 
-    Used as a fallback when Frankfurter is unreachable and we don't have a
-    current-week cache: rates change slowly enough (cents on the dollar) that
-    last week's rates are far better than crashing the loop.
+def _rates_from_payload(payload: Any) -> CurrencyRates:
+    rates = payload.get("rates") if isinstance(payload, dict) else None
+    if not isinstance(rates, dict):
+        raise CurrencyProviderError(f"Frankfurter response missing 'rates': {payload!r}")
+    return rates
+
+
+def _stale_rates_or_raise(exc: Exception) -> CurrencyRates:
+    """Upstream is unreachable / errored / returned junk. Fall back to the
+    newest stale `REFERENCE_CURRENCY` rates if we have any — rates only
+    drift slowly, and a stale conversion is far better than crashing the loop.
+    Only raise if we have no cache to fall back to.
     """
 
-    if not CACHE_DIR.exists():
-        return None
-    candidates = sorted(
-        CACHE_DIR.glob(f"*-{base_currency}.json"),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )
-    return candidates[0] if candidates else None
+    try:
+        stale = _rates_store().latest()
+    except (OSError, ValueError):
+        logger.warning("Currency cache %s unreadable", _rates_store().path, exc_info=True)
+        stale = None
+    if stale is not None:
+        week, rates = stale
+        logger.warning("Frankfurter unreachable (%s); falling back to rates from the week of %s", exc, week)
+        return rates
+    raise CurrencyProviderError(
+        f"Failed to reach Frankfurter for base {REFERENCE_CURRENCY} and no usable cache: {exc}"
+    ) from exc
+
+
+def _store_fresh_rates(rates: CurrencyRates) -> CurrencyRates:
+    # Frankfurter omits the base currency from `rates`; include it so callers
+    # may safely look it up.
+    rates[REFERENCE_CURRENCY] = 1.0
+
+    try:
+        _rates_store().put(rates, datetime.now().date())
+    except (OSError, TypeError, ValueError):
+        # Caching is best-effort; don't fail the whole request just because we
+        # can't write to disk.
+        logger.warning("Failed to write currency cache %s", _rates_store().path, exc_info=True)
+
+    return rates
+
+
+def cross_rates(reference: CurrencyRates, base_currency: str) -> CurrencyRates:
+    """Re-express `reference`, rates against `REFERENCE_CURRENCY`, against
+    `base_currency` instead: units of each currency per 1 `base_currency`.
+
+    Raises:
+        CurrencyProviderError: if `reference` has no rate for `base_currency`.
+    """
+
+    pivot = reference.get(base_currency)
+    if not pivot:
+        raise CurrencyProviderError(f"No {base_currency} rate to derive cross rates from")
+    rates = {code: rate / pivot for code, rate in reference.items()}
+    rates[base_currency] = 1.0
+    return rates
+
+
+def _fetch_reference_rates() -> CurrencyRates:
+    cached = _read_disk_cache()
+    if cached is not None:
+        return cached
+
+    try:
+        response = requests.get(
+            f"{FRANKFURTER_BASE_URL}/latest", params={"base": REFERENCE_CURRENCY}, timeout=HTTP_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        rates = _rates_from_payload(response.json())
+    except (requests.RequestException, ValueError, CurrencyProviderError) as exc:
+        return _stale_rates_or_raise(exc)
+
+    return _store_fresh_rates(rates)
 
 
 @time_cache(seconds=3600)
@@ -80,6 +194,12 @@ def get_currency_rates(base_currency: str) -> CurrencyRates:
     (price-threshold checks against vinyl listings), so weekly resolution is
     plenty.
 
+    Only `REFERENCE_CURRENCY`'s rates are ever fetched (or cached on disk);
+    any other base's are cross rates worked out from them, so however many
+    currencies are in use there's one upstream request per refresh.
+
+    Blocking; code on the event loop should use a `RatesProvider` instead.
+
     Args:
         base_currency: a 3-letter ISO 4217 currency code, present in
             `CURRENCY_CHOICES`.
@@ -94,59 +214,10 @@ def get_currency_rates(base_currency: str) -> CurrencyRates:
             malformed payload.
     """
 
-    if base_currency not in CURRENCY_CHOICES:
-        raise InvalidCurrencyException(
-            f"{base_currency} is not a supported currency (see `discogs_alert/util/constants.py`)."
-        )
-
-    cache_file = _disk_cache_path(base_currency)
-    if cache_file.exists():
-        try:
-            return json.load(cache_file.open("r"))
-        except (json.JSONDecodeError, OSError):
-            logger.warning("Failed to read currency cache %s; refetching", cache_file, exc_info=True)
-
-    try:
-        response = requests.get(
-            f"{FRANKFURTER_BASE_URL}/latest", params={"base": base_currency}, timeout=HTTP_TIMEOUT_SECONDS
-        )
-        response.raise_for_status()
-        payload = response.json()
-        rates = payload.get("rates")
-        if not isinstance(rates, dict):
-            raise CurrencyProviderError(f"Frankfurter response missing 'rates': {payload!r}")
-    except (requests.RequestException, ValueError, CurrencyProviderError) as exc:
-        # Upstream is unreachable / errored / returned junk. Fall back to the
-        # newest stale cache for this base currency if we have one — rates only
-        # drift slowly, and a stale conversion is far better than crashing the
-        # loop. Only re-raise if we have no cache to fall back to.
-        stale = _newest_stale_cache(base_currency)
-        if stale is not None:
-            try:
-                logger.warning(
-                    "Frankfurter unreachable (%s); falling back to stale cache %s",
-                    exc, stale,
-                )
-                return json.load(stale.open("r"))
-            except (json.JSONDecodeError, OSError):
-                logger.warning("Stale cache %s unreadable", stale, exc_info=True)
-        raise CurrencyProviderError(
-            f"Failed to reach Frankfurter for base {base_currency} and no usable cache: {exc}"
-        ) from exc
-
-    # Frankfurter omits the base currency from `rates`; include it so callers
-    # may safely look it up.
-    rates[base_currency] = 1.0
-
-    try:
-        CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        json.dump(rates, cache_file.open("w"))
-    except OSError:
-        # Caching is best-effort; don't fail the whole request just because we
-        # can't write to disk.
-        logger.warning("Failed to write currency cache %s", cache_file, exc_info=True)
-
-    return rates
+    _check_base(base_currency)
+    if base_currency == REFERENCE_CURRENCY:
+        return _fetch_reference_rates()
+    return cross_rates(get_currency_rates(REFERENCE_CURRENCY), base_currency)
 
 
 def convert_currency(value: float, old_currency: str, new_currency: str) -> float:
@@ -167,10 +238,205 @@ def convert_currency(value: float, old_currency: str, new_currency: str) -> floa
 
     if old_currency == new_currency:
         return float(value)
-    rates = get_currency_rates(new_currency)
+    rates = get_currency_rates(REFERENCE_CURRENCY)
     try:
-        return float(value) / rates[old_currency]
-    except KeyError:
+        return float(value) * rates[new_currency] / rates[old_currency]
+    except KeyError as exc:
         raise InvalidCurrencyException(
-            f"{old_currency} is not a supported currency (see `discogs_alert/util/constants.py`)."
+            f"{exc.args[0]} is not a supported currency (see `discogs_alert/util/constants.py`)."
         )
+
+
+class ConversionTable:
+    """Multipliers from every currency the provider knows into `currency`,
+    looked up at most once.
+
+    `convert_currency` goes through `get_currency_rates`'s `time_cache` on
+    every call, and `Listing.convert_currency` calls it once per price and
+    once per shipping amount. `loop.loop` makes one table per iteration
+    instead, and each conversion is then one dict lookup and a multiply. The
+    rates are only fetched the first time a price isn't already in
+    `currency`: by `ensure_loaded`, through the table's `RatesProvider`
+    without blocking the event loop, or else (blocking) by `factor`.
+
+    If the rates couldn't be fetched, the table remembers why and every
+    conversion out of another currency raises it, as `convert_currency` would.
+    """
+
+    def __init__(
+        self, currency: str, rates: Optional[CurrencyRates] = None, provider: Optional["RatesProvider"] = None
+    ) -> None:
+        self.currency = currency
+        self.provider = provider
+        self._factors: Optional[dict[str, float]] = None
+        self._error: Optional[Exception] = None
+        if rates is not None:
+            self._set_rates(rates)
+
+    def _set_rates(self, rates: CurrencyRates) -> None:
+        self._factors = {code: 1.0 / rate for code, rate in rates.items() if rate}
+        self._factors[self.currency] = 1.0
+
+    @property
+    def loaded(self) -> bool:
+        return self._factors is not None or self._error is not None
+
+    async def ensure_loaded(self, currencies: Iterable[Optional[str]]) -> None:
+        """Fetch the rates, unless they're loaded already or none of
+        `currencies` needs converting.
+        """
+
+        if self.loaded or all(code in (None, self.currency) for code in currencies):
+            return
+        try:
+            if self.provider is not None:
+                rates = await self.provider.get_rates(self.currency)
+            else:
+                rates = await asyncio.to_thread(get_currency_rates, self.currency)
+        except (InvalidCurrencyException, CurrencyProviderError) as exc:
+            if not self.loaded:
+                self._error = exc
+        else:
+            if not self.loaded:
+                self._set_rates(rates)
+
+    def factor(self, old_currency: str) -> float:
+        """The multiplier from `old_currency` into `currency`.
+
+        Raises:
+            InvalidCurrencyException: if `old_currency` is unknown.
+            CurrencyProviderError: if the rates couldn't be fetched.
+        """
+
+        if old_currency == self.currency:
+            return 1.0
+        if not self.loaded:
+            try:
+                self._set_rates(get_currency_rates(self.currency))
+            except (InvalidCurrencyException, CurrencyProviderError) as exc:
+                self._error = exc
+        if self._error is not None:
+            raise type(self._error)(str(self._error))
+        try:
+            return self._factors[old_currency]
+        except KeyError:
+            raise InvalidCurrencyException(
+                f"{old_currency} is not a supported currency (see `discogs_alert/util/constants.py`)."
+            )
+
+    def convert(self, value: float, old_currency: str) -> float:
+        return float(value) * self.factor(old_currency)
+
+
+@dataclasses.dataclass
+class _RatesEntry:
+    # Against `REFERENCE_CURRENCY`.
+    rates: CurrencyRates
+    fetched_at: float
+    # After a failed refresh, don't try again before this.
+    retry_at: float = 0.0
+    # Cross rates worked out from `rates`, by base currency.
+    derived: Dict[str, CurrencyRates] = dataclasses.field(default_factory=dict)
+
+
+class RatesProvider:
+    """`get_currency_rates` for code running on the event loop.
+
+    Fetches through one long-lived ``httpx.AsyncClient`` of its own (the
+    Discogs API client's pool adds the user token to every request, which
+    has no business going to Frankfurter), and shares the weekly on-disk
+    cache and stale-cache fallback with `get_currency_rates`.
+
+    Like `get_currency_rates`, it only fetches `REFERENCE_CURRENCY`'s rates
+    and derives every other base's from them. They're kept for `ttl`
+    seconds. Concurrent requests for rates that aren't cached share a single
+    fetch. Within `refresh_ahead` seconds of expiry, callers get the cached
+    rates straight away while one refresh runs in the background, so a warm
+    process never waits on Frankfurter. If a refresh fails, the old rates stay in use (and
+    the refresh is retried after `RATES_RETRY_SECONDS`).
+
+    A runner holds one for the life of the process and passes it to every
+    `loop.loop` iteration; close it with `aclose`.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_RATES_TTL,
+        refresh_ahead: float = DEFAULT_RATES_REFRESH_AHEAD,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 <= refresh_ahead < ttl:
+            raise ValueError("refresh_ahead must be non-negative and shorter than ttl")
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self._clock = clock
+        self._entry: Optional[_RatesEntry] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._client = httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS)
+
+    async def aclose(self) -> None:
+        if self._inflight is not None:
+            self._inflight.cancel()
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "RatesProvider":
+        return self
+
+    async def __aexit__(self, *_exc) -> None:
+        await self.aclose()
+
+    async def get_rates(self, base_currency: str) -> CurrencyRates:
+        """Same contract as `get_currency_rates`."""
+
+        _check_base(base_currency)
+        entry = await self._reference_entry()
+        rates = entry.derived.get(base_currency)
+        if rates is None:
+            rates = entry.derived[base_currency] = cross_rates(entry.rates, base_currency)
+        return rates
+
+    async def _reference_entry(self) -> _RatesEntry:
+        entry = self._entry
+        if entry is None:
+            return await asyncio.shield(self._refresh())
+        now = self._clock()
+        age = now - entry.fetched_at
+        if now < entry.retry_at or age < self.ttl - self.refresh_ahead:
+            return entry
+        task = self._refresh()
+        if age < self.ttl:
+            return entry
+        try:
+            return await asyncio.shield(task)
+        except CurrencyProviderError:
+            return entry
+
+    def _refresh(self) -> asyncio.Task:
+        if self._inflight is None:
+            # A task of its own, so one caller being cancelled doesn't cancel
+            # the fetch under the others (or a background refresh).
+            self._inflight = asyncio.ensure_future(self._fetch())
+            self._inflight.add_done_callback(self._fetched)
+        return self._inflight
+
+    def _fetched(self, task: asyncio.Task) -> None:
+        self._inflight = None
+        if task.cancelled() or task.exception() is None:
+            return
+        if self._entry is not None:
+            logger.warning("Couldn't refresh currency rates; keeping the old ones: %s", task.exception())
+            self._entry.retry_at = self._clock() + RATES_RETRY_SECONDS
+
+    async def _fetch(self) -> _RatesEntry:
+        rates = _read_disk_cache()
+        if rates is None:
+            try:
+                response = await self._client.get(
+                    f"{FRANKFURTER_BASE_URL}/latest", params={"base": REFERENCE_CURRENCY}
+                )
+                response.raise_for_status()
+                rates = _store_fresh_rates(_rates_from_payload(response.json()))
+            except (httpx.HTTPError, ValueError, CurrencyProviderError) as exc:
+                rates = _stale_rates_or_raise(exc)
+        self._entry = _RatesEntry(rates, self._clock())
+        return self._entry
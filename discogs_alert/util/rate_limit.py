@@ -11,6 +11,13 @@ Hitting zero gets us a 429 with a `Retry-After` and, in practice, a few
 seconds of cool-off. A `RateLimitGuard` watches the headers and proactively
 sleeps before requests when we're close to the floor — cheaper than burning
 a request and getting throttled.
+
+Sleeping out the whole window at the floor stalls every concurrent request for
+a minute, though, so the clients pace themselves with a `TokenBucket` instead:
+requests are spread evenly across the minute, and the headers only correct the
+bucket when Discogs has counted more usage than we have (another process
+sharing the token, say). The same bucket class, with its own rate, paces the
+Cloudflare-facing marketplace scrapes.
 """
 
 from __future__ import annotations
@@ -24,6 +31,8 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_MIN_REMAINING = 2  # don't go below 2 unless we've just slept
 DEFAULT_SLEEP_SECONDS = 60  # Discogs's window is one minute
+DEFAULT_API_REQUESTS_PER_MINUTE = 60  # Discogs's documented authenticated limit
+DEFAULT_BURST = 4  # requests a full bucket lets through back-to-back
 
 
 class RateLimitGuard:
@@ -54,9 +63,6 @@ class RateLimitGuard:
         self.remaining: Optional[int] = None
         self.limit: Optional[int] = None
         self.used: Optional[int] = None
-        # Lazily-created so the guard can be used on either sync or async paths
-        # without forcing an event loop at construction time.
-        self._async_lock: Optional[asyncio.Lock] = None
 
     def update_from_headers(self, headers: Mapping[str, str]) -> None:
         """Store the most recent header values. Missing headers leave the
@@ -96,22 +102,83 @@ class RateLimitGuard:
             self._sleep(self.sleep_seconds)
             self.remaining = None
 
-    async def before_request_async(self) -> None:
-        """Async variant: serialised across coroutines via an `asyncio.Lock` so
-        a fan-out of concurrent requests doesn't all see the same `remaining`
-        value and overshoot. Sleeps cooperatively with `asyncio.sleep` rather
-        than blocking the event loop.
+
+class TokenBucket:
+    """Async token-bucket limiter: `rate_per_minute` tokens a minute, at most
+    `burst` banked.
+
+    `acquire` reserves the next token and sleeps until it's due, so concurrent
+    callers queue up at evenly spaced slots (one every ``60 / rate_per_minute``
+    seconds) rather than all waking at once. Reservations are made between
+    awaits, so no lock is needed on a single event loop.
+
+    Intended use:
+
+        bucket = TokenBucket(rate_per_minute=60)
+        await bucket.acquire()              # sleeps if needed
+        resp = await client.get(...)
+        bucket.correct(limit=..., remaining=...)
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = DEFAULT_API_REQUESTS_PER_MINUTE,
+        burst: int = DEFAULT_BURST,
+        min_remaining: int = DEFAULT_MIN_REMAINING,
+        clock=time.monotonic,
+        sleep_fn=asyncio.sleep,
+    ) -> None:
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if min_remaining < 0:
+            raise ValueError("min_remaining must be non-negative")
+        self.rate_per_minute = float(rate_per_minute)
+        self.burst = burst
+        self.min_remaining = min_remaining
+        self._clock = clock
+        self._sleep = sleep_fn
+        self._tokens = float(burst)
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate_per_minute / 60)
+        self._updated_at = now
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently banked; negative while callers are queued."""
+
+        self._refill()
+        return self._tokens
+
+    async def acquire(self) -> float:
+        """Take a token, sleeping until one is available. Returns the seconds
+        waited.
+        """
+
+        self._refill()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        wait = -self._tokens * 60 / self.rate_per_minute
+        await self._sleep(wait)
+        return wait
+
+    def correct(self, limit: Optional[int] = None, remaining: Optional[int] = None) -> None:
+        """Reconcile with what the server says.
+
+        A `limit` below the bucket's rate lowers the refill rate to match. A
+        `remaining` lower than what the bucket holds (keeping `min_remaining`
+        in reserve) drains the bucket to match. Higher values of either are
+        ignored — the headers can only ever slow us down.
         """
 
-        if self._async_lock is None:
-            self._async_lock = asyncio.Lock()
-        async with self._async_lock:
-            if self.remaining is not None and self.remaining <= self.min_remaining:
-                logger.info(
-                    "Discogs API rate limit at %s/%s — sleeping %ss before next request",
-                    self.remaining,
-                    self.limit,
-                    self.sleep_seconds,
-                )
-                await asyncio.sleep(self.sleep_seconds)
-                self.remaining = None
+        self._refill()
+        if limit is not None and 0 < limit < self.rate_per_minute:
+            logger.info("rate limit is %s/min; slowing down from %s/min", limit, self.rate_per_minute)
+            self.rate_per_minute = float(limit)
+        if remaining is not None:
+            self._tokens = min(self._tokens, float(remaining - self.min_remaining))
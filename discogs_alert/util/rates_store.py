@@ -0,0 +1,194 @@
+"""A single binary file of currency rates, memory-mapped for reading.
+
+The on-disk currency cache used to be one JSON file per (ISO week, base
+currency) under `CACHE_DIR`, and falling back to stale rates meant globbing
+and stat-ing every one of them. A `RatesStore` keeps them all in one file
+instead. Only one base currency's rates are ever fetched (every other base's
+are cross rates derived from them; see `currency.cross_rates`), so each week
+is a single vector against that reference currency:
+
+    magic      8 bytes   b"DARATES2"
+    reference  3 bytes   ASCII code of the reference currency
+    count      uint16    number of currencies, n
+    index      n * 3     ASCII currency codes, in sorted order
+    padding              to a multiple of 8 bytes
+    records              one per week, oldest first:
+      period   int64        proleptic ordinal of the week's Monday
+      rates    n float64    units of each currency per unit of the
+                            reference currency. NaN where unknown.
+
+Everything is little-endian. The file is opened read-only with ``mmap``, and
+looking a week up is one dict lookup plus one `struct.unpack_from`. Writers
+rewrite the whole file (a few hundred bytes a week) into a temporary file and
+rename it over the old one, so readers in other processes never see a
+half-written record; each read checks the file's identity with one ``stat``
+and re-maps it if it's been replaced.
+
+If the header in the file doesn't match the store's (an older format, another
+reference currency, or the supported currencies changed), the file is treated
+as empty and rewritten on the next `put`.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import mmap
+import os
+import pathlib
+import struct
+import tempfile
+import threading
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from discogs_alert.util.constants import CURRENCY_CHOICES
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DARATES2"
+_COUNT = struct.Struct("<H")
+_PERIOD = struct.Struct("<q")
+
+
+def week_of(day: date) -> date:
+    """The Monday of `day`'s ISO week, which is how records are keyed."""
+
+    return day - timedelta(days=day.weekday())
+
+
+class RatesStore:
+    """Weekly rates against the `reference` currency, in one file at `path`.
+
+    Safe to share between threads; several processes may share the file.
+    """
+
+    def __init__(self, path: pathlib.Path, reference: str, currencies: Iterable[str] = CURRENCY_CHOICES) -> None:
+        self.path = pathlib.Path(path)
+        self.reference = reference
+        self.currencies: Tuple[str, ...] = tuple(sorted(currencies))
+        if reference not in self.currencies:
+            raise ValueError(f"reference currency {reference!r} isn't one of the store's currencies")
+        self._columns = {code: i for i, code in enumerate(self.currencies)}
+        n = len(self.currencies)
+        self._header = MAGIC + reference.encode("ascii") + _COUNT.pack(n) + "".join(self.currencies).encode("ascii")
+        self._header += bytes(-len(self._header) % 8)
+        self._rates = struct.Struct(f"<{n}d")
+        self._record_size = _PERIOD.size + self._rates.size
+        self._lock = threading.Lock()
+        self._map: Optional[mmap.mmap] = None
+        self._identity: Optional[Tuple[int, int, int]] = None
+        # Each record's week ordinal (records are kept oldest first), and the
+        # reverse mapping.
+        self._weeks: List[int] = []
+        self._records: Dict[int, int] = {}
+
+    def close(self) -> None:
+        with self._lock:
+            self._unmap()
+
+    def get(self, day: date) -> Optional[Dict[str, float]]:
+        """The rates for the week containing `day`, if stored."""
+
+        with self._lock:
+            self._refresh()
+            record = self._records.get(week_of(day).toordinal())
+            return None if record is None else self._read(record)
+
+    def latest(self) -> Optional[Tuple[date, Dict[str, float]]]:
+        """The newest week with rates stored, and those rates."""
+
+        with self._lock:
+            self._refresh()
+            if not self._weeks:
+                return None
+            record = len(self._weeks) - 1
+            return date.fromordinal(self._weeks[record]), self._read(record)
+
+    def weeks(self) -> List[date]:
+        """Every week with a record, oldest first."""
+
+        with self._lock:
+            self._refresh()
+            return [date.fromordinal(ordinal) for ordinal in self._weeks]
+
+    def put(self, rates: Dict[str, float], day: date) -> None:
+        """Store `rates` (against the reference currency) for the week
+        containing `day`, replacing any already stored for it.
+
+        Currencies outside the store's index are dropped. Raises ``OSError``
+        if the file can't be written.
+        """
+
+        values = [math.nan] * len(self.currencies)
+        for code, rate in rates.items():
+            column = self._columns.get(code)
+            if column is not None:
+                values[column] = float(rate)
+        values[self._columns[self.reference]] = 1.0
+        week = week_of(day).toordinal()
+
+        with self._lock:
+            self._refresh()
+            records = {
+                ordinal: self._map[self._offset(record):self._offset(record) + self._record_size]
+                for ordinal, record in self._records.items()
+            }
+            records[week] = _PERIOD.pack(week) + self._rates.pack(*values)
+            self._write(b"".join(records[ordinal] for ordinal in sorted(records)))
+            self._unmap()
+            self._refresh()
+
+    def _offset(self, record: int) -> int:
+        return len(self._header) + record * self._record_size
+
+    def _read(self, record: int) -> Dict[str, float]:
+        values = self._rates.unpack_from(self._map, self._offset(record) + _PERIOD.size)
+        return {code: rate for code, rate in zip(self.currencies, values) if not math.isnan(rate)}
+
+    def _refresh(self) -> None:
+        """(Re-)map the file if it's been replaced since we last looked."""
+
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._unmap()
+            return
+        identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if identity == self._identity:
+            return
+        self._unmap()
+        self._identity = identity
+        if st.st_size <= len(self._header):
+            return
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(self._header)] != self._header:
+            logger.warning("Currency rates store %s has a different format or currency index; ignoring it", self.path)
+            return
+        count = (st.st_size - len(self._header)) // self._record_size
+        self._weeks = [_PERIOD.unpack_from(self._map, self._offset(i))[0] for i in range(count)]
+        self._records = {ordinal: i for i, ordinal in enumerate(self._weeks)}
+
+    def _unmap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._identity = None
+        self._weeks = []
+        self._records = {}
+
+    def _write(self, records: bytes) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._header)
+                f.write(records)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
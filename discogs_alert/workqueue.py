@@ -0,0 +1,232 @@
+"""Coordinator / worker split over a shared work queue.
+
+One `loop.loop` process is capped by ``max_concurrency`` and a single egress
+IP. To scale scraping out, the loop's two halves can run in separate
+processes (``--role``):
+
+- the **coordinator** owns the wantlist and the `ReleaseScheduler`. Each tick
+  it puts the releases that are due on a `WorkQueue`, and reschedules a
+  release once a worker reports back what it saw (`coordinate`);
+- **workers** claim releases off the queue and check them exactly as the
+  standalone loop does (``loop.loop(work_queue=...)`` runs
+  `_gated_process_release` on the claimed releases), then complete each job
+  with the scheduler observations made while checking it (`Observations`).
+
+Claims are leased: a job whose worker dies is handed to another worker once
+its lease runs out. Each release is on the queue at most once at a time.
+
+Every worker uses the same state DB, and dedup stays correct because it's
+enforced by the database itself: `AlertStore.enqueue_alert` only takes
+listings that aren't alerted on or pending for the channel, in a single
+insert, so two workers can't both alert on a listing.
+
+Queues are pluggable (`open_work_queue`), by URL scheme. The one built in,
+``sqlite:///path/to/queue.db``, is a SQLite database; it serves any number of
+processes on one machine, or hosts sharing a filesystem that supports SQLite
+locking.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from discogs_alert import entities as da_entities, scheduler as da_scheduler
+
+logger = logging.getLogger(__name__)
+
+ROLES = ("standalone", "coordinator", "worker")
+# How long a worker owns a claimed job before it may be handed to another.
+DEFAULT_LEASE_SECONDS = 600
+# How long an idle worker waits before looking for work again.
+WORKER_POLL_SECONDS = 5
+
+
+class Job(NamedTuple):
+    id: int
+    release: da_entities.Release
+
+
+class Observations:
+    """Records what checking releases told the scheduler, to replay it on the
+    coordinator's `ReleaseScheduler`. Stands in for the scheduler on a worker.
+    """
+
+    def __init__(self) -> None:
+        self._by_release: Dict[int, Dict[str, Any]] = {}
+
+    def observe_stats(self, release_id: int, num_for_sale: int, price_ratio: Optional[float]) -> None:
+        self._by_release.setdefault(release_id, {})["stats"] = [num_for_sale, price_ratio]
+
+    def observe_listings(self, release_id: int, changed: bool) -> None:
+        self._by_release.setdefault(release_id, {})["changed"] = changed
+
+    def pop(self, release_id: int) -> Dict[str, Any]:
+        return self._by_release.pop(release_id, {})
+
+    @staticmethod
+    def replay(scheduler: da_scheduler.ReleaseScheduler, release_id: int, observed: Dict[str, Any]) -> None:
+        if "stats" in observed:
+            scheduler.observe_stats(release_id, *observed["stats"])
+        if "changed" in observed:
+            scheduler.observe_listings(release_id, observed["changed"])
+
+
+class WorkQueue:
+    """Base class for work queues.
+
+    Subclasses implement the four operations below; all of them must be safe
+    to call from several processes at once.
+    """
+
+    def put_many(self, releases: Iterable[da_entities.Release]) -> int:
+        """Queue a job per release, skipping releases already queued or
+        claimed. Returns the number queued.
+        """
+
+        raise NotImplementedError
+
+    def claim(self, limit: int, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> List[Job]:
+        """Lease up to `limit` queued jobs (oldest first) to the caller."""
+
+        raise NotImplementedError
+
+    def complete(self, job_id: int, observed: Dict[str, Any]) -> None:
+        """Mark a claimed job done, with the scheduler observations made."""
+
+        raise NotImplementedError
+
+    def collect(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """Remove and return the completed jobs' ``(release_id, observed)``."""
+
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteWorkQueue(WorkQueue):
+    """A `WorkQueue` in a SQLite database shared by every process using it."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit; each operation takes the write lock up front, so a claim
+        # can't race another process's claim of the same jobs.
+        self._conn = sqlite3.connect(self.path, isolation_level=None, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                release_id INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0,
+                leased_until REAL NOT NULL DEFAULT 0,
+                observed TEXT
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_open_release ON jobs (release_id) WHERE done = 0;
+            """
+        )
+
+    def _write(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def put_many(self, releases: Iterable[da_entities.Release]) -> int:
+        rows = [(release.id, release.model_dump_json()) for release in releases]
+        return self._write(
+            lambda conn: conn.executemany(
+                "INSERT OR IGNORE INTO jobs (release_id, payload) VALUES (?, ?)", rows
+            ).rowcount
+        )
+
+    def claim(self, limit: int, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> List[Job]:
+        def _claim(conn: sqlite3.Connection) -> List[Job]:
+            now = time.time()
+            rows = conn.execute(
+                "SELECT id, payload FROM jobs WHERE done = 0 AND leased_until <= ? ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET leased_until = ? WHERE id = ?", [(now + lease_seconds, job_id) for job_id, _ in rows]
+            )
+            return [Job(job_id, da_entities.Release.model_validate_json(payload)) for job_id, payload in rows]
+
+        return self._write(_claim)
+
+    def complete(self, job_id: int, observed: Dict[str, Any]) -> None:
+        self._write(
+            lambda conn: conn.execute(
+                "UPDATE jobs SET done = 1, observed = ? WHERE id = ?", (json.dumps(observed), job_id)
+            )
+        )
+
+    def collect(self) -> List[Tuple[int, Dict[str, Any]]]:
+        def _collect(conn: sqlite3.Connection) -> List[Tuple[int, Dict[str, Any]]]:
+            rows = conn.execute("SELECT release_id, observed FROM jobs WHERE done = 1 ORDER BY id").fetchall()
+            conn.execute("DELETE FROM jobs WHERE done = 1")
+            return [(release_id, json.loads(observed or "{}")) for release_id, observed in rows]
+
+        return self._write(_collect)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_BACKENDS = {"sqlite": SqliteWorkQueue}
+
+
+def open_work_queue(url: str) -> WorkQueue:
+    """Open the queue at `url`, e.g. ``sqlite:///var/lib/discogs_alert/queue.db``
+    (a bare path means SQLite too).
+    """
+
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        scheme, rest = "sqlite", url
+    elif scheme == "sqlite":
+        # sqlite:///abs/path -> /abs/path; sqlite://rel/path -> rel/path
+        rest = rest[1:] if rest.startswith("//") else rest
+    if scheme not in _BACKENDS:
+        raise ValueError(f"Unknown work queue {url!r}; available schemes: {sorted(_BACKENDS)}")
+    return _BACKENDS[scheme](Path(rest))
+
+
+def coordinate(
+    queue: WorkQueue,
+    wantlist: List[da_entities.Release],
+    scheduler: Optional[da_scheduler.ReleaseScheduler],
+    verbose: bool = False,
+) -> int:
+    """One coordinator tick: fold finished jobs back into the scheduler, then
+    queue the releases due now (every release, without a scheduler). Returns
+    the number of jobs queued.
+    """
+
+    finished = queue.collect()
+    if scheduler is not None:
+        scheduler.sync(release.id for release in wantlist)
+        for release_id, observed in finished:
+            Observations.replay(scheduler, release_id, observed)
+            scheduler.reschedule(release_id)
+        by_id = {release.id: release for release in wantlist}
+        wantlist = [by_id[release_id] for release_id in scheduler.pop_due()]
+    queued = queue.put_many(wantlist)
+    if verbose:
+        logger.info("%d job(s) finished, %d release(s) queued", len(finished), queued)
+    return queued
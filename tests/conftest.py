@@ -5,6 +5,7 @@ from typing import List
 
 import pytest
 
+from discogs_alert import state as da_state
 from discogs_alert.util import currency as da_currency
 
 
@@ -26,6 +27,16 @@ def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item
             item.add_marker(skip_online_test)
 
 
+@pytest.fixture(autouse=True)
+def _close_shared_stores():
+    """`loop.loop` opens process-wide stores via `da_state.shared_store`; don't
+    let one test's store (and its open file handles) leak into the next.
+    """
+
+    yield
+    da_state.close_shared_stores()
+
+
 @pytest.fixture
 def rates() -> da_currency.CurrencyRates:
     test_dir = os.path.dirname(os.path.abspath(__file__))
@@ -34,9 +45,14 @@ def rates() -> da_currency.CurrencyRates:
 
 @pytest.fixture
 def mock_currency_rates(monkeypatch: pytest.MonkeyPatch, rates: da_currency.CurrencyRates):
-    """`da_util.get_currency_rates()` mocked to return the saved currency rates dict in `data/currency_rates.json`"""
+    """`da_util.get_currency_rates()` (and its async twin, `RatesProvider.get_rates`) mocked to return the saved
+    currency rates dict in `data/currency_rates.json`"""
 
     def _mock_currency_rates(*args, **kwargs):
         return rates
 
+    async def _mock_provider_rates(*args, **kwargs):
+        return rates
+
     monkeypatch.setattr(da_currency, "get_currency_rates", _mock_currency_rates)
+    monkeypatch.setattr(da_currency.RatesProvider, "get_rates", _mock_provider_rates)
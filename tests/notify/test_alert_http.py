@@ -0,0 +1,46 @@
+"""Tests for the pooled HTTP session shared by the requests-based alerters."""
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from discogs_alert.alert import ntfy as da_ntfy
+
+
+def _resp(status_code: int = 200) -> MagicMock:
+    resp = MagicMock()
+    resp.status_code = status_code
+    return resp
+
+
+def test_open_alerter_posts_through_one_session(monkeypatch: pytest.MonkeyPatch):
+    sessions = []
+
+    def session_post(self, url, **_kw):
+        sessions.append(self)
+        return _resp()
+
+    monkeypatch.setattr(requests.Session, "post", session_post)
+    monkeypatch.setattr(requests, "post", lambda *_a, **_kw: pytest.fail("unpooled post while open"))
+
+    with da_ntfy.NtfyAlerter(ntfy_topic="t") as alerter:
+        assert alerter.send_alert("a", "b") is True
+        assert alerter.send_alert("c", "d") is True
+    assert len(sessions) == 2 and sessions[0] is sessions[1]
+
+
+def test_close_drops_the_session(monkeypatch: pytest.MonkeyPatch):
+    alerter = da_ntfy.NtfyAlerter(ntfy_topic="t")
+    alerter.open()
+    session = alerter._session
+    alerter.open()  # idempotent
+    assert alerter._session is session
+    alerter.close()
+    alerter.close()
+    assert alerter._session is None
+
+    calls = []
+    monkeypatch.setattr(requests, "post", lambda *_a, **_kw: calls.append(1) or _resp())
+    assert alerter.send_alert("a", "b") is True
+    assert calls == [1]
@@ -13,6 +13,15 @@ from discogs_alert.alert.pushbullet import PushbulletAlerter
 from discogs_alert.alert.telegram import TelegramAlerter
 
 
+@pytest.fixture(autouse=True)
+def _fresh_registry(monkeypatch: pytest.MonkeyPatch):
+    """Tests patch `entry_points`; make sure each builds its own registry and
+    doesn't leave its fakes cached for the next.
+    """
+
+    monkeypatch.setattr(da_alert, "_registry", None)
+
+
 def test_builtins_are_always_registered():
     registry = da_alert.discover_alerters()
     assert registry["PUSHBULLET"] is PushbulletAlerter
@@ -145,3 +154,29 @@ def test_entry_point_non_alerter_subclass_is_skipped(monkeypatch: pytest.MonkeyP
 
     registry = da_alert.discover_alerters()
     assert "WRONGTYPE" not in registry
+
+
+def test_registry_is_discovered_once_until_reloaded(monkeypatch: pytest.MonkeyPatch):
+    calls = []
+
+    def fake_entry_points(group=None):
+        calls.append(group)
+        return []
+
+    monkeypatch.setattr(da_alert, "entry_points", fake_entry_points)
+    invalidations = []
+    monkeypatch.setattr(da_alert.importlib, "invalidate_caches", lambda: invalidations.append(1))
+
+    da_alert.discover_alerters()
+    da_alert.get_alerter("PUSHBULLET", {"pushbullet_token": "T"})
+    da_alert.alerter_names()
+    assert len(calls) == 1
+
+    da_alert.reload_alerters()
+    # Newly installed plugins must be importable.
+    assert len(calls) == 2 and invalidations == [1]
+
+
+def test_discover_alerters_returns_a_copy():
+    da_alert.discover_alerters()["BOGUS"] = Alerter
+    assert "BOGUS" not in da_alert.discover_alerters()
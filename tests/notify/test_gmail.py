@@ -14,16 +14,25 @@ def alerter() -> da_gmail.GmailAlerter:
 
 class _FakeSMTP:
     """Stand-in for ``smtplib.SMTP_SSL`` covering the context-manager + login
-    + send_message + close shape we use. Records the message it received.
+    + send_message + quit / close shape we use. Records the message it
+    received and how many connections were made.
     """
 
     last_login: tuple = ()
     last_message = None
     login_exc: Exception | None = None
     send_exc: Exception | None = None
+    connections = 0
+    closed = 0
 
     def __init__(self, *_args, **_kw):
-        pass
+        _FakeSMTP.connections += 1
+
+    def quit(self):
+        _FakeSMTP.closed += 1
+
+    def close(self):
+        _FakeSMTP.closed += 1
 
     def __enter__(self):
         return self
@@ -48,6 +57,8 @@ def _reset_fake():
     _FakeSMTP.last_message = None
     _FakeSMTP.login_exc = None
     _FakeSMTP.send_exc = None
+    _FakeSMTP.connections = 0
+    _FakeSMTP.closed = 0
 
 
 def test_send_alert_happy_path(monkeypatch: pytest.MonkeyPatch, alerter):
@@ -102,3 +113,58 @@ def test_alerter_uses_smtps_port_465_implicit_tls():
 
     assert da_gmail.SMTP_HOST == "smtp.gmail.com"
     assert da_gmail.SMTP_PORT == 465
+
+
+# -- kept-alive connection ---------------------------------------------------
+
+
+def test_open_alerter_reuses_one_connection(monkeypatch: pytest.MonkeyPatch, alerter):
+    monkeypatch.setattr(da_gmail.smtplib, "SMTP_SSL", _FakeSMTP)
+    with alerter:
+        for i in range(5):
+            assert alerter.send_alert(f"t{i}", "b") is True
+        assert _FakeSMTP.connections == 1
+    assert _FakeSMTP.closed == 1
+
+
+def test_closed_alerter_connects_per_message(monkeypatch: pytest.MonkeyPatch, alerter):
+    monkeypatch.setattr(da_gmail.smtplib, "SMTP_SSL", _FakeSMTP)
+    alerter.send_alert("t1", "b")
+    alerter.send_alert("t2", "b")
+    assert _FakeSMTP.connections == 2
+
+
+def test_idle_connection_is_replaced(monkeypatch: pytest.MonkeyPatch, alerter):
+    monkeypatch.setattr(da_gmail.smtplib, "SMTP_SSL", _FakeSMTP)
+    now = [1000.0]
+    monkeypatch.setattr(da_gmail.time, "monotonic", lambda: now[0])
+    with alerter:
+        alerter.send_alert("t1", "b")
+        now[0] += da_gmail.SMTP_IDLE_SECONDS + 1
+        alerter.send_alert("t2", "b")
+    assert _FakeSMTP.connections == 2
+
+
+def test_dropped_connection_is_retried_once(monkeypatch: pytest.MonkeyPatch, alerter):
+    monkeypatch.setattr(da_gmail.smtplib, "SMTP_SSL", _FakeSMTP)
+    with alerter:
+        assert alerter.send_alert("t1", "b") is True
+        drops = [da_gmail.smtplib.SMTPServerDisconnected("gone")]
+
+        def send_message(self, msg):
+            if drops:
+                raise drops.pop()
+            _FakeSMTP.last_message = msg
+
+        monkeypatch.setattr(_FakeSMTP, "send_message", send_message)
+        assert alerter.send_alert("t2", "b") is True
+    assert _FakeSMTP.connections == 2
+    assert _FakeSMTP.last_message["Subject"] == "t2"
+
+
+def test_failed_send_on_fresh_connection_is_not_retried(monkeypatch: pytest.MonkeyPatch, alerter):
+    _FakeSMTP.send_exc = da_gmail.smtplib.SMTPServerDisconnected("gone")
+    monkeypatch.setattr(da_gmail.smtplib, "SMTP_SSL", _FakeSMTP)
+    with alerter:
+        assert alerter.send_alert("t", "b") is False
+    assert _FakeSMTP.connections == 1
@@ -0,0 +1,134 @@
+"""Tests for columnar listing batches and `filter_batch`."""
+
+import itertools
+import math
+from typing import Optional
+
+import pytest
+
+from discogs_alert import batch as da_batch, entities as da_entities
+from discogs_alert.util import currency as da_currency
+
+C = da_entities.CONDITION
+
+
+def _listing(
+    listing_id: int,
+    value: float = 50,
+    currency: str = "EUR",
+    shipping: Optional[float] = None,
+    availability: Optional[str] = None,
+    media: C = C.NEAR_MINT,
+    sleeve: C = C.NEAR_MINT,
+    rating: Optional[float] = 100.0,
+    sales: int = 100,
+    ships_from: str = "Germany",
+) -> da_entities.Listing:
+    return da_entities.Listing(
+        id=listing_id,
+        availability=availability,
+        media_condition=media,
+        sleeve_condition=sleeve,
+        comment="",
+        seller_num_ratings=sales,
+        seller_avg_rating=rating,
+        seller_ships_from=ships_from,
+        price=da_entities.ListingPrice(
+            currency=currency,
+            value=value,
+            shipping=None if shipping is None else da_entities.ShippingPrice(currency=currency, value=shipping),
+        ),
+    )
+
+
+def _reference_reason(listing, release, currency, country, seller, record, whitelist, blacklist) -> int:
+    """The per-listing checks `filter_batch` replaces, in `process_release`'s order."""
+
+    try:
+        listing = listing.model_copy(deep=True).convert_currency(currency)
+    except Exception:
+        pass
+    if listing.is_definitely_unavailable(country):
+        return da_batch.UNAVAILABLE
+    if not da_entities.conditions_satisfied(listing, release, seller, record, whitelist, blacklist):
+        return da_batch.CONDITIONS
+    if listing.price.currency == currency and listing.price_is_above_threshold(release.price_threshold):
+        return da_batch.ABOVE_THRESHOLD
+    return da_batch.ACCEPTED
+
+
+def test_from_rows_interns_strings_into_codes():
+    batch = da_batch.ListingBatch.from_listings(
+        [_listing(1, ships_from="UK"), _listing(2, shipping=5, ships_from="Germany"), _listing(3, ships_from="UK")]
+    )
+    assert len(batch) == 3
+    assert list(batch.ids) == [1, 2, 3]
+    assert [batch.countries[code] for code in batch.ships_from] == ["UK", "Germany", "UK"]
+    assert len(batch.countries) == 2
+    assert math.isnan(batch.shipping[0]) and batch.shipping[1] == 5
+
+
+def test_filter_batch_matches_per_listing_checks(mock_currency_rates):
+    listings = [
+        _listing(i, value=value, currency=currency, shipping=shipping, availability=availability,
+                 media=media, rating=rating, sales=sales, ships_from=ships_from)
+        for i, (value, currency, shipping, availability, media, rating, sales, ships_from) in enumerate(
+            itertools.product(
+                [40, 95, 150],
+                ["EUR", "GBP"],
+                [None, 10],
+                [None, "Unavailable in Germany"],
+                [C.GOOD, C.NEAR_MINT],
+                [None, 98.0, 100.0],
+                [5, 500],
+                ["Germany", "US", "UK"],
+            )
+        )
+    ]
+    release = da_entities.Release(id=1, display_title="R", price_threshold=100)
+    seller = da_entities.SellerFilters(min_seller_rating=99, min_seller_sales=10)
+    record = da_entities.RecordFilters(min_media_condition=C.VERY_GOOD, min_sleeve_condition=C.NOT_GRADED)
+    for whitelist, blacklist in [(set(), set()), ({"Germany", "UK"}, set()), (set(), {"US"})]:
+        args = (release, "EUR", "Germany", seller, record, whitelist, blacklist)
+        verdicts = da_batch.filter_batch(da_batch.ListingBatch.from_listings(listings), *args)
+        assert list(verdicts.reasons) == [_reference_reason(listing, *args) for listing in listings]
+        assert verdicts.unconverted == set()
+
+
+def test_filter_batch_judges_the_converted_total(mock_currency_rates):
+    verdicts = da_batch.filter_batch(
+        da_batch.ListingBatch.from_listings([_listing(1, value=80, currency="GBP", shipping=10)]),
+        da_entities.Release(id=1, display_title="R", price_threshold=100),
+        "EUR", "Germany", da_entities.SellerFilters(), da_entities.RecordFilters(), set(), set(),
+    )
+    # 90 GBP is under the threshold; its EUR equivalent isn't.
+    assert list(verdicts.reasons) == [da_batch.ABOVE_THRESHOLD]
+
+
+def test_unconvertible_price_is_reported_and_not_judged_on_price(monkeypatch: pytest.MonkeyPatch):
+    def failing_rates(_base):
+        raise da_currency.CurrencyProviderError("down")
+
+    monkeypatch.setattr(da_currency, "get_currency_rates", failing_rates)
+    verdicts = da_batch.filter_batch(
+        da_batch.ListingBatch.from_listings([_listing(1, value=500, currency="GBP"), _listing(2, value=500)]),
+        da_entities.Release(id=1, display_title="R", price_threshold=100),
+        "EUR", "Germany", da_entities.SellerFilters(), da_entities.RecordFilters(), set(), set(),
+    )
+    assert verdicts.unconverted == {0}
+    assert list(verdicts.reasons) == [da_batch.ACCEPTED, da_batch.ABOVE_THRESHOLD]
+
+
+def test_unconvertible_shipping_is_not_judged_on_price(monkeypatch: pytest.MonkeyPatch, rates):
+    without_usd = {code: rate for code, rate in rates.items() if code != "USD"}
+    monkeypatch.setattr(da_currency, "get_currency_rates", lambda _base: without_usd)
+    # 60 EUR plus 60 USD of shipping: no total in EUR, so no price verdict.
+    listing = _listing(1, value=60)
+    listing.price.shipping = da_entities.ShippingPrice(currency="USD", value=60)
+    verdicts = da_batch.filter_batch(
+        da_batch.ListingBatch.from_listings([listing]),
+        da_entities.Release(id=1, display_title="R", price_threshold=100),
+        "EUR", "Germany", da_entities.SellerFilters(), da_entities.RecordFilters(), set(), set(),
+    )
+    assert verdicts.unconverted == {0}
+    assert list(verdicts.reasons) == [da_batch.ACCEPTED]
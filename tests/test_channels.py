@@ -0,0 +1,89 @@
+"""Tests for the extra alert channels: routing predicates and lifecycle."""
+
+from typing import List
+
+import pytest
+
+from discogs_alert import channels as da_channels, entities as da_entities
+from discogs_alert.alert import Alerter
+
+
+class RecordingAlerter(Alerter):
+    def __init__(self, name: str, lifecycle: List[str]):
+        self.name = name
+        self.lifecycle = lifecycle
+
+    def open(self) -> None:
+        self.lifecycle.append(f"open {self.name}")
+
+    def close(self) -> None:
+        self.lifecycle.append(f"close {self.name}")
+
+    def send_alert(self, title: str, body: str) -> bool:
+        return True
+
+
+def _listing(value: float) -> da_entities.Listing:
+    return da_entities.Listing(
+        id=1,
+        availability=None,
+        media_condition=da_entities.CONDITION.NEAR_MINT,
+        sleeve_condition=da_entities.CONDITION.NEAR_MINT,
+        comment="",
+        seller_num_ratings=100,
+        seller_avg_rating=100.0,
+        seller_ships_from="Germany",
+        price=da_entities.ListingPrice(currency="EUR", value=value, shipping=None),
+    )
+
+
+def test_price_ratio_predicate():
+    predicate = da_channels.price_ratio_at_most(0.5)
+    release = da_entities.Release(id=1, display_title="A", price_threshold=100)
+    assert predicate(_listing(50), release)
+    assert not predicate(_listing(51), release)
+    assert not predicate(_listing(1), da_entities.Release(id=1, display_title="A"))
+
+
+def test_channel_without_predicate_accepts_everything():
+    channel = da_channels.Channel("all", RecordingAlerter("all", []))
+    assert channel.accepts(_listing(1000), da_entities.Release(id=1, display_title="A", price_threshold=1))
+
+
+def test_open_channels_opens_each_and_close_channels_closes_them():
+    lifecycle: List[str] = []
+    specs = [da_channels.ChannelSpec("a", "NTFY", {}), da_channels.ChannelSpec("b", "GMAIL", {}, 0.5)]
+    channels = da_channels.open_channels(specs, lambda alerter_type, _kw: RecordingAlerter(alerter_type, lifecycle))
+    assert [c.name for c in channels] == ["a", "b"]
+    assert channels[0].predicate is None and channels[1].predicate is not None
+    da_channels.close_channels(channels)
+    assert lifecycle == ["open NTFY", "open GMAIL", "close NTFY", "close GMAIL"]
+
+
+def test_open_channels_closes_opened_ones_when_a_later_one_fails():
+    lifecycle: List[str] = []
+
+    def make(alerter_type, _kw):
+        if alerter_type == "BROKEN":
+            raise ValueError("no such alerter")
+        return RecordingAlerter(alerter_type, lifecycle)
+
+    specs = [da_channels.ChannelSpec("a", "NTFY", {}), da_channels.ChannelSpec("b", "BROKEN", {})]
+    with pytest.raises(ValueError):
+        da_channels.open_channels(specs, make)
+    assert lifecycle == ["open NTFY", "close NTFY"]
+
+
+def test_open_alerters_closes_the_main_alerter_when_a_channel_fails():
+    lifecycle: List[str] = []
+
+    def make(alerter_type, _kw):
+        if alerter_type == "BROKEN":
+            raise ValueError("no such alerter")
+        return RecordingAlerter(alerter_type, lifecycle)
+
+    alerter, channels = da_channels.open_alerters("NTFY", {}, [da_channels.ChannelSpec("a", "GMAIL", {})], make)
+    assert (alerter.name, [c.name for c in channels]) == ("NTFY", ["a"])
+    with pytest.raises(ValueError):
+        da_channels.open_alerters("NTFY", {}, [da_channels.ChannelSpec("b", "BROKEN", {})], make)
+    assert lifecycle == ["open NTFY", "open GMAIL", "open NTFY", "close NTFY"]
@@ -4,12 +4,18 @@ Both clients are async now and use httpx / curl_cffi. We mock the underlying
 HTTP layer with `httpx.MockTransport` so tests are fully offline.
 """
 
+import asyncio
+import os
+import signal
+from pathlib import Path
 from typing import Optional
 
 import httpx
 import pytest
 
-from discogs_alert import client as da_client
+from discogs_alert import client as da_client, entities as da_entities
+
+FIXTURES = Path(__file__).parent / "data"
 
 
 def _make_client_with_transport(handler, user_token: str = "TOKEN") -> da_client.UserTokenClient:
@@ -89,6 +95,44 @@ async def test_user_token_client_get_returns_false_on_non_200():
         await client.aclose()
 
 
+
+async def test_user_token_client_paces_requests_through_its_bucket():
+    client = _make_client_with_transport(lambda _request: _ok())
+    calls = []
+
+    async def acquire():
+        calls.append(True)
+        return 0.0
+
+    client.rate_limiter.acquire = acquire
+    try:
+        await client._get("https://api.discogs.com/a")
+        await client._get("https://api.discogs.com/b")
+    finally:
+        await client.aclose()
+    assert len(calls) == 2
+
+
+async def test_user_token_client_headers_correct_the_bucket():
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return _ok(headers={"X-Discogs-Ratelimit": "60", "X-Discogs-Ratelimit-Remaining": "3"})
+
+    client = _make_client_with_transport(handler)
+    try:
+        await client._get("https://api.discogs.com/anything")
+        assert client.rate_limiter.tokens < 2  # burst of 4, less one spent, clamped to 3 - 2 in reserve
+    finally:
+        await client.aclose()
+
+
+async def test_user_token_client_drains_bucket_on_429():
+    client = _make_client_with_transport(lambda _request: httpx.Response(429, content=b"{}"))
+    try:
+        await client._get("https://api.discogs.com/anything")
+        assert client.rate_limiter.tokens < 0
+    finally:
+        await client.aclose()
+
 async def test_user_token_client_get_listing_returns_entity():
     payload = (
         b'{"id": 1, "availability": null, '
@@ -122,6 +166,98 @@ async def test_user_token_client_get_release_stats_handles_unknown_release():
         await client.aclose()
 
 
+def _stats_client(num_for_sale: int, **kwargs):
+    """A client whose stats endpoint reports `num_for_sale`, counting requests."""
+
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        body = b'{"num_for_sale": %d, "lowest_price": null}' % num_for_sale
+        return _ok(body)
+
+    client = _make_client_with_transport(handler)
+    client.stats_ttl = kwargs.get("stats_ttl", 0)
+    client.stats_dormant_ttl = kwargs.get("stats_dormant_ttl", 600)
+    return client, calls
+
+
+async def test_release_stats_not_cached_by_default_when_for_sale():
+    client, calls = _stats_client(num_for_sale=3)
+    try:
+        await client.get_release_stats(1)
+        await client.get_release_stats(1)
+    finally:
+        await client.aclose()
+    assert len(calls) == 2
+
+
+async def test_release_stats_cached_for_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = [100.0]
+    monkeypatch.setattr(da_client.time, "monotonic", lambda: now[0])
+    client, calls = _stats_client(num_for_sale=3, stats_ttl=30)
+    try:
+        first = await client.get_release_stats(1)
+        now[0] += 29
+        assert await client.get_release_stats(1) is first
+        assert len(calls) == 1
+        now[0] += 1
+        await client.get_release_stats(1)
+        assert len(calls) == 2
+    finally:
+        await client.aclose()
+
+
+async def test_release_stats_with_nothing_for_sale_use_dormant_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = [100.0]
+    monkeypatch.setattr(da_client.time, "monotonic", lambda: now[0])
+    client, calls = _stats_client(num_for_sale=0, stats_ttl=30, stats_dormant_ttl=600)
+    try:
+        await client.get_release_stats(1)
+        now[0] += 599
+        await client.get_release_stats(1)
+        assert len(calls) == 1
+        await client.get_release_stats(2)  # cached per release
+        assert len(calls) == 2
+    finally:
+        await client.aclose()
+
+
+async def test_mark_release_stats_dormant_extends_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = [100.0]
+    monkeypatch.setattr(da_client.time, "monotonic", lambda: now[0])
+    client, calls = _stats_client(num_for_sale=3, stats_ttl=0, stats_dormant_ttl=600)
+    try:
+        await client.get_release_stats(1)
+        client.mark_release_stats_dormant(1)
+        client.mark_release_stats_dormant(99)  # nothing cached: no-op
+        now[0] += 300
+        await client.get_release_stats(1)
+        assert len(calls) == 1
+    finally:
+        await client.aclose()
+
+
+async def test_release_stats_cache_drops_least_recently_used():
+    client, calls = _stats_client(num_for_sale=0)
+    client.STATS_CACHE_SIZE = 2
+    try:
+        await client.get_release_stats(1)
+        await client.get_release_stats(2)
+        await client.get_release_stats(1)
+        await client.get_release_stats(3)  # evicts 2
+        assert list(client._stats_cache) == [1, 3]
+        await client.get_release_stats(1)
+        assert len(calls) == 3
+    finally:
+        await client.aclose()
+
+
+def test_user_token_client_rejects_negative_stats_ttl():
+    with pytest.raises(ValueError):
+        da_client.UserTokenClient("UA", "T", stats_ttl=-1)
+
+
 async def test_user_token_client_get_returns_false_on_network_error():
     """`httpx.HTTPError` (timeout, connect failure, etc.) should be swallowed
     by `_get` and surfaced as `False`, just like the previous requests-based
@@ -136,3 +272,233 @@ async def test_user_token_client_get_returns_false_on_network_error():
         assert await client._get("https://api.discogs.com/anything") is False
     finally:
         await client.aclose()
+
+
+# -- AnonClient ---------------------------------------------------------------
+
+
+class _FakeCurlResponse:
+    def __init__(self, status_code: int, text: str = "", headers: Optional[dict] = None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class _FakeCurlSession:
+    """Stand-in for `curl_cffi.requests.AsyncSession` serving canned responses."""
+
+    def __init__(self, *responses: _FakeCurlResponse):
+        self._responses = list(responses)
+        self.requests: list = []
+
+    async def get(self, url, headers=None, timeout=None):
+        self.requests.append({"url": url, "headers": headers or {}})
+        return self._responses.pop(0) if len(self._responses) > 1 else self._responses[0]
+
+    async def close(self):
+        pass
+
+
+def _anon_client(*responses: _FakeCurlResponse, **kwargs) -> da_client.AnonClient:
+    client = da_client.AnonClient(user_agent="UA", **kwargs)
+    client._session = _FakeCurlSession(*responses)
+    return client
+
+
+async def test_anon_client_returns_empty_on_non_200():
+    client = _anon_client(_FakeCurlResponse(403, "Just a moment…"))
+    try:
+        assert await client.get_marketplace_listings(1) == []
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.parametrize("parse_executor", ["thread", "process"])
+async def test_anon_client_parse_pool_matches_inline_parse(parse_executor: str):
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    inline = _anon_client(_FakeCurlResponse(200, html))
+    pooled = _anon_client(_FakeCurlResponse(200, html), parse_workers=1, parse_executor=parse_executor)
+    try:
+        expected = await inline.get_marketplace_listings(1)
+        assert len(expected) == 5
+        assert await pooled.get_marketplace_listings(1) == expected
+    finally:
+        await inline.aclose()
+        await pooled.aclose()
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+async def test_anon_client_survives_a_dead_parse_worker():
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    client = _anon_client(_FakeCurlResponse(200, html), parse_workers=1, parse_executor="process")
+    try:
+        assert len(await client.get_marketplace_listings(1)) == 5
+        broken = client._parse_pool
+        [worker] = broken._processes.values()
+        os.kill(worker.pid, signal.SIGKILL)
+        worker.join(10)
+        # The page that finds the pool broken is parsed inline...
+        assert len(await client.get_marketplace_listings(2)) == 5
+        assert client._parse_pool is not broken
+        # ...and the next ones go to a fresh pool.
+        assert len(await client.get_marketplace_listings(3)) == 5
+    finally:
+        await client.aclose()
+
+
+async def test_anon_client_serves_records_from_the_same_cache():
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    client = _anon_client(_FakeCurlResponse(200, html))
+    try:
+        records = await client.get_marketplace_records(1, skip_if_unchanged=True, context="k")
+        assert all(isinstance(record, da_entities.ListingRecord) for record in records)
+        assert [record.to_listing() for record in records] == await client.get_marketplace_listings(1)
+        assert await client.get_marketplace_records(1, skip_if_unchanged=True, context="k") is None
+    finally:
+        await client.aclose()
+
+
+def test_anon_client_rejects_unknown_parse_executor():
+    with pytest.raises(ValueError):
+        da_client.AnonClient(user_agent="UA", parse_workers=2, parse_executor="fibre")
+
+
+async def test_anon_client_skips_unchanged_page_for_same_context():
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    client = _anon_client(_FakeCurlResponse(200, html))
+    try:
+        first = await client.get_marketplace_listings(1, skip_if_unchanged=True, context="k")
+        assert len(first) == 5
+        assert await client.get_marketplace_listings(1, skip_if_unchanged=True, context="k") is None
+        # A new context makes the same page count as new again...
+        assert await client.get_marketplace_listings(1, skip_if_unchanged=True, context="k2") == first
+        # ...and callers not asking to skip always get the (cached) listings.
+        assert await client.get_marketplace_listings(1) == first
+    finally:
+        await client.aclose()
+
+
+async def test_anon_client_does_not_reparse_unchanged_table(monkeypatch: pytest.MonkeyPatch):
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    client = _anon_client(_FakeCurlResponse(200, html))
+    parses = []
+    real_scrape = da_client.da_scrape.scrape_listing_tuples
+
+    def counting_scrape(*args):
+        parses.append(args[1])
+        return real_scrape(*args)
+
+    monkeypatch.setattr(da_client.da_scrape, "scrape_listing_tuples", counting_scrape)
+    try:
+        await client.get_marketplace_listings(1)
+        await client.get_marketplace_listings(1)
+        assert parses == [1]
+    finally:
+        await client.aclose()
+
+
+async def test_anon_client_sends_validators_and_honours_304():
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    client = _anon_client(
+        _FakeCurlResponse(200, html, headers={"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        _FakeCurlResponse(304),
+    )
+    try:
+        await client.get_marketplace_listings(1, skip_if_unchanged=True)
+        assert await client.get_marketplace_listings(1, skip_if_unchanged=True) is None
+        conditional = client._session.requests[1]["headers"]
+        assert conditional == {"If-None-Match": '"abc"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    finally:
+        await client.aclose()
+
+
+async def test_anon_client_forget_page_forces_a_fresh_result():
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    client = _anon_client(_FakeCurlResponse(200, html))
+    try:
+        await client.get_marketplace_listings(1, skip_if_unchanged=True)
+        client.forget_page(1)
+        assert len(await client.get_marketplace_listings(1, skip_if_unchanged=True)) == 5
+    finally:
+        await client.aclose()
+
+
+async def test_anon_client_tracks_each_context_separately():
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    client = _anon_client(_FakeCurlResponse(200, html))
+    try:
+        await client.get_marketplace_listings(1, skip_if_unchanged=True, context="alice")
+        await client.get_marketplace_listings(1, skip_if_unchanged=True, context="bob")
+        assert await client.get_marketplace_listings(1, skip_if_unchanged=True, context="alice") is None
+        assert await client.get_marketplace_listings(1, skip_if_unchanged=True, context="bob") is None
+    finally:
+        await client.aclose()
+
+
+async def test_anon_client_shares_concurrent_fetches_of_a_release():
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    client = _anon_client(_FakeCurlResponse(200, html))
+    try:
+        first, second = await asyncio.gather(
+            client.get_marketplace_listings(1), client.get_marketplace_listings(1)
+        )
+        assert first == second and len(first) == 5
+        assert len(client._session.requests) == 1
+        await client.get_marketplace_listings(1)
+        assert len(client._session.requests) == 2
+    finally:
+        await client.aclose()
+
+
+async def test_anon_client_serves_recent_pages_from_cache():
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    client = _anon_client(_FakeCurlResponse(200, html), page_max_age=60)
+    try:
+        await client.get_marketplace_listings(1)
+        assert len(await client.get_marketplace_listings(1)) == 5
+        assert len(client._session.requests) == 1
+        client.forget_page(1)
+        await client.get_marketplace_listings(1)
+        assert len(client._session.requests) == 2
+    finally:
+        await client.aclose()
+
+
+async def test_anon_client_page_cache_drops_least_recently_fetched():
+    html = (FIXTURES / "marketplace_listing.html").read_text()
+    client = _anon_client(_FakeCurlResponse(200, html))
+    client.PAGE_CACHE_SIZE = 2
+    try:
+        for release_id in (1, 2, 1, 3):
+            await client.get_marketplace_listings(release_id)
+        assert list(client._page_cache) == [1, 3]
+    finally:
+        await client.aclose()
+
+
+async def test_anon_client_is_unpaced_by_default():
+    client = _anon_client(_FakeCurlResponse(403))
+    assert client.rate_limiter is None
+    await client.aclose()
+
+
+async def test_anon_client_paces_scrapes_when_configured():
+    client = _anon_client(_FakeCurlResponse(403), requests_per_minute=30)
+    waits = []
+
+    async def acquire():
+        waits.append(True)
+        return 0.0
+
+    client.rate_limiter.acquire = acquire
+    try:
+        await client.get_marketplace_listings(1)
+    finally:
+        await client.aclose()
+    assert client.rate_limiter.rate_per_minute == 30
+    assert waits == [True]
+
+
+def test_anon_client_rejects_negative_rate():
+    with pytest.raises(ValueError):
+        da_client.AnonClient(user_agent="UA", requests_per_minute=-1)
@@ -196,6 +196,113 @@ def test_int_env_var_coerced_by_pydantic(tmp_path: Path):
     assert cfg.runtime.prune_after_days == 30
 
 
+def test_parser_backend_defaults_to_auto_and_is_env_overridable(tmp_path: Path):
+    cfg = da_config.load_config(path=tmp_path / "no.toml", env={"DA_DISCOGS_TOKEN": "T"})
+    assert cfg.runtime.parser == "auto"
+    cfg = da_config.load_config(path=tmp_path / "no.toml", env={"DA_DISCOGS_TOKEN": "T", "DA_PARSER": "bs4"})
+    assert cfg.runtime.parser == "bs4"
+    with pytest.raises(ValidationError):
+        da_config.load_config(path=tmp_path / "no.toml", env={"DA_DISCOGS_TOKEN": "T", "DA_PARSER": "lmxl"})
+
+
+def test_parse_executor_must_be_process_or_thread(tmp_path: Path):
+    path = _write_toml(tmp_path, 'discogs_token = "T"\n[runtime]\nparse_executor = "threads"\n')
+    with pytest.raises(ValidationError):
+        da_config.load_config(path=path, env={})
+
+
+
+def test_adaptive_schedule_defaults_and_env_overrides(tmp_path: Path):
+    cfg = da_config.load_config(path=tmp_path / "no.toml", env={"DA_DISCOGS_TOKEN": "T"})
+    assert cfg.runtime.adaptive_schedule is False
+    assert (cfg.runtime.min_poll_interval, cfg.runtime.max_poll_interval) == (60, 3600)
+    cfg = da_config.load_config(
+        path=tmp_path / "no.toml",
+        env={"DA_DISCOGS_TOKEN": "T", "DA_ADAPTIVE_SCHEDULE": "true", "DA_MIN_POLL_INTERVAL": "120"},
+    )
+    assert cfg.runtime.adaptive_schedule is True
+    assert cfg.runtime.min_poll_interval == 120
+
+
+def test_alert_channels_parse_from_toml(tmp_path: Path):
+    path = _write_toml(
+        tmp_path,
+        """
+discogs_token = "T"
+
+[alerter]
+type = "NTFY"
+
+[alerter.gmail]
+user = "me@gmail.com"
+app_password = "pw"
+to = "me@gmail.com"
+
+[[alerter.channels]]
+type = "gmail"
+max_price_ratio = 0.5
+
+[[alerter.channels]]
+type = "NTFY"
+name = "ntfy-cheap"
+""",
+    )
+    cfg = da_config.load_config(path=path, env={})
+    assert [c.key for c in cfg.alerter.channels] == ["gmail", "ntfy-cheap"]
+    assert cfg.alerter.channels[0].max_price_ratio == 0.5
+    assert cfg.alerter.kwargs_for("gmail")["gmail_user"] == "me@gmail.com"
+
+
+def test_alert_channel_names_must_be_unique(tmp_path: Path):
+    path = _write_toml(
+        tmp_path,
+        """
+discogs_token = "T"
+
+[[alerter.channels]]
+type = "GMAIL"
+
+[[alerter.channels]]
+type = "NTFY"
+name = "gmail"
+""",
+    )
+    with pytest.raises(ValidationError):
+        da_config.load_config(path=path, env={})
+
+
+def test_digest_defaults_off_and_env_overrides(tmp_path: Path):
+    cfg = da_config.load_config(path=tmp_path / "no.toml", env={"DA_DISCOGS_TOKEN": "T"})
+    assert (cfg.runtime.digest, cfg.runtime.digest_window) == ("off", 0)
+    cfg = da_config.load_config(
+        path=tmp_path / "no.toml",
+        env={"DA_DISCOGS_TOKEN": "T", "DA_DIGEST": "release", "DA_DIGEST_WINDOW": "300"},
+    )
+    assert (cfg.runtime.digest, cfg.runtime.digest_window) == ("release", 300)
+    with pytest.raises(ValidationError):
+        da_config.load_config(path=tmp_path / "no.toml", env={"DA_DISCOGS_TOKEN": "T", "DA_DIGEST": "daily"})
+
+
+def test_rate_limits_default_and_env_overrides(tmp_path: Path):
+    cfg = da_config.load_config(path=tmp_path / "no.toml", env={"DA_DISCOGS_TOKEN": "T"})
+    assert (cfg.runtime.api_requests_per_minute, cfg.runtime.scrape_requests_per_minute) == (60, 0)
+    cfg = da_config.load_config(
+        path=tmp_path / "no.toml", env={"DA_DISCOGS_TOKEN": "T", "DA_SCRAPE_REQUESTS_PER_MINUTE": "30"}
+    )
+    assert cfg.runtime.scrape_requests_per_minute == 30
+
+def test_role_defaults_standalone_and_env_overrides(tmp_path: Path):
+    cfg = da_config.load_config(path=tmp_path / "no.toml", env={"DA_DISCOGS_TOKEN": "T"})
+    assert (cfg.runtime.role, cfg.runtime.work_queue) == ("standalone", None)
+    cfg = da_config.load_config(
+        path=tmp_path / "no.toml",
+        env={"DA_DISCOGS_TOKEN": "T", "DA_ROLE": "worker", "DA_WORK_QUEUE": "sqlite:///q.db"},
+    )
+    assert (cfg.runtime.role, cfg.runtime.work_queue) == ("worker", "sqlite:///q.db")
+    with pytest.raises(ValidationError):
+        da_config.load_config(path=tmp_path / "no.toml", env={"DA_DISCOGS_TOKEN": "T", "DA_ROLE": "master"})
+
+
 # -- internal helpers --------------------------------------------------------
 
 
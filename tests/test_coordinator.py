@@ -0,0 +1,97 @@
+"""Tests for `ReleaseCoordinator`: one scrape per release per cycle, shared by subscribers."""
+
+import asyncio
+from pathlib import Path
+
+from discogs_alert import client as da_client, coordinator as da_coordinator
+
+HTML = (Path(__file__).parent / "data" / "marketplace_listing.html").read_text()
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str = ""):
+        self.status_code = status_code
+        self.text = text
+        self.headers: dict = {}
+
+
+class FakeSession:
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.urls: list = []
+
+    async def get(self, url, headers=None, timeout=None):
+        self.urls.append(url)
+        await asyncio.sleep(0)
+        return FakeResponse(self.status_code, HTML if self.status_code == 200 else "")
+
+    async def close(self):
+        pass
+
+
+def _coordinator(status_code: int = 200) -> da_coordinator.ReleaseCoordinator:
+    client = da_client.AnonClient(user_agent="UA")
+    client._session = FakeSession(status_code)
+    return da_coordinator.ReleaseCoordinator(client)
+
+
+async def test_subscribers_share_one_fetch_per_cycle():
+    coordinator = _coordinator()
+    coordinator.begin_cycle()
+    alice, bob = await asyncio.gather(
+        coordinator.get_marketplace_listings(1, context="alice"),
+        coordinator.get_marketplace_listings(1, context="bob"),
+    )
+    coordinator.end_cycle()
+    assert len(alice) == 5 and alice == bob
+    # Each subscriber converts its own copies in place.
+    assert alice[0] is not bob[0]
+    assert len(coordinator.client._session.urls) == 1
+
+
+async def test_each_cycle_fetches_again():
+    coordinator = _coordinator()
+    for _ in range(2):
+        coordinator.begin_cycle()
+        await coordinator.get_marketplace_listings(1)
+        await coordinator.get_marketplace_listings(2)
+        await coordinator.get_marketplace_listings(1)
+        assert (coordinator.fetched, coordinator.requests) == (2, 3)
+        coordinator.end_cycle()
+    assert len(coordinator.client._session.urls) == 4
+
+
+async def test_failed_fetch_gives_every_subscriber_no_listings():
+    coordinator = _coordinator(status_code=403)
+    coordinator.begin_cycle()
+    assert await coordinator.get_marketplace_listings(1, context="alice") == []
+    assert await coordinator.get_marketplace_listings(1, context="bob") == []
+    assert len(coordinator.client._session.urls) == 1
+
+
+async def test_unchanged_page_is_skipped_per_subscriber():
+    coordinator = _coordinator()
+    coordinator.begin_cycle()
+    await coordinator.get_marketplace_listings(1, skip_if_unchanged=True, context="alice")
+    coordinator.end_cycle()
+    coordinator.begin_cycle()
+    assert await coordinator.get_marketplace_listings(1, skip_if_unchanged=True, context="alice") is None
+    assert len(await coordinator.get_marketplace_listings(1, skip_if_unchanged=True, context="bob")) == 5
+    coordinator.forget_page(1)
+    coordinator.end_cycle()
+    coordinator.begin_cycle()
+    assert len(await coordinator.get_marketplace_listings(1, skip_if_unchanged=True, context="alice")) == 5
+
+
+async def test_forgetting_a_page_waits_for_the_end_of_the_cycle():
+    coordinator = _coordinator()
+    coordinator.begin_cycle()
+    assert len(await coordinator.get_marketplace_listings(1, context="alice")) == 5
+    # Alice couldn't act on the page; Bob, later in the same cycle, still gets it.
+    coordinator.forget_page(1)
+    assert len(await coordinator.get_marketplace_listings(1, skip_if_unchanged=True, context="bob")) == 5
+    assert 1 in coordinator.client._page_cache
+    coordinator.end_cycle()
+    assert 1 not in coordinator.client._page_cache
+    coordinator.begin_cycle()
+    assert len(await coordinator.get_marketplace_listings(1, skip_if_unchanged=True, context="bob")) == 5
@@ -0,0 +1,87 @@
+"""Tests for `DigestBuffer`: grouping, windows, and digest wording."""
+
+import pytest
+
+from discogs_alert import digest as da_digest
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _add(buffer: da_digest.DigestBuffer, listing_id: int, release_id: int, title: str = "Album") -> None:
+    buffer.add(listing_id, release_id, title, f"€{listing_id}.00", f"https://discogs.com/sell/item/{listing_id}")
+
+
+def test_rejects_unknown_mode_and_negative_window():
+    with pytest.raises(ValueError):
+        da_digest.DigestBuffer("off")
+    with pytest.raises(ValueError):
+        da_digest.DigestBuffer("weekly")
+    with pytest.raises(ValueError):
+        da_digest.DigestBuffer("all", window=-1)
+
+
+def test_release_mode_sends_one_digest_per_release():
+    buffer = da_digest.DigestBuffer("release")
+    _add(buffer, 1, 10, "A")
+    _add(buffer, 2, 10, "A")
+    _add(buffer, 3, 20, "B")
+    digests = buffer.drain()
+    assert [d.listings for d in digests] == [[(1, 10), (2, 10)], [(3, 20)]]
+    assert digests[0].title == "Now For Sale: A (2 listings)"
+    assert "€1.00 — https://discogs.com/sell/item/1" in digests[0].body
+    assert len(buffer) == 0
+
+
+def test_all_mode_sends_a_single_digest():
+    buffer = da_digest.DigestBuffer("all")
+    _add(buffer, 1, 10, "A")
+    _add(buffer, 2, 20, "B")
+    [digest] = buffer.drain()
+    assert digest.title == "Now For Sale: 2 listings across 2 releases"
+    assert digest.listings == [(1, 10), (2, 20)]
+    assert "A\n" in digest.body and "B\n" in digest.body
+
+
+def test_single_listing_reads_like_a_normal_alert():
+    buffer = da_digest.DigestBuffer("all")
+    _add(buffer, 1, 10, "A")
+    [digest] = buffer.drain()
+    assert digest.title == "Now For Sale: A"
+    assert digest.body == "Listing available: https://discogs.com/sell/item/1"
+
+
+def test_adding_a_buffered_listing_again_is_a_no_op():
+    buffer = da_digest.DigestBuffer("release")
+    _add(buffer, 1, 10)
+    _add(buffer, 1, 10)
+    assert len(buffer) == 1 and 1 in buffer
+
+
+def test_window_holds_groups_until_their_oldest_listing_is_old_enough():
+    clock = FakeClock()
+    buffer = da_digest.DigestBuffer("release", window=60, clock=clock)
+    _add(buffer, 1, 10)
+    clock.now += 30
+    _add(buffer, 2, 20)
+    assert buffer.drain() == []
+    clock.now += 31
+    [digest] = buffer.drain()
+    assert digest.listings == [(1, 10)]
+    assert 2 in buffer
+    assert [d.listings for d in buffer.drain(force=True)] == [[(2, 20)]]
+
+
+def test_digests_are_built_per_channel():
+    buffer = da_digest.DigestBuffer("all")
+    _add(buffer, 1, 10)
+    buffer.add(1, 10, "Album", "€1.00", "https://discogs.com/sell/item/1", channel="gmail")
+    _add(buffer, 2, 20)
+    assert len(buffer) == 3
+    digests = buffer.drain()
+    assert [(d.channel, d.listings) for d in digests] == [("", [(1, 10), (2, 20)]), ("gmail", [(1, 10)])]
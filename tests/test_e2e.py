@@ -15,13 +15,13 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 
 from discogs_alert import client as da_client, entities as da_entities, loop as da_loop, state as da_state
-from discogs_alert.alert import AlerterType
+from discogs_alert.alert import Alerter, AlerterType
 
 FIXTURES = Path(__file__).parent / "data"
 REAL_MARKETPLACE_HTML = (FIXTURES / "marketplace_listing_real.html").read_text()
 
 
-class _RecordingAlerter:
+class _RecordingAlerter(Alerter):
     def __init__(self):
         self.calls: List[tuple[str, str]] = []
         self.send_returns = True
@@ -45,10 +45,10 @@ def stub_clients_and_alerter(monkeypatch: pytest.MonkeyPatch):
     fake_anon = MagicMock()
     fake_anon.aclose = AsyncMock()
 
-    async def _fake_marketplace_listings(release_id):
-        return da_scrape.scrape_listings_from_marketplace(REAL_MARKETPLACE_HTML, release_id)
+    async def _fake_marketplace_records(release_id, **_kwargs):
+        return da_scrape.scrape_listing_tuples(REAL_MARKETPLACE_HTML, release_id)
 
-    fake_anon.get_marketplace_listings = _fake_marketplace_listings
+    fake_anon.get_marketplace_records = _fake_marketplace_records
     monkeypatch.setattr(da_client, "AnonClient", lambda *_a, **_kw: fake_anon)
 
     fake_user_client = MagicMock()
@@ -137,7 +137,7 @@ async def test_full_loop_skips_when_stats_gate_says_no_listings(
     captured_alerter = _RecordingAlerter()
     fake_anon = MagicMock()
     fake_anon.aclose = AsyncMock()
-    fake_anon.get_marketplace_listings = AsyncMock()
+    fake_anon.get_marketplace_records = AsyncMock()
     monkeypatch.setattr(da_client, "AnonClient", lambda *_a, **_kw: fake_anon)
 
     fake_user_client = MagicMock()
@@ -152,7 +152,7 @@ async def test_full_loop_skips_when_stats_gate_says_no_listings(
 
     await da_loop.loop(**_common_kwargs(wantlist_path, tmp_path / "state.db"))
 
-    fake_anon.get_marketplace_listings.assert_not_called()
+    fake_anon.get_marketplace_records.assert_not_called()
     assert captured_alerter.calls == []
 
 
@@ -40,3 +40,43 @@ def test_convert_listing_price_currency(mock_currency_rates, rates: da_currency.
     bad = da_entities.ListingPrice(currency="DOOT", value=1)
     with pytest.raises(da_currency.InvalidCurrencyException):
         bad.convert_currency("EUR")
+
+
+def test_listing_tuple_round_trip():
+    listing = da_entities.Listing(
+        id=1,
+        availability="Unavailable in Germany",
+        media_condition=da_entities.CONDITION.NEAR_MINT,
+        sleeve_condition=da_entities.CONDITION.GENERIC,
+        comment="c",
+        seller_num_ratings=10,
+        seller_avg_rating=None,
+        seller_ships_from="France",
+        price=da_entities.ListingPrice(
+            currency="GBP", value=10, shipping=da_entities.ShippingPrice(currency="SEK", value=50)
+        ),
+    )
+    assert da_entities.Listing.from_tuple(listing.as_tuple()) == listing
+    listing.price.shipping = None
+    assert da_entities.Listing.from_tuple(listing.as_tuple()) == listing
+
+
+def test_listing_record_promotes_to_listing():
+    record = da_entities.ListingRecord(
+        7, None, int(da_entities.CONDITION.MINT), int(da_entities.CONDITION.NOT_GRADED), "", 3, 99.5,
+        "Germany", "EUR", 20.0, "EUR", 5.0,
+    )
+    listing = record.to_listing()
+    assert listing.media_condition is da_entities.CONDITION.MINT
+    assert listing.total_price == 25.0
+    assert record.url == listing.url
+    assert listing.as_tuple() == record
+
+
+def test_listing_record_in_currency_leaves_the_original_alone(mock_currency_rates, rates):
+    record = da_entities.ListingRecord(1, None, 7, 7, "", 3, 99.5, "UK", "GBP", 20.0, "GBP", 5.0)
+    converted = record.in_currency(da_currency.ConversionTable("EUR"))
+    assert (converted.currency, converted.shipping_currency) == ("EUR", "EUR")
+    assert converted.value == pytest.approx(20 / rates["GBP"])
+    assert converted.shipping_value == pytest.approx(5 / rates["GBP"])
+    assert (record.currency, record.value) == ("GBP", 20.0)
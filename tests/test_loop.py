@@ -5,6 +5,7 @@ Everything in `loop.py` is async now, so these tests are async too —
 pytest-asyncio runs them in `auto` mode (configured in pyproject).
 """
 
+import asyncio
 import json
 from pathlib import Path
 from typing import List
@@ -12,8 +13,20 @@ from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from discogs_alert import client as da_client, entities as da_entities, loop as da_loop, state as da_state
-from discogs_alert.alert import AlerterType
+from discogs_alert import (
+    batch as da_batch,
+    channels as da_channels,
+    client as da_client,
+    digest as da_digest,
+    entities as da_entities,
+    loop as da_loop,
+    outbox as da_outbox,
+    scheduler as da_scheduler,
+    state as da_state,
+    workqueue as da_workqueue,
+)
+from discogs_alert.alert import Alerter, AlerterType
+from discogs_alert.util import currency as da_currency
 
 
 class FakeAnonClient:
@@ -22,10 +35,18 @@ class FakeAnonClient:
     def __init__(self, listings: List[da_entities.Listing]):
         self._listings = listings
         self.aclose = AsyncMock()
+        self.forgotten: List[int] = []
 
-    async def get_marketplace_listings(self, _release_id: int):
+    async def get_marketplace_listings(self, _release_id: int, **_kwargs):
         return list(self._listings)
 
+    async def get_marketplace_records(self, release_id: int, **kwargs):
+        listings = await self.get_marketplace_listings(release_id, **kwargs)
+        return None if listings is None else [listing.as_tuple() for listing in listings]
+
+    def forget_page(self, release_id: int) -> None:
+        self.forgotten.append(release_id)
+
 
 class FakeUserTokenClient:
     """Stand-in for `UserTokenClient`. By default the stats gate is bypassed
@@ -37,6 +58,7 @@ class FakeUserTokenClient:
         self._list_items = list_items or []
         self.aclose = AsyncMock()
         self.rate_limit_remaining = 50
+        self.dormant: List[int] = []
 
     async def get_release_stats(self, _release_id: int):
         if callable(self._stats):
@@ -46,11 +68,21 @@ class FakeUserTokenClient:
     async def get_list(self, _list_id: int):
         return MagicMock(items=list(self._list_items))
 
+    def mark_release_stats_dormant(self, release_id: int) -> None:
+        self.dormant.append(release_id)
 
-class RecordingAlerter:
+
+class RecordingAlerter(Alerter):
     def __init__(self, send_returns: bool = True):
         self.calls: List[tuple] = []
         self.send_returns = send_returns
+        self.lifecycle: List[str] = []
+
+    def open(self) -> None:
+        self.lifecycle.append("open")
+
+    def close(self) -> None:
+        self.lifecycle.append("close")
 
     def send_alert(self, title: str, body: str) -> bool:
         self.calls.append((title, body))
@@ -90,93 +122,198 @@ def _filters():
 # -- process_release --------------------------------------------------------
 
 
+def _outbox(store: da_state.AlertStore, alerter: Alerter) -> da_outbox.AlertOutbox:
+    """An outbox recording delivery in `store` the way `loop`'s do."""
+
+    return da_outbox.AlertOutbox(
+        alerter,
+        on_delivered=lambda alert: store.complete_alert(alert.outbox_id),
+        on_failed=lambda alert: store.defer_alert(alert.outbox_id, 60, attempts=alert.attempts),
+        max_attempts=1,
+    )
+
+
+async def _process(store: da_state.AlertStore, client, alerter: Alerter, **kwargs) -> int:
+    """`process_release` for `_release()` under `_filters()`, its alerts
+    delivered (or not) by the time it returns.
+    """
+
+    async with _outbox(store, alerter) as outbox:
+        return await da_loop.process_release(
+            _release(), client, "EUR", "Germany", *_filters(), outbox, store, **kwargs
+        )
+
+
 async def test_alerts_on_new_listing(tmp_path: Path):
-    seller, record, wl, bl = _filters()
     listing = _listing(listing_id=1, value_eur=50)
-    client = FakeAnonClient([listing])
     alerter = RecordingAlerter()
 
     with da_state.AlertStore(tmp_path / "state.db") as store:
-        sent = await da_loop.process_release(
-            _release(), client, "EUR", "Germany", seller, record, wl, bl, alerter, store
-        )
+        sent = await _process(store, FakeAnonClient([listing]), alerter)
         assert sent == 1
         assert len(alerter.calls) == 1
         assert store.has_seen(1)
 
 
 async def test_does_not_alert_twice_for_same_listing(tmp_path: Path):
-    seller, record, wl, bl = _filters()
     listing = _listing(listing_id=1, value_eur=50)
     alerter = RecordingAlerter()
 
     with da_state.AlertStore(tmp_path / "state.db") as store:
-        await da_loop.process_release(
-            _release(), FakeAnonClient([listing]), "EUR", "Germany", seller, record, wl, bl, alerter, store
-        )
-        sent = await da_loop.process_release(
-            _release(), FakeAnonClient([listing]), "EUR", "Germany", seller, record, wl, bl, alerter, store
-        )
+        await _process(store, FakeAnonClient([listing]), alerter)
+        sent = await _process(store, FakeAnonClient([listing]), alerter)
         assert sent == 0
         assert len(alerter.calls) == 1
 
 
 async def test_skips_listings_above_price_threshold(tmp_path: Path):
-    seller, record, wl, bl = _filters()
     listing = _listing(listing_id=1, value_eur=200)  # > threshold of 100
     alerter = RecordingAlerter()
 
     with da_state.AlertStore(tmp_path / "state.db") as store:
-        sent = await da_loop.process_release(
-            _release(), FakeAnonClient([listing]), "EUR", "Germany", seller, record, wl, bl, alerter, store
-        )
+        sent = await _process(store, FakeAnonClient([listing]), alerter)
         assert sent == 0
         assert alerter.calls == []
         assert not store.has_seen(1)
 
 
 async def test_skips_listings_unavailable_in_country(tmp_path: Path):
-    seller, record, wl, bl = _filters()
     listing = _listing(listing_id=1, value_eur=50)
     listing.availability = "Unavailable in Germany"
     alerter = RecordingAlerter()
 
     with da_state.AlertStore(tmp_path / "state.db") as store:
-        sent = await da_loop.process_release(
-            _release(), FakeAnonClient([listing]), "EUR", "Germany", seller, record, wl, bl, alerter, store
-        )
+        sent = await _process(store, FakeAnonClient([listing]), alerter)
         assert sent == 0
         assert alerter.calls == []
 
 
 async def test_does_not_mark_seen_when_alerter_fails(tmp_path: Path):
-    seller, record, wl, bl = _filters()
     listing = _listing(listing_id=1, value_eur=50)
     alerter = RecordingAlerter(send_returns=False)
 
     with da_state.AlertStore(tmp_path / "state.db") as store:
-        sent = await da_loop.process_release(
-            _release(), FakeAnonClient([listing]), "EUR", "Germany", seller, record, wl, bl, alerter, store
-        )
-        assert sent == 0
+        await _process(store, FakeAnonClient([listing]), alerter)
         assert len(alerter.calls) == 1
         assert not store.has_seen(1)
+        # It waits in the durable outbox for the retrier instead.
+        assert store.pending_many([1]) == {1}
+        sent = await _process(store, FakeAnonClient([listing]), alerter)
+        assert sent == 0
+        assert len(alerter.calls) == 1
 
 
 async def test_alerts_independently_for_distinct_listings(tmp_path: Path):
-    seller, record, wl, bl = _filters()
     listings = [_listing(listing_id=1, value_eur=50), _listing(listing_id=2, value_eur=60)]
     alerter = RecordingAlerter()
 
     with da_state.AlertStore(tmp_path / "state.db") as store:
-        sent = await da_loop.process_release(
-            _release(), FakeAnonClient(listings), "EUR", "Germany", seller, record, wl, bl, alerter, store
-        )
+        sent = await _process(store, FakeAnonClient(listings), alerter)
         assert sent == 2
         assert {c[0] for c in alerter.calls} == {"Now For Sale: Test Release"}
         assert store.has_seen(1) and store.has_seen(2)
 
 
+async def test_skips_pipeline_when_page_unchanged(tmp_path: Path):
+    alerter = RecordingAlerter()
+
+    class UnchangedAnonClient(FakeAnonClient):
+        async def get_marketplace_listings(self, _release_id: int, skip_if_unchanged=False, **_kwargs):
+            assert skip_if_unchanged
+            return None
+
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        sent = await _process(store, UnchangedAnonClient([]), alerter)
+        assert sent == 0
+        assert alerter.calls == []
+
+
+async def test_unconverted_price_forgets_cached_page(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, rates
+):
+    """A listing whose price couldn't be converted must be re-evaluated next
+    time, not skipped as unchanged.
+    """
+
+    listing = _listing(listing_id=1, value_eur=50)
+    listing.price.currency = "GBP"
+    monkeypatch.setattr(
+        da_currency, "get_currency_rates", lambda _base: {k: v for k, v in rates.items() if k != "GBP"}
+    )
+    client = FakeAnonClient([listing])
+
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        await _process(store, client, RecordingAlerter())
+        assert client.forgotten == [42]
+        key = da_loop.evaluation_key(_release(), "EUR", "Germany", *_filters())
+        assert store.listing_snapshot(_release().id, key) == {}
+
+
+async def test_only_listings_new_since_last_poll_are_evaluated(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    judged: List[int] = []
+    real_filter_batch = da_batch.filter_batch
+
+    def recording_filter_batch(batch, *args):
+        judged.extend(batch.ids)
+        return real_filter_batch(batch, *args)
+
+    monkeypatch.setattr(da_batch, "filter_batch", recording_filter_batch)
+    first = [_listing(listing_id=1, value_eur=500), _listing(listing_id=2, value_eur=50)]
+    second = [_listing(listing_id=2, value_eur=50), _listing(listing_id=3, value_eur=500)]
+
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        await _process(store, FakeAnonClient(first), RecordingAlerter())
+        await _process(store, FakeAnonClient(second), RecordingAlerter())
+        assert judged == [1, 2, 3]
+        assert store.departed_count() == 1
+
+
+async def test_repriced_listing_is_judged_again(tmp_path: Path):
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        alerter = RecordingAlerter()
+        for value in (500, 500, 80):
+            await _process(store, FakeAnonClient([_listing(1, value)]), alerter)
+        assert [body for _title, body in alerter.calls] == [f"Listing available: {_listing(1, 80).url}"]
+
+
+async def test_foreign_price_is_judged_again_in_a_new_rates_period(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, rates
+):
+    listing = _listing(1, 100)
+    listing.price.currency = "GBP"
+    gbp_rate = [0.5]  # 100 GBP = 200 EUR, over the threshold
+
+    def fake_rates(_base):
+        return {**rates, "GBP": gbp_rate[0]}
+
+    monkeypatch.setattr(da_currency, "get_currency_rates", fake_rates)
+    monkeypatch.setattr(da_currency, "rates_period", lambda: "2026-10-05")
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        alerter = RecordingAlerter()
+        await _process(store, FakeAnonClient([listing]), alerter)
+        gbp_rate[0] = 2.0  # 50 EUR
+        await _process(store, FakeAnonClient([listing]), alerter)
+        assert alerter.calls == []  # same week, same verdict
+        monkeypatch.setattr(da_currency, "rates_period", lambda: "2026-10-12")
+        await _process(store, FakeAnonClient([listing]), alerter)
+        assert len(alerter.calls) == 1
+
+
+def test_evaluation_key_changes_with_release_filters():
+    seller, record, wl, bl = _filters()
+    release = _release()
+    key = da_loop.evaluation_key(release, "EUR", "Germany", seller, record, wl, bl)
+    assert key == da_loop.evaluation_key(_release(), "EUR", "Germany", seller, record, set(wl), set(bl))
+    release.price_threshold = 150
+    assert key != da_loop.evaluation_key(release, "EUR", "Germany", seller, record, wl, bl)
+    assert key != da_loop.evaluation_key(_release(), "GBP", "Germany", seller, record, wl, bl)
+    channel = da_channels.Channel("gmail", RecordingAlerter(), routing={"max_price_ratio": 0.5})
+    with_channel = da_loop.evaluation_key(_release(), "EUR", "Germany", seller, record, wl, bl, [channel])
+    assert with_channel != key
+    channel.routing = {"max_price_ratio": 0.4}
+    assert with_channel != da_loop.evaluation_key(_release(), "EUR", "Germany", seller, record, wl, bl, [channel])
+
+
 # -- load_wantlist ----------------------------------------------------------
 
 
@@ -477,3 +614,359 @@ async def test_loop_no_stats_gate_flag_disables_gate(tmp_path: Path, monkeypatch
     )
 
     assert process_calls == [1]
+
+
+# -- loop + scheduler --------------------------------------------------------
+
+
+async def test_loop_with_scheduler_checks_only_due_releases(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    wl = tmp_path / "wl.json"
+    wl.write_text(json.dumps([{"id": 1, "display_title": "A"}, {"id": 2, "display_title": "B"}]))
+
+    # Release 1 has nothing for sale (gated, goes dormant); release 2 is busy.
+    def stats(release_id):
+        if release_id == 1:
+            return da_entities.ReleaseStats(num_for_sale=0)
+        return da_entities.ReleaseStats(num_for_sale=80)
+
+    process_calls: list[int] = []
+
+    async def fake_process_release(release, *_a, scheduler=None, **_k):
+        process_calls.append(release.id)
+        scheduler.observe_listings(release.id, changed=True)
+        return 0
+
+    monkeypatch.setattr(da_loop, "process_release", fake_process_release)
+
+    now = [0.0]
+    scheduler = da_scheduler.ReleaseScheduler(min_interval=60, max_interval=3600, clock=lambda: now[0])
+    kwargs = dict(
+        discogs_token="X",
+        list_id=None,
+        wantlist_path=str(wl),
+        user_agent="UA",
+        country="Germany",
+        currency="EUR",
+        seller_filters=da_entities.SellerFilters(),
+        record_filters=da_entities.RecordFilters(),
+        country_whitelist=set(),
+        country_blacklist=set(),
+        alerter_type=AlerterType.PUSHBULLET,
+        alerter_kwargs={"pushbullet_token": "T"},
+        state_path=tmp_path / "state.db",
+        user_token_client=FakeUserTokenClient(stats=stats),
+        client_anon=FakeAnonClient([]),
+        scheduler=scheduler,
+    )
+
+    await da_loop.loop(**kwargs)
+    assert process_calls == [2]
+
+    now[0] = 61.0
+    await da_loop.loop(**kwargs)
+    assert process_calls == [2, 2]  # release 1 isn't due for an hour
+
+    now[0] = 3601.0
+    await da_loop.loop(**kwargs)  # both due; release 1 is gated again
+    assert process_calls == [2, 2, 2]
+
+
+async def test_process_release_reports_churn_to_scheduler(tmp_path: Path):
+    scheduler = da_scheduler.ReleaseScheduler()
+    scheduler.sync([_release().id])
+
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        await _process(store, FakeAnonClient([_listing(1, 50)]), RecordingAlerter(), scheduler=scheduler)
+        assert scheduler._releases[_release().id].churn == 1.0
+        await _process(store, FakeAnonClient([_listing(1, 50)]), RecordingAlerter(), scheduler=scheduler)
+        assert scheduler._releases[_release().id].churn < 1.0
+
+
+# -- stats cache hints -------------------------------------------------------
+
+
+async def test_gate_marks_far_over_threshold_stats_dormant(mock_currency_rates):
+    release = _release()  # threshold 100 EUR
+    far = FakeUserTokenClient(
+        stats=da_entities.ReleaseStats(
+            num_for_sale=2, lowest_price=da_entities.ShippingPrice(currency="EUR", value=250)
+        )
+    )
+    near = FakeUserTokenClient(
+        stats=da_entities.ReleaseStats(
+            num_for_sale=2, lowest_price=da_entities.ShippingPrice(currency="EUR", value=150)
+        )
+    )
+    for client in (far, near):
+        await da_loop._gated_process_release(
+            asyncio.Semaphore(1), release, client, FakeAnonClient([]), "EUR", "Germany",
+            *_filters(), MagicMock(), MagicMock(), use_stats_gate=True, verbose=False,
+        )
+    assert far.dormant == [release.id]
+    assert near.dormant == []
+
+
+# -- outbox delivery ---------------------------------------------------------
+
+
+async def test_process_release_queues_alerts_on_outbox(tmp_path: Path):
+    seller, record, wl, bl = _filters()
+    alerter = RecordingAlerter()
+    delivered = []
+
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        async with da_outbox.AlertOutbox(alerter, on_delivered=delivered.append) as outbox:
+            queued = await da_loop.process_release(
+                _release(), FakeAnonClient([_listing(1, 50)]), "EUR", "Germany", seller, record, wl, bl,
+                outbox, store,
+            )
+        assert queued == 1
+        assert [alert.listings for alert in delivered] == [[(1, _release().id)]]
+        # Not recorded as seen by process_release itself, but held in the
+        # durable outbox until the on_delivered callback completes it.
+        assert not store.has_seen(1)
+        assert store.pending_many([1]) == {1}
+        key = da_loop.evaluation_key(_release(), "EUR", "Germany", seller, record, wl, bl)
+        assert store.listing_snapshot(_release().id, key).keys() == {1}
+
+
+async def test_process_release_does_not_wait_on_a_blocked_channel(tmp_path: Path):
+    seller, record, wl, bl = _filters()
+    fast = RecordingAlerter()
+    unblock = asyncio.Event()
+
+    class BlockedAlerter(RecordingAlerter):
+        async def send_alert_async(self, title: str, body: str) -> bool:
+            await unblock.wait()
+            return True
+
+    listings = [_listing(i, 50) for i in range(1, 5)]
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        fast_outbox = da_outbox.AlertOutbox(fast, on_delivered=lambda _a: None)
+        slow_outbox = da_outbox.AlertOutbox(BlockedAlerter(), on_delivered=lambda _a: None, workers=1, queue_size=1)
+        async with fast_outbox, slow_outbox:
+            slow = da_channels.Channel("slow", slow_outbox.alerter)
+            queued = await asyncio.wait_for(
+                da_loop.process_release(
+                    _release(), FakeAnonClient(listings), "EUR", "Germany", seller, record, wl, bl,
+                    fast_outbox, store, channels=[(slow, slow_outbox)],
+                ),
+                timeout=5,
+            )
+            await fast_outbox.join()
+            assert len(fast.calls) == 4
+            # What didn't fit is due for the slow channel's retrier straight away.
+            overflow = store.claim_due_alerts(10, lease_seconds=300, channel="slow")
+            assert len(overflow) >= 2
+            unblock.set()
+        assert queued == 8
+
+
+async def test_process_release_skips_listings_pending_in_outbox(tmp_path: Path):
+    seller, record, wl, bl = _filters()
+    alerter = RecordingAlerter()
+
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        store.enqueue_alert("t", "b", [(1, _release().id)])
+        async with da_outbox.AlertOutbox(alerter, on_delivered=lambda _a: None) as outbox:
+            queued = await da_loop.process_release(
+                _release(), FakeAnonClient([_listing(1, 50)]), "EUR", "Germany", seller, record, wl, bl,
+                outbox, store,
+            )
+        assert queued == 0
+        assert alerter.calls == []
+        assert store.outbox_count() == 1
+
+
+def _loop_kwargs(tmp_path: Path, anon) -> dict:
+    wl = tmp_path / "wl.json"
+    wl.write_text(json.dumps([{"id": 42, "display_title": "Test Release", "price_threshold": 100}]))
+    return dict(
+        discogs_token="X",
+        list_id=None,
+        wantlist_path=str(wl),
+        user_agent="UA",
+        country="Germany",
+        currency="EUR",
+        seller_filters=_filters()[0],
+        record_filters=_filters()[1],
+        country_whitelist=set(),
+        country_blacklist=set(),
+        alerter_type=AlerterType.PUSHBULLET,
+        alerter_kwargs={"pushbullet_token": "T"},
+        state_path=tmp_path / "state.db",
+        use_stats_gate=False,
+        alert_max_attempts=1,
+        user_token_client=FakeUserTokenClient(),
+        client_anon=anon,
+    )
+
+
+async def test_loop_records_alerts_after_outbox_delivery(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    alerter = RecordingAlerter()
+    monkeypatch.setattr(da_loop, "get_alerter", lambda *_a, **_kw: alerter)
+    await da_loop.loop(**_loop_kwargs(tmp_path, FakeAnonClient([_listing(1, 50)])))
+    assert len(alerter.calls) == 1
+    assert da_state.shared_store(tmp_path / "state.db").has_seen(1)
+
+
+async def test_loop_keeps_undelivered_alert_in_outbox(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    alerter = RecordingAlerter(send_returns=False)
+    anon = FakeAnonClient([_listing(1, 50)])
+    monkeypatch.setattr(da_loop, "get_alerter", lambda *_a, **_kw: alerter)
+    await da_loop.loop(**_loop_kwargs(tmp_path, anon))
+    assert len(alerter.calls) == 1
+    # The page isn't re-scraped for it; the alert waits in the durable outbox.
+    assert anon.forgotten == []
+    store = da_state.shared_store(tmp_path / "state.db")
+    assert not store.has_seen(1)
+    assert store.outbox_count() == 1
+
+
+async def test_loop_requeues_due_outbox_alerts(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    alerter = RecordingAlerter()
+    anon = FakeAnonClient([])
+    monkeypatch.setattr(da_loop, "get_alerter", lambda *_a, **_kw: alerter)
+    store = da_state.shared_store(tmp_path / "state.db")
+    store.enqueue_alert("stuck", "body", [(9, 42)])
+    await da_loop.loop(**_loop_kwargs(tmp_path, anon))
+    assert [call[0] for call in alerter.calls] == ["stuck"]
+    assert store.has_seen(9)
+    assert store.outbox_count() == 0
+
+
+async def test_loop_opens_and_closes_its_own_alerter(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    alerter = RecordingAlerter()
+    monkeypatch.setattr(da_loop, "get_alerter", lambda *_a, **_kw: alerter)
+    await da_loop.loop(**_loop_kwargs(tmp_path, FakeAnonClient([_listing(1, 50)])))
+    assert alerter.lifecycle == ["open", "close"]
+    assert len(alerter.calls) == 1
+
+
+async def test_loop_leaves_a_passed_alerter_open(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    alerter = RecordingAlerter()
+    monkeypatch.setattr(da_loop, "get_alerter", lambda *_a, **_kw: pytest.fail("alerter rebuilt"))
+    await da_loop.loop(**_loop_kwargs(tmp_path, FakeAnonClient([_listing(1, 50)])), alerter=alerter)
+    assert alerter.lifecycle == []
+    assert len(alerter.calls) == 1
+
+
+# -- alert channels -----------------------------------------------------------
+
+
+async def test_loop_routes_listings_to_extra_channels(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    main, gmail = RecordingAlerter(), RecordingAlerter()
+    monkeypatch.setattr(da_loop, "get_alerter", lambda alerter_type, *_a: gmail if alerter_type == "GMAIL" else main)
+    store = da_state.shared_store(tmp_path / "state.db")
+    store.mark_seen(1, 42, "t", "b")
+    await da_loop.loop(
+        **_loop_kwargs(tmp_path, FakeAnonClient([_listing(1, 40), _listing(2, 80)])),
+        alert_channels=[da_channels.ChannelSpec("gmail", "GMAIL", {}, max_price_ratio=0.5)],
+    )
+    # The main alerter already had listing 1; the channel only takes the cheap one.
+    assert [body for _title, body in main.calls] == [f"Listing available: {_listing(2, 80).url}"]
+    assert [body for _title, body in gmail.calls] == [f"Listing available: {_listing(1, 40).url}"]
+    assert store.has_seen_many([1, 2]) == {1, 2}
+    assert store.has_seen_many([1, 2], channel="gmail") == {1}
+    assert gmail.lifecycle == ["open", "close"]
+
+
+async def test_loop_sends_existing_listings_to_a_new_channel(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    main, gmail = RecordingAlerter(), RecordingAlerter()
+    monkeypatch.setattr(da_loop, "get_alerter", lambda alerter_type, *_a: gmail if alerter_type == "GMAIL" else main)
+    client = FakeAnonClient([_listing(1, 40)])
+    await da_loop.loop(**_loop_kwargs(tmp_path, client))
+    await da_loop.loop(
+        **_loop_kwargs(tmp_path, client),
+        alert_channels=[da_channels.ChannelSpec("gmail", "GMAIL", {}, max_price_ratio=0.5)],
+    )
+    assert len(main.calls) == 1
+    assert [body for _title, body in gmail.calls] == [f"Listing available: {_listing(1, 40).url}"]
+
+
+# -- currency conversion ------------------------------------------------------
+
+
+async def test_loop_fetches_rates_once_and_leaves_listings_unconverted(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, rates
+):
+    calls: List[str] = []
+
+    class CountingProvider:
+        async def get_rates(self, base):
+            calls.append(base)
+            return rates
+
+    def blocking_rates(_base):
+        raise AssertionError("the loop shouldn't fetch rates synchronously")
+
+    monkeypatch.setattr(da_currency, "get_currency_rates", blocking_rates)
+    alerter = RecordingAlerter()
+    monkeypatch.setattr(da_loop, "get_alerter", lambda *_a, **_kw: alerter)
+    listings = [_listing(i, 40) for i in range(1, 4)]
+    for listing in listings:
+        listing.price.currency = "GBP"
+    await da_loop.loop(**_loop_kwargs(tmp_path, FakeAnonClient(listings)), rates_provider=CountingProvider())
+    assert calls == ["EUR"]
+    assert len(alerter.calls) == 3
+    # The client's listings aren't converted in place.
+    assert {listing.price.currency for listing in listings} == {"GBP"}
+
+
+# -- worker mode --------------------------------------------------------------
+
+
+async def test_worker_loop_checks_claimed_jobs_and_reports_back(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    alerter = RecordingAlerter()
+    monkeypatch.setattr(da_loop, "get_alerter", lambda *_a, **_kw: alerter)
+    queue = da_workqueue.SqliteWorkQueue(tmp_path / "queue.db")
+    queue.put_many([_release()])
+    kwargs = _loop_kwargs(tmp_path, FakeAnonClient([_listing(1, 50)]))
+    # The wantlist comes from the queue, not from the worker's own source.
+    kwargs["wantlist_path"] = str(tmp_path / "missing.json")
+    try:
+        assert await da_loop.loop(**kwargs, work_queue=queue) == 1
+        assert len(alerter.calls) == 1
+        assert queue.collect() == [(_release().id, {"changed": True})]
+        assert await da_loop.loop(**kwargs, work_queue=queue) == 0
+    finally:
+        queue.close()
+
+
+# -- digests ----------------------------------------------------------------
+
+
+async def test_process_release_buffers_listings_for_digest(tmp_path: Path):
+    seller, record, wl, bl = _filters()
+    alerter = RecordingAlerter()
+    buffer = da_digest.DigestBuffer("release")
+
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        held = await _process(store, FakeAnonClient([_listing(1, 50), _listing(2, 60)]), alerter, digest=buffer)
+        assert held == 2
+        assert alerter.calls == []
+        assert 1 in buffer and 2 in buffer
+        # Held out of the snapshot until the digest goes out.
+        key = da_loop.evaluation_key(_release(), "EUR", "Germany", seller, record, wl, bl)
+        assert store.listing_snapshot(_release().id, key) == {}
+
+
+async def test_loop_sends_one_digest_and_records_every_listing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    alerter = RecordingAlerter()
+    anon = FakeAnonClient([_listing(1, 50), _listing(2, 60), _listing(3, 70)])
+    monkeypatch.setattr(da_loop, "get_alerter", lambda *_a, **_kw: alerter)
+    await da_loop.loop(**_loop_kwargs(tmp_path, anon), digest_mode="release")
+    assert len(alerter.calls) == 1
+    assert alerter.calls[0][0] == "Now For Sale: Test Release (3 listings)"
+    store = da_state.shared_store(tmp_path / "state.db")
+    assert store.has_seen_many([1, 2, 3]) == {1, 2, 3}
+
+
+async def test_loop_holds_digest_until_window_passes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    alerter = RecordingAlerter()
+    anon = FakeAnonClient([_listing(1, 50)])
+    monkeypatch.setattr(da_loop, "get_alerter", lambda *_a, **_kw: alerter)
+    buffer = da_digest.DigestBuffer("all", window=3600)
+    await da_loop.loop(**_loop_kwargs(tmp_path, anon), digest=buffer)
+    assert alerter.calls == []
+    assert 1 in buffer
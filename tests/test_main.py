@@ -9,8 +9,10 @@ the CLI's job: load → optional `--once` / `--validate-config` /
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import signal
 from pathlib import Path
 
 import pytest
@@ -34,11 +36,12 @@ def stub_run(monkeypatch: pytest.MonkeyPatch):
 
     captured: dict = {}
 
-    async def fake_run(loop_kwargs, run_once, interval_seconds, cfg):
+    async def fake_run(loop_kwargs, run_once, interval_seconds, cfg, work_queue=None):
         captured["loop_kwargs"] = loop_kwargs
         captured["run_once"] = run_once
         captured["interval_seconds"] = interval_seconds
         captured["cfg"] = cfg
+        captured["work_queue"] = work_queue
 
     monkeypatch.setattr(da_main, "_run", fake_run)
     return captured
@@ -157,6 +160,67 @@ def test_cli_config_via_env_var(stub_run, config_file, monkeypatch):
     assert stub_run["loop_kwargs"]["alerter_type"] == "NTFY"
 
 
+def _tenant_config(tmp_path: Path, name: str, state_path: Path) -> Path:
+    path = tmp_path / f"{name}.toml"
+    path.write_text(f'discogs_token = "{name}"\n[runtime]\nstate_path = "{state_path}"\n')
+    return path
+
+
+def test_cli_runs_several_configs_as_tenants(stub_run, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    captured: dict = {}
+
+    async def fake_run_tenants(tenants, run_once):
+        captured["tokens"] = [cfg.discogs_token for _loop_kwargs, cfg in tenants]
+        captured["run_once"] = run_once
+
+    monkeypatch.setattr(da_main, "_run_tenants", fake_run_tenants)
+    a = _tenant_config(tmp_path, "alice", tmp_path / "alice.db")
+    b = _tenant_config(tmp_path, "bob", tmp_path / "bob.db")
+    result = CliRunner().invoke(da_main.main, ["-c", str(a), "-c", str(b), "--once"])
+    assert result.exit_code == 0, result.output
+    assert captured == {"tokens": ["alice", "bob"], "run_once": True}
+    assert "loop_kwargs" not in stub_run
+
+
+def test_cli_rejects_tenants_sharing_a_state_db(stub_run, tmp_path: Path):
+    a = _tenant_config(tmp_path, "alice", tmp_path / "state.db")
+    b = _tenant_config(tmp_path, "bob", tmp_path / "state.db")
+    result = CliRunner().invoke(da_main.main, ["-c", str(a), "-c", str(b), "--once"])
+    assert result.exit_code == 2
+    assert "share the state DB" in result.output
+
+
+def test_cli_worker_role_needs_a_work_queue(stub_run, config_file):
+    result = CliRunner().invoke(da_main.main, ["-c", str(config_file), "--role", "worker"])
+    assert result.exit_code == 2
+    assert "needs runtime.work_queue" in result.output
+    assert "loop_kwargs" not in stub_run
+
+
+def test_cli_worker_role_runs_loop_on_the_queue(stub_run, config_file, tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("DA_WORK_QUEUE", f"sqlite:///{tmp_path / 'queue.db'}")
+    result = CliRunner().invoke(da_main.main, ["-c", str(config_file), "--role", "worker", "--once"])
+    assert result.exit_code == 0, result.output
+    assert stub_run["work_queue"].path == tmp_path / "queue.db"
+
+
+def test_cli_coordinator_role_only_schedules(stub_run, config_file, tmp_path: Path, monkeypatch):
+    captured: dict = {}
+
+    async def fake_run_coordinator(loop_kwargs, run_once, interval_seconds, cfg, work_queue):
+        captured["list_id"] = loop_kwargs["list_id"]
+        captured["work_queue"] = work_queue
+
+    monkeypatch.setattr(da_main, "_run_coordinator", fake_run_coordinator)
+    monkeypatch.setenv("DA_ROLE", "coordinator")
+    monkeypatch.setenv("DA_WORK_QUEUE", str(tmp_path / "queue.db"))
+    result = CliRunner().invoke(da_main.main, ["-c", str(config_file), "--once"])
+    assert result.exit_code == 0, result.output
+    assert captured["list_id"] == 42
+    assert captured["work_queue"].path == tmp_path / "queue.db"
+    assert "loop_kwargs" not in stub_run
+
+
 # -- _build_loop_kwargs (unit) ----------------------------------------------
 
 
@@ -220,5 +284,141 @@ async def test_run_invokes_loop_once_when_run_once_true(monkeypatch: pytest.Monk
     )
 
     assert len(loop_calls) == 1
+    assert loop_calls[0]["scheduler"] is None  # --once always checks the whole wantlist
     fake_anon.aclose.assert_awaited_once()
     fake_user.aclose.assert_awaited_once()
+
+
+async def test_run_tenants_checks_every_tenant_through_one_coordinator(monkeypatch: pytest.MonkeyPatch):
+    from unittest.mock import AsyncMock, MagicMock
+
+    from discogs_alert import (
+        client as da_client,
+        config as da_config,
+        coordinator as da_coordinator,
+        loop as da_loop,
+    )
+
+    fakes = {}
+    for name in ("AnonClient", "UserTokenClient"):
+        fakes[name] = MagicMock()
+        fakes[name].aclose = AsyncMock()
+        monkeypatch.setattr(da_client, name, lambda *_a, _fake=fakes[name], **_kw: _fake)
+    used: list = []
+
+    async def fake_loop(**kwargs):
+        used.append((kwargs["discogs_token"], kwargs["client_anon"]))
+
+    monkeypatch.setattr(da_loop, "loop", fake_loop)
+
+    tenants = [
+        ({"discogs_token": token}, da_config.Config.model_validate({"discogs_token": token}))
+        for token in ("A", "B")
+    ]
+    await da_main._run_tenants(tenants, run_once=True)
+
+    assert sorted(token for token, _client in used) == ["A", "B"]
+    coordinators = {id(client) for _token, client in used}
+    assert len(coordinators) == 1
+    assert isinstance(used[0][1], da_coordinator.ReleaseCoordinator)
+    assert used[0][1].client is fakes["AnonClient"]
+    fakes["AnonClient"].aclose.assert_awaited_once()
+    assert fakes["UserTokenClient"].aclose.await_count == 2
+
+
+async def test_runner_carries_on_when_its_alerter_cannot_open(monkeypatch: pytest.MonkeyPatch):
+    """A tenant whose alerter won't open falls back to per-iteration alerters
+    (as the loop did before alerters were kept open) without affecting the
+    others, and a reload opens it once it can.
+    """
+
+    from unittest.mock import AsyncMock, MagicMock
+
+    from discogs_alert import client as da_client, config as da_config, loop as da_loop, outbox as da_outbox
+
+    fake = MagicMock()
+    fake.aclose = AsyncMock()
+    monkeypatch.setattr(da_client, "UserTokenClient", lambda *_a, **_kw: fake)
+    monkeypatch.setattr(da_outbox, "start_retrier", lambda *_a, **_kw: None)
+    broken = {"BROKEN"}
+
+    def fake_get_alerter(alerter_type, _kwargs):
+        if alerter_type in broken:
+            raise ValueError("no such alerter")
+        return MagicMock()
+
+    monkeypatch.setattr(da_main, "get_alerter", fake_get_alerter)
+    monkeypatch.setattr(da_main, "reload_alerters", lambda: None)
+    used: list = []
+
+    async def fake_loop(**kwargs):
+        used.append(kwargs["alerter"])
+
+    monkeypatch.setattr(da_loop, "loop", fake_loop)
+
+    cfg = da_config.Config.model_validate({"discogs_token": "T"})
+    bad, good = (
+        da_main._Runner({"alerter_type": alerter_type, "alerter_kwargs": {}}, False, 1, cfg)
+        for alerter_type in ("BROKEN", "NTFY")
+    )
+    bad.open()
+    good.open()
+    assert bad.alerter is None and bad.retriers == []
+    assert good.alerter is not None
+    await bad.iterate(None)
+    assert used == [None]
+
+    broken.clear()
+    await bad.reload()
+    assert bad.alerter is not None and len(bad.retriers) == 1
+    await bad.aclose()
+    await good.aclose()
+    bad.alerter.close.assert_called_once()
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="needs SIGHUP")
+async def test_run_reloads_alerter_on_sighup(monkeypatch: pytest.MonkeyPatch):
+    """SIGHUP rebuilds the alerter registry and swaps in a fresh alerter
+    before the next iteration.
+    """
+
+    from unittest.mock import AsyncMock, MagicMock
+
+    from discogs_alert import client as da_client, config as da_config, loop as da_loop, outbox as da_outbox
+
+    for name in ("AnonClient", "UserTokenClient"):
+        fake = MagicMock()
+        fake.aclose = AsyncMock()
+        monkeypatch.setattr(da_client, name, lambda *_a, _fake=fake, **_kw: _fake)
+    alerters: list = []
+    monkeypatch.setattr(da_main, "get_alerter", lambda *_a: alerters.append(MagicMock()) or alerters[-1])
+    reloads: list = []
+    monkeypatch.setattr(da_main, "reload_alerters", lambda: reloads.append(1))
+    monkeypatch.setattr(da_outbox, "start_retrier", lambda *_a, **_kw: None)
+    monkeypatch.setattr(da_main.da_scheduler, "sleep_seconds", lambda *_a: 0)
+
+    class _Stop(Exception):
+        pass
+
+    used: list = []
+
+    async def fake_loop(**kwargs):
+        used.append(kwargs["alerter"])
+        if len(used) == 1:
+            os.kill(os.getpid(), signal.SIGHUP)
+            await asyncio.sleep(0.05)
+        else:
+            raise _Stop
+
+    monkeypatch.setattr(da_loop, "loop", fake_loop)
+
+    cfg = da_config.Config.model_validate({"discogs_token": "T"})
+    with pytest.raises(_Stop):
+        await da_main._run(
+            loop_kwargs={"alerter_type": "NTFY", "alerter_kwargs": {}}, run_once=False, interval_seconds=1, cfg=cfg
+        )
+
+    assert reloads == [1]
+    assert used == alerters and len(alerters) == 2
+    alerters[0].close.assert_called_once()
+    alerters[1].close.assert_called_once()
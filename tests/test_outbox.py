@@ -0,0 +1,205 @@
+"""Tests for `AlertOutbox`: queued delivery, retries, and the delivered /
+failed callbacks; and for the durable-outbox retrier.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from discogs_alert import outbox as da_outbox, state as da_state
+from discogs_alert.alert import Alerter
+
+
+class ScriptedAlerter(Alerter):
+    """Returns the scripted results in order (then the last one forever)."""
+
+    def __init__(self, *results):
+        self.results = list(results) or [True]
+        self.calls: List[tuple] = []
+
+    def send_alert(self, title: str, body: str) -> bool:
+        self.calls.append((title, body))
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _alert(listing_id: int = 1, release_id: int = 10) -> da_outbox.PendingAlert:
+    return da_outbox.PendingAlert(f"title {listing_id}", "body", [(listing_id, release_id)])
+
+
+def _outbox(alerter, **kwargs):
+    delivered: List[da_outbox.PendingAlert] = []
+    failed: List[da_outbox.PendingAlert] = []
+    sleeps: List[float] = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    outbox = da_outbox.AlertOutbox(
+        alerter, on_delivered=delivered.append, on_failed=failed.append, sleep_fn=fake_sleep, **kwargs
+    )
+    return outbox, delivered, failed, sleeps
+
+
+async def test_default_send_alert_async_runs_send_alert_in_a_thread():
+    alerter = ScriptedAlerter(True)
+    assert await alerter.send_alert_async("t", "b") is True
+    assert alerter.calls == [("t", "b")]
+
+
+async def test_delivers_and_reports_each_alert():
+    outbox, delivered, failed, _ = _outbox(ScriptedAlerter(True))
+    async with outbox:
+        await outbox.put(_alert(1))
+        await outbox.put(_alert(2))
+    assert sorted(a.listings[0][0] for a in delivered) == [1, 2]
+    assert failed == []
+    assert outbox.delivered == 2
+
+
+async def test_retries_with_exponential_backoff():
+    alerter = ScriptedAlerter(False, RuntimeError("boom"), True)
+    outbox, delivered, failed, sleeps = _outbox(alerter, max_attempts=3)
+    async with outbox:
+        await outbox.put(_alert())
+    assert len(alerter.calls) == 3
+    assert sleeps == [da_outbox.RETRY_BACKOFF_SECONDS, da_outbox.RETRY_BACKOFF_SECONDS * 2]
+    assert len(delivered) == 1 and delivered[0].attempts == 3
+
+
+async def test_gives_up_after_max_attempts():
+    outbox, delivered, failed, _ = _outbox(ScriptedAlerter(False), max_attempts=2)
+    async with outbox:
+        await outbox.put(_alert())
+    assert delivered == []
+    assert len(failed) == 1
+    assert outbox.failed == 1
+
+
+async def test_alert_claimed_elsewhere_is_dropped_between_attempts():
+    alerter = ScriptedAlerter(False)
+    claims = iter([True, False])
+    outbox, delivered, failed, _ = _outbox(alerter, max_attempts=3, on_attempt=lambda _alert: next(claims))
+    async with outbox:
+        await outbox.put(_alert())
+    assert len(alerter.calls) == 1
+    assert delivered == [] and failed == []
+
+
+async def test_slow_delivery_runs_concurrently_across_workers():
+    class SlowAlerter(Alerter):
+        def __init__(self):
+            self.in_flight = 0
+            self.peak = 0
+
+        async def send_alert_async(self, title, body):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return True
+
+    alerter = SlowAlerter()
+    outbox, delivered, _, _ = _outbox(alerter, workers=3)
+    async with outbox:
+        for i in range(6):
+            await outbox.put(_alert(i))
+    assert len(delivered) == 6
+    assert alerter.peak == 3
+
+
+async def test_put_waits_for_room_when_full():
+    outbox, delivered, _, _ = _outbox(ScriptedAlerter(True), queue_size=1)
+    await outbox.put(_alert(1))
+    blocked = asyncio.create_task(outbox.put(_alert(2)))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+    outbox.start()
+    await blocked
+    await outbox.close()
+    assert len(delivered) == 2
+
+
+async def test_offer_turns_alerts_away_when_full():
+    outbox, delivered, _, _ = _outbox(ScriptedAlerter(True), queue_size=1)
+    assert outbox.offer(_alert(1))
+    assert not outbox.offer(_alert(2))
+    async with outbox:
+        pass
+    assert [a.listings[0][0] for a in delivered] == [1]
+
+
+async def test_callback_errors_do_not_kill_workers():
+    def explode(_alert):
+        raise RuntimeError("callback")
+
+    outbox = da_outbox.AlertOutbox(ScriptedAlerter(True), on_delivered=explode)
+    async with outbox:
+        await outbox.put(_alert(1))
+        await outbox.put(_alert(2))
+    assert outbox.delivered == 2
+
+
+def test_rejects_bad_sizes():
+    for kwargs in ({"workers": 0}, {"queue_size": 0}, {"max_attempts": 0}):
+        with pytest.raises(ValueError):
+            da_outbox.AlertOutbox(ScriptedAlerter(), on_delivered=print, **kwargs)
+
+
+# -- durable retries --------------------------------------------------------
+
+
+def test_retry_delay_grows_and_caps():
+    assert da_outbox.retry_delay(1) == da_outbox.RETRY_BACKOFF_SECONDS * 2
+    assert da_outbox.retry_delay(2) == da_outbox.RETRY_BACKOFF_SECONDS * 4
+    assert da_outbox.retry_delay(100) == da_outbox.DURABLE_RETRY_MAX_SECONDS
+
+
+def test_pending_alert_from_entry_keeps_outbox_row():
+    entry = da_state.OutboxEntry(5, "t", "b", 2, [(1, 10)], lease=3)
+    alert = da_outbox.PendingAlert.from_entry(entry)
+    assert (alert.outbox_id, alert.prior_attempts, alert.attempts, alert.lease) == (5, 2, 0, 3)
+    assert alert.listings == [(1, 10)]
+
+
+async def test_retry_pending_completes_delivered_alerts(tmp_path: Path):
+    alerter = ScriptedAlerter(True)
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        store.enqueue_alert("t", "b", [(1, 10)])
+        assert await da_outbox.retry_pending(store, alerter) == 1
+        assert alerter.calls == [("t", "b")]
+        assert store.has_seen(1)
+        assert store.outbox_count() == 0
+
+
+async def test_retry_pending_defers_failed_alerts(tmp_path: Path):
+    alerter = ScriptedAlerter(RuntimeError("down"))
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        store.enqueue_alert("t", "b", [(1, 10)])
+        assert await da_outbox.retry_pending(store, alerter) == 0
+        assert not store.has_seen(1)
+        assert store.outbox_count() == 1
+        # Deferred, so a second pass doesn't try it again straight away.
+        assert await da_outbox.retry_pending(store, alerter) == 0
+        assert len(alerter.calls) == 1
+
+
+async def test_retry_pending_skips_alerts_claimed_again_mid_pass(tmp_path: Path):
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        store.enqueue_alert("slow", "b", [(1, 10)])
+        store.enqueue_alert("late", "b", [(2, 10)])
+
+        class SlowAlerter(ScriptedAlerter):
+            def send_alert(self, title, body):
+                # The pass outlives the second alert's lease; another process claims it.
+                store._conn.execute("UPDATE outbox SET lease = lease + 1 WHERE title = 'late'")
+                store._conn.commit()
+                return super().send_alert(title, body)
+
+        alerter = SlowAlerter(True)
+        assert await da_outbox.retry_pending(store, alerter) == 1
+        assert alerter.calls == [("slow", "b")]
@@ -0,0 +1,120 @@
+"""Tests for `ReleaseScheduler`: due-time bookkeeping and adaptive intervals."""
+
+import pytest
+
+from discogs_alert import scheduler as da_scheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock: FakeClock) -> da_scheduler.ReleaseScheduler:
+    return da_scheduler.ReleaseScheduler(min_interval=60, max_interval=3600, clock=clock)
+
+
+def test_rejects_bad_bounds():
+    with pytest.raises(ValueError):
+        da_scheduler.ReleaseScheduler(min_interval=0)
+    with pytest.raises(ValueError):
+        da_scheduler.ReleaseScheduler(min_interval=100, max_interval=10)
+
+
+def test_new_releases_are_due_immediately(scheduler: da_scheduler.ReleaseScheduler):
+    scheduler.sync([1, 2, 3])
+    assert sorted(scheduler.pop_due()) == [1, 2, 3]
+    assert scheduler.pop_due() == []
+
+
+def test_sync_forgets_removed_releases(scheduler: da_scheduler.ReleaseScheduler):
+    scheduler.sync([1, 2])
+    scheduler.sync([2])
+    assert scheduler.pop_due() == [2]
+    assert len(scheduler) == 1
+
+
+def test_rescheduled_release_becomes_due_after_interval(scheduler, clock):
+    scheduler.sync([1])
+    scheduler.pop_due()
+    scheduler.reschedule(1)
+    interval = scheduler.interval(1)
+    assert scheduler.seconds_until_next_due() == pytest.approx(interval)
+    clock.now += interval - 1
+    assert scheduler.pop_due() == []
+    clock.now += 1
+    assert scheduler.pop_due() == [1]
+
+
+def test_pop_due_orders_most_overdue_first(scheduler, clock):
+    scheduler.sync([1])
+    clock.now += 10
+    scheduler.sync([1, 2])
+    assert scheduler.pop_due() == [1, 2]
+
+
+def test_nothing_for_sale_means_max_interval(scheduler):
+    scheduler.sync([1])
+    scheduler.observe_stats(1, num_for_sale=0, price_ratio=None)
+    assert scheduler.interval(1) == pytest.approx(3600)
+
+
+def test_cheap_plentiful_release_is_hot(scheduler):
+    scheduler.sync([1])
+    scheduler.observe_stats(1, num_for_sale=80, price_ratio=0.9)
+    assert scheduler.interval(1) == pytest.approx(60)
+
+
+def test_expensive_scarce_release_is_cool(scheduler):
+    scheduler.sync([1, 2])
+    scheduler.observe_stats(1, num_for_sale=1, price_ratio=5.0)
+    scheduler.observe_stats(2, num_for_sale=20, price_ratio=1.2)
+    assert scheduler.interval(1) > scheduler.interval(2)
+    assert scheduler.interval(1) > 1000
+
+
+def test_churn_shortens_interval_and_decays(scheduler):
+    scheduler.sync([1])
+    scheduler.observe_stats(1, num_for_sale=1, price_ratio=5.0)
+    quiet = scheduler.interval(1)
+    scheduler.observe_listings(1, changed=True)
+    assert scheduler.interval(1) == pytest.approx(60)
+    for _ in range(5):
+        scheduler.observe_listings(1, changed=False)
+    assert 60 < scheduler.interval(1) < quiet
+
+
+def test_expedite_makes_everything_due(scheduler):
+    scheduler.sync([1, 2])
+    scheduler.pop_due()
+    scheduler.reschedule(1)
+    scheduler.reschedule(2)
+    scheduler.expedite()
+    assert sorted(scheduler.pop_due()) == [1, 2]
+
+
+def test_observations_for_untracked_releases_are_ignored(scheduler):
+    scheduler.observe_stats(9, num_for_sale=3, price_ratio=1.0)
+    scheduler.observe_listings(9, changed=True)
+    scheduler.reschedule(9)
+    assert len(scheduler) == 0
+
+
+def test_sleep_seconds(scheduler, clock):
+    assert da_scheduler.sleep_seconds(60, None) == 60
+    scheduler.sync([1])
+    assert da_scheduler.sleep_seconds(60, scheduler) == 1.0
+    scheduler.pop_due()
+    scheduler.observe_stats(1, num_for_sale=0, price_ratio=None)
+    scheduler.reschedule(1)
+    assert da_scheduler.sleep_seconds(60, scheduler) == 60
+    assert da_scheduler.sleep_seconds(7200, scheduler) == pytest.approx(3600)
@@ -281,3 +281,61 @@ def test_parse_price_string_handles_unparseable_numeric():
 
     with pytest.raises(da_scrape.PriceParsingException):
         da_scrape._parse_price_string("€not-a-number")
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_listing_tuples_are_records_built_without_pydantic(backend: str, monkeypatch: pytest.MonkeyPatch):
+    if backend == "lxml":
+        pytest.importorskip("lxml")
+    expected = [listing.as_tuple() for listing in da_scrape.scrape_listings_from_marketplace(MARKETPLACE_HTML, 1)]
+
+    def no_validation(*_a, **_kw):
+        raise AssertionError("scraping shouldn't validate a pydantic model per row")
+
+    monkeypatch.setattr(da_entities.Listing, "model_validate", no_validation)
+    records = da_scrape.scrape_listing_tuples(MARKETPLACE_HTML, 1, parser_backend=backend)
+    assert all(isinstance(record, da_entities.ListingRecord) for record in records)
+    assert records == expected
+
+
+# -- Parser backends --------------------------------------------------------
+
+
+@pytest.mark.parametrize("html", [MARKETPLACE_HTML, REAL_MARKETPLACE_HTML], ids=["synthetic", "real"])
+def test_lxml_and_bs4_backends_produce_identical_listings(html: str):
+    pytest.importorskip("lxml")
+    bs4_listings = da_scrape.scrape_listings_from_marketplace(html, 2247646, parser_backend="bs4")
+    lxml_listings = da_scrape.scrape_listings_from_marketplace(html, 2247646, parser_backend="lxml")
+    assert bs4_listings
+    assert lxml_listings == bs4_listings
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_every_backend_returns_empty_without_marketplace_table(backend: str):
+    assert da_scrape.scrape_listings_from_marketplace("<html><body>nothing</body></html>", 1, backend) == []
+
+
+def test_resolve_parser_backend_auto_prefers_lxml(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(da_scrape, "lxml_html", object())
+    assert da_scrape.resolve_parser_backend("auto") == "lxml"
+    monkeypatch.setattr(da_scrape, "lxml_html", None)
+    assert da_scrape.resolve_parser_backend("auto") == "bs4"
+
+
+def test_resolve_parser_backend_falls_back_when_lxml_missing(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(da_scrape, "lxml_html", None)
+    assert da_scrape.resolve_parser_backend("LXML") == "bs4"
+
+
+def test_resolve_parser_backend_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        da_scrape.resolve_parser_backend("html5lib")
+
+
+def test_listings_table_html_slices_out_the_table():
+    html = '<html><table class="nav"></table><table class="table_block mpitems">' \
+        "<tbody><tr><td><table></table></td></tr></tbody></table><footer></footer></html>"
+    table = da_scrape.listings_table_html(html)
+    assert table.startswith('<table class="table_block mpitems">')
+    assert table.endswith("</tbody></table>")
+    assert da_scrape.listings_table_html("<html></html>") is None
@@ -1,4 +1,5 @@
 import sqlite3
+import threading
 import time
 from pathlib import Path
 
@@ -111,7 +112,8 @@ def test_concurrent_inserts_within_one_window_dedup(tmp_store: da_state.AlertSto
 
 
 def test_stats_empty_store(tmp_store: da_state.AlertStore):
-    assert tmp_store.stats() == {"total": 0, "last_24h": 0, "last_7d": 0}
+    s = tmp_store.stats()
+    assert s == {"total": 0, "last_24h": 0, "last_7d": 0, "seen_cache_bytes": s["seen_cache_bytes"]}
 
 
 def test_stats_counts_recent_rows(tmp_store: da_state.AlertStore):
@@ -119,7 +121,7 @@ def test_stats_counts_recent_rows(tmp_store: da_state.AlertStore):
     tmp_store.mark_seen(2, 10, "t", "b")
     tmp_store.mark_seen(3, 11, "t", "b")
     s = tmp_store.stats()
-    assert s == {"total": 3, "last_24h": 3, "last_7d": 3}
+    assert s == {"total": 3, "last_24h": 3, "last_7d": 3, "seen_cache_bytes": s["seen_cache_bytes"]}
 
 
 def test_stats_time_windows(tmp_path: Path):
@@ -151,3 +153,312 @@ def test_sent_at_is_iso_like(tmp_store: da_state.AlertStore):
     sent_at = cur.fetchone()[0]
     assert isinstance(sent_at, str)
     time.strptime(sent_at, "%Y-%m-%d %H:%M:%S")
+
+
+# -- listing snapshots --------------------------------------------------------
+
+
+def test_listing_snapshot_starts_empty(tmp_store: da_state.AlertStore):
+    assert tmp_store.listing_snapshot(1, "key") == {}
+
+
+def test_save_then_read_listing_snapshot(tmp_store: da_state.AlertStore):
+    departed = tmp_store.save_listing_snapshot(1, "key", present_ids={10, 11, 12}, evaluated={10: "a", 11: "b"})
+    assert departed == set()
+    assert tmp_store.listing_snapshot(1, "key") == {10: "a", 11: "b"}
+    assert tmp_store.listing_snapshot(2, "key") == {}
+
+
+def test_listing_snapshot_under_other_key_counts_as_empty(tmp_store: da_state.AlertStore):
+    tmp_store.save_listing_snapshot(1, "old", present_ids={10}, evaluated={10: "a"})
+    assert tmp_store.listing_snapshot(1, "new") == {}
+    # Re-evaluating under the new key replaces the old entries rather than merging.
+    tmp_store.save_listing_snapshot(1, "new", present_ids={10, 11}, evaluated={11: "b"})
+    assert tmp_store.listing_snapshot(1, "new") == {11: "b"}
+
+
+def test_save_listing_snapshot_keeps_still_present_entries(tmp_store: da_state.AlertStore):
+    tmp_store.save_listing_snapshot(1, "key", present_ids={10, 11}, evaluated={10: "a", 11: "b"})
+    tmp_store.save_listing_snapshot(1, "key", present_ids={10, 11, 12}, evaluated={12: "c"})
+    assert tmp_store.listing_snapshot(1, "key") == {10: "a", 11: "b", 12: "c"}
+
+
+def test_save_listing_snapshot_updates_price_keys(tmp_store: da_state.AlertStore):
+    tmp_store.save_listing_snapshot(1, "key", present_ids={10, 11}, evaluated={10: "a", 11: "b"})
+    departed = tmp_store.save_listing_snapshot(1, "key", present_ids={10, 11}, evaluated={10: "a2"})
+    assert departed == set()
+    assert tmp_store.listing_snapshot(1, "key") == {10: "a2", 11: "b"}
+
+
+def test_save_listing_snapshot_records_departures(tmp_store: da_state.AlertStore):
+    tmp_store.save_listing_snapshot(1, "key", present_ids={10, 11}, evaluated={10: "a", 11: "b"})
+    departed = tmp_store.save_listing_snapshot(1, "key", present_ids={11}, evaluated={})
+    assert departed == {10}
+    assert tmp_store.listing_snapshot(1, "key") == {11: "b"}
+    assert tmp_store.departed_count() == 1
+
+
+def test_prune_older_than_drops_stale_snapshots(tmp_store: da_state.AlertStore):
+    tmp_store.save_listing_snapshot(1, "key", present_ids={10}, evaluated={10: "a"})
+    tmp_store._conn.execute("UPDATE release_snapshots SET updated_at = datetime('now', '-30 days')")
+    tmp_store._conn.commit()
+    tmp_store.prune_older_than(days=7)
+    assert tmp_store.listing_snapshot(1, "key") == {}
+
+
+# -- batched lookups / inserts ------------------------------------------------
+
+
+def test_has_seen_many_returns_only_seen_ids(tmp_store: da_state.AlertStore):
+    tmp_store.mark_seen(1, 1, "t", "b")
+    tmp_store.mark_seen(3, 1, "t", "b")
+    assert tmp_store.has_seen_many([1, 2, 3, 4]) == {1, 3}
+    assert tmp_store.has_seen_many([]) == set()
+
+
+def test_has_seen_many_chunks_large_inputs(tmp_store: da_state.AlertStore):
+    ids = list(range(1, 2 * da_state._MAX_IN_PARAMS + 10))
+    tmp_store.mark_seen_many([(i, 1, "t", "b") for i in ids[::2]])
+    assert tmp_store.has_seen_many(ids) == set(ids[::2])
+
+
+def test_mark_seen_many_is_idempotent(tmp_store: da_state.AlertStore):
+    tmp_store.mark_seen(1, 1, "t", "b")
+    tmp_store.mark_seen_many([(1, 1, "t", "b"), (2, 1, "t", "b"), (2, 1, "t", "b")])
+    assert tmp_store.count() == 2
+
+
+def test_mark_seen_many_accepts_empty_batch(tmp_store: da_state.AlertStore):
+    tmp_store.mark_seen_many([])
+    assert tmp_store.count() == 0
+
+
+# -- connection setup / migrations --------------------------------------------
+
+
+def test_uses_wal_and_normal_sync(tmp_store: da_state.AlertStore):
+    assert tmp_store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert tmp_store._conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_fresh_database_is_at_latest_schema_version(tmp_store: da_state.AlertStore):
+    assert tmp_store.schema_version() == da_state.SCHEMA_VERSION
+
+
+def test_migrates_unversioned_database(tmp_path: Path):
+    """Databases created before `schema_version` existed already have the
+    alert table; migrating must keep their rows.
+    """
+
+    db_path = tmp_path / "state.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE sent_alerts (listing_id INTEGER PRIMARY KEY, release_id INTEGER NOT NULL, "
+        "title TEXT NOT NULL, body TEXT NOT NULL, sent_at TEXT NOT NULL DEFAULT (datetime('now')))"
+    )
+    conn.execute("INSERT INTO sent_alerts (listing_id, release_id, title, body) VALUES (7, 1, 't', 'b')")
+    conn.commit()
+    conn.close()
+
+    with da_state.AlertStore(db_path) as store:
+        assert store.schema_version() == da_state.SCHEMA_VERSION
+        assert store.has_seen(7)
+        assert store.listing_snapshot(1, "key") == {}
+
+
+def test_reopen_does_not_rerun_migrations(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    db_path = tmp_path / "state.db"
+    da_state.AlertStore(db_path).close()
+    monkeypatch.setattr(da_state, "_MIGRATIONS", (("SELECT no_such_column FROM sent_alerts",),) * 2)
+    with da_state.AlertStore(db_path) as store:
+        assert store.schema_version() == da_state.SCHEMA_VERSION
+
+
+def test_refuses_database_from_newer_version(tmp_path: Path):
+    db_path = tmp_path / "state.db"
+    with da_state.AlertStore(db_path) as store:
+        store._conn.execute("UPDATE schema_version SET version = ?", (da_state.SCHEMA_VERSION + 1,))
+        store._conn.commit()
+    with pytest.raises(RuntimeError, match="newer"):
+        da_state.AlertStore(db_path)
+
+
+def test_shared_store_is_reused_per_path(tmp_path: Path):
+    store = da_state.shared_store(tmp_path / "state.db")
+    assert da_state.shared_store(tmp_path / "state.db") is store
+    assert da_state.shared_store(tmp_path / "other.db") is not store
+
+
+def test_closed_shared_store_is_reopened(tmp_path: Path):
+    store = da_state.shared_store(tmp_path / "state.db")
+    store.mark_seen(1, 1, "t", "b")
+    da_state.close_shared_stores()
+    reopened = da_state.shared_store(tmp_path / "state.db")
+    assert reopened is not store
+    assert reopened.has_seen(1)
+
+
+def test_shared_store_readable_from_another_thread(tmp_path: Path):
+    store = da_state.shared_store(tmp_path / "state.db")
+    store.mark_seen(1, 1, "t", "b")
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(store.stats()))
+    worker.start()
+    worker.join()
+    assert result["total"] == 1
+
+
+# -- in-memory seen cache -------------------------------------------------------
+
+
+def test_seen_cache_loaded_on_open(tmp_path: Path):
+    db_path = tmp_path / "state.db"
+    with da_state.AlertStore(db_path) as store:
+        store.mark_seen_many([(3, 1, "t", "b"), (1, 1, "t", "b")])
+    with da_state.AlertStore(db_path) as store:
+        assert 1 in store._seen and 3 in store._seen
+        assert len(store._seen) == 2
+
+
+def test_has_seen_hit_does_not_touch_sqlite(tmp_store: da_state.AlertStore):
+    tmp_store.mark_seen(5, 1, "t", "b")
+    tmp_store._conn.execute("DELETE FROM sent_alerts")
+    tmp_store._conn.commit()
+    assert tmp_store.has_seen(5)
+    assert tmp_store.has_seen_many([5, 6]) == {5}
+
+
+def test_has_seen_picks_up_rows_written_by_another_connection(tmp_path: Path):
+    db_path = tmp_path / "state.db"
+    with da_state.AlertStore(db_path) as reader, da_state.AlertStore(db_path) as writer:
+        writer.mark_seen(9, 1, "t", "b")
+        assert reader.has_seen(9)
+        assert 9 in reader._seen
+
+
+def test_prune_evicts_from_seen_cache(tmp_store: da_state.AlertStore):
+    tmp_store.mark_seen(1, 1, "t", "b")
+    tmp_store.mark_seen(2, 1, "t", "b")
+    tmp_store._conn.execute("UPDATE sent_alerts SET sent_at = datetime('now', '-30 days') WHERE listing_id = 1")
+    tmp_store._conn.commit()
+    assert tmp_store.prune_older_than(days=7) == 1
+    assert 1 not in tmp_store._seen
+    assert tmp_store.has_seen(2)
+    assert not tmp_store.has_seen(1)
+
+
+def test_seen_cache_stays_sorted_and_deduplicated():
+    cache = da_state._SeenIdCache([2, 8])
+    cache.add_many([5])
+    cache.add_many([9, 1, 5, 2, 7])
+    assert list(cache._ids) == [1, 2, 5, 7, 8, 9]
+    assert 7 in cache and 6 not in cache
+
+
+def test_stats_reports_seen_cache_footprint(tmp_store: da_state.AlertStore):
+    empty = tmp_store.stats()["seen_cache_bytes"]
+    tmp_store.mark_seen_many([(i, 1, "t", "b") for i in range(1, 1001)])
+    assert tmp_store.stats()["seen_cache_bytes"] >= empty + 1000 * 8
+
+
+# -- durable outbox ---------------------------------------------------------
+
+
+def test_enqueue_alert_marks_listings_pending(tmp_store: da_state.AlertStore):
+    outbox_id = tmp_store.enqueue_alert("t", "b", [(1, 10), (2, 10)])
+    assert outbox_id is not None
+    assert tmp_store.pending_many([1, 2, 3]) == {1, 2}
+    assert tmp_store.outbox_count() == 1
+
+
+def test_enqueue_alert_skips_already_pending_listings(tmp_store: da_state.AlertStore):
+    tmp_store.enqueue_alert("t", "b", [(1, 10)])
+    assert tmp_store.enqueue_alert("t", "b", [(1, 10)]) is None
+    assert tmp_store.outbox_count() == 1
+
+
+def test_enqueue_alert_skips_already_sent_listings(tmp_store: da_state.AlertStore):
+    # Another worker alerted on it first.
+    tmp_store.mark_seen(1, 10, "t", "b")
+    assert tmp_store.enqueue_alert("t", "b", [(1, 10)]) is None
+    assert tmp_store.outbox_count() == 0
+
+
+def test_claim_due_alerts_leases_them(tmp_store: da_state.AlertStore):
+    outbox_id = tmp_store.enqueue_alert("t", "b", [(1, 10)])
+    [entry] = tmp_store.claim_due_alerts(10, lease_seconds=300)
+    assert entry == da_state.OutboxEntry(outbox_id, "t", "b", 0, [(1, 10)], lease=1)
+    assert tmp_store.claim_due_alerts(10, lease_seconds=300) == []
+
+
+def test_renew_lease_only_for_the_latest_claim(tmp_store: da_state.AlertStore):
+    outbox_id = tmp_store.enqueue_alert("t", "b", [(1, 10)], lease_seconds=0)
+    assert tmp_store.renew_lease(outbox_id, 0, lease_seconds=0)
+    # The enqueuer's lease ran out and the retrier claimed it.
+    [entry] = tmp_store.claim_due_alerts(10, lease_seconds=0)
+    assert not tmp_store.renew_lease(outbox_id, 0, lease_seconds=300)
+    assert tmp_store.renew_lease(outbox_id, entry.lease, lease_seconds=300)
+    assert tmp_store.claim_due_alerts(10, lease_seconds=300) == []
+    tmp_store.complete_alert(outbox_id)
+    assert not tmp_store.renew_lease(outbox_id, entry.lease, lease_seconds=300)
+
+
+def test_leased_alert_is_not_due(tmp_store: da_state.AlertStore):
+    tmp_store.enqueue_alert("t", "b", [(1, 10)], lease_seconds=300)
+    assert tmp_store.claim_due_alerts(10, lease_seconds=300) == []
+
+
+def test_complete_alert_records_it_as_sent(tmp_store: da_state.AlertStore):
+    outbox_id = tmp_store.enqueue_alert("t", "b", [(1, 10)])
+    tmp_store.complete_alert(outbox_id)
+    assert tmp_store.has_seen(1)
+    assert tmp_store.pending_many([1]) == set()
+    assert tmp_store.outbox_count() == 0
+
+
+def test_defer_alert_counts_attempts(tmp_store: da_state.AlertStore):
+    outbox_id = tmp_store.enqueue_alert("t", "b", [(1, 10)])
+    tmp_store.defer_alert(outbox_id, 0, attempts=3)
+    [entry] = tmp_store.claim_due_alerts(10, lease_seconds=300)
+    assert entry.attempts == 3
+    tmp_store.defer_alert(outbox_id, 300)
+    assert tmp_store.claim_due_alerts(10, lease_seconds=300) == []
+
+
+def test_outbox_survives_reopen(tmp_path: Path):
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        store.enqueue_alert("t", "b", [(1, 10)])
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        assert [entry.title for entry in store.claim_due_alerts(10, lease_seconds=300)] == ["t"]
+
+
+# -- alert channels -------------------------------------------------------------
+
+
+def test_seen_is_tracked_per_channel(tmp_store: da_state.AlertStore):
+    tmp_store.mark_seen(1, 10, "t", "b")
+    tmp_store.mark_seen_many([(2, 10, "t", "b")], channel="gmail")
+    assert tmp_store.has_seen_many([1, 2]) == {1}
+    assert tmp_store.has_seen_many([1, 2], channel="gmail") == {2}
+    assert tmp_store.has_seen(2, channel="gmail") and not tmp_store.has_seen(1, channel="gmail")
+
+
+def test_seen_channels_survive_reopen(tmp_path: Path):
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        store.mark_seen(1, 10, "t", "b", channel="gmail")
+    with da_state.AlertStore(tmp_path / "state.db") as store:
+        assert store.has_seen(1, channel="gmail")
+        assert not store.has_seen(1)
+
+
+def test_outbox_is_scoped_per_channel(tmp_store: da_state.AlertStore):
+    tmp_store.enqueue_alert("t", "b", [(1, 10)])
+    gmail_id = tmp_store.enqueue_alert("t", "b", [(1, 10)], channel="gmail")
+    assert gmail_id is not None
+    assert tmp_store.pending_many([1], channel="gmail") == {1}
+    [entry] = tmp_store.claim_due_alerts(10, lease_seconds=300, channel="gmail")
+    assert entry.id == gmail_id and entry.channel == "gmail"
+    tmp_store.complete_alert(gmail_id)
+    assert tmp_store.has_seen(1, channel="gmail")
+    assert not tmp_store.has_seen(1)
+    assert tmp_store.pending_many([1]) == {1}
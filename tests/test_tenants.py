@@ -0,0 +1,60 @@
+"""Tests for multi-tenant mode: config checks, the shared client, and running tenants together."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from discogs_alert import config as da_config, tenants as da_tenants
+
+
+def _cfg(state_path=None) -> da_config.Config:
+    return da_config.Config.model_validate({"discogs_token": "T", "runtime": {"state_path": state_path}})
+
+
+def test_check_tenants_requires_a_state_db_each(tmp_path: Path):
+    da_tenants.check_tenants([_cfg(str(tmp_path / "a.db")), _cfg(str(tmp_path / "b.db"))])
+    with pytest.raises(ValueError, match="share the state DB"):
+        da_tenants.check_tenants([_cfg(str(tmp_path / "a.db")), _cfg(str(tmp_path / "a.db"))])
+    with pytest.raises(ValueError):
+        da_tenants.check_tenants([_cfg(), _cfg()])
+
+
+async def test_shared_anon_client_follows_the_first_config():
+    first = _cfg()
+    first.runtime.scrape_requests_per_minute = 30
+    client = da_tenants.shared_anon_client([first, _cfg()])
+    try:
+        assert client.rate_limiter is not None
+        assert client.page_max_age == da_tenants.TENANT_PAGE_MAX_AGE
+    finally:
+        await client.aclose()
+
+
+async def test_run_all_waits_for_every_tenant():
+    finished = []
+
+    async def run(name: str, delay: float):
+        await asyncio.sleep(delay)
+        finished.append(name)
+
+    await da_tenants.run_all([run("a", 0.02), run("b", 0)])
+    assert finished == ["b", "a"]
+
+
+async def test_run_all_cancels_the_others_when_one_fails():
+    cancelled = []
+
+    async def forever():
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await da_tenants.run_all([forever(), broken()])
+    assert cancelled == [True]
@@ -0,0 +1,110 @@
+"""Tests for the coordinator / worker work queue."""
+
+from pathlib import Path
+
+import pytest
+
+from discogs_alert import entities as da_entities, scheduler as da_scheduler, workqueue as da_workqueue
+
+
+def _release(release_id: int) -> da_entities.Release:
+    return da_entities.Release(id=release_id, display_title=f"R{release_id}")
+
+
+@pytest.fixture
+def queue(tmp_path: Path):
+    q = da_workqueue.SqliteWorkQueue(tmp_path / "queue.db")
+    yield q
+    q.close()
+
+
+# -- SqliteWorkQueue ----------------------------------------------------------
+
+
+def test_put_many_skips_releases_already_queued(queue: da_workqueue.SqliteWorkQueue):
+    assert queue.put_many([_release(1), _release(2)]) == 2
+    assert queue.put_many([_release(2), _release(3)]) == 1
+
+
+def test_claim_leases_oldest_jobs_and_round_trips_the_release(queue: da_workqueue.SqliteWorkQueue):
+    queue.put_many([_release(1), _release(2), _release(3)])
+    jobs = queue.claim(2)
+    assert [job.release for job in jobs] == [_release(1), _release(2)]
+    # Leased jobs aren't handed out again, nor requeued.
+    assert [job.release.id for job in queue.claim(10)] == [3]
+    assert queue.claim(10) == []
+    assert queue.put_many([_release(1)]) == 0
+
+
+def test_expired_lease_is_claimed_again(queue: da_workqueue.SqliteWorkQueue):
+    queue.put_many([_release(1)])
+    [job] = queue.claim(1, lease_seconds=0)
+    assert queue.claim(1) == [job]
+
+
+def test_complete_and_collect(queue: da_workqueue.SqliteWorkQueue):
+    queue.put_many([_release(1), _release(2)])
+    first, _second = queue.claim(2)
+    queue.complete(first.id, {"changed": True})
+    assert queue.collect() == [(1, {"changed": True})]
+    assert queue.collect() == []
+    # A completed release can be queued again.
+    assert queue.put_many([_release(1)]) == 1
+
+
+def test_queue_is_shared_between_connections(tmp_path: Path):
+    a = da_workqueue.SqliteWorkQueue(tmp_path / "queue.db")
+    b = da_workqueue.SqliteWorkQueue(tmp_path / "queue.db")
+    try:
+        a.put_many([_release(1)])
+        assert len(b.claim(1)) == 1
+        assert a.claim(1) == []
+    finally:
+        a.close()
+        b.close()
+
+
+# -- open_work_queue ----------------------------------------------------------
+
+
+def test_open_work_queue_accepts_sqlite_urls_and_paths(tmp_path: Path):
+    for url in (f"sqlite:///{tmp_path / 'a.db'}", str(tmp_path / "a.db")):
+        queue = da_workqueue.open_work_queue(url)
+        assert isinstance(queue, da_workqueue.SqliteWorkQueue)
+        assert queue.path == tmp_path / "a.db"
+        queue.close()
+
+
+def test_open_work_queue_rejects_unknown_scheme():
+    with pytest.raises(ValueError, match="Unknown work queue"):
+        da_workqueue.open_work_queue("redis://localhost/0")
+
+
+# -- coordinate ---------------------------------------------------------------
+
+
+def test_coordinate_without_scheduler_queues_the_whole_wantlist(queue: da_workqueue.SqliteWorkQueue):
+    assert da_workqueue.coordinate(queue, [_release(1), _release(2)], None) == 2
+    assert da_workqueue.coordinate(queue, [_release(1), _release(2)], None) == 0
+
+
+def test_coordinate_reschedules_from_worker_observations(queue: da_workqueue.SqliteWorkQueue):
+    now = [0.0]
+    scheduler = da_scheduler.ReleaseScheduler(min_interval=60, max_interval=3600, clock=lambda: now[0])
+    wantlist = [_release(1), _release(2)]
+    assert da_workqueue.coordinate(queue, wantlist, scheduler) == 2
+
+    observations = da_workqueue.Observations()
+    observations.observe_stats(1, num_for_sale=0, price_ratio=None)
+    observations.observe_stats(2, num_for_sale=80, price_ratio=None)
+    observations.observe_listings(2, changed=True)
+    for job in queue.claim(2):
+        queue.complete(job.id, observations.pop(job.release.id))
+    assert observations.pop(1) == {}
+
+    da_workqueue.coordinate(queue, wantlist, scheduler)
+    assert scheduler.interval(2) < scheduler.interval(1)
+    now[0] = scheduler.interval(2) + 1
+    # Only the busy release is due again.
+    assert da_workqueue.coordinate(queue, wantlist, scheduler) == 1
+    assert [job.release.id for job in queue.claim(10)] == [2]
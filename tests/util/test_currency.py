@@ -1,11 +1,14 @@
+import asyncio
 import json
+from datetime import date
 from typing import Optional
 from unittest.mock import MagicMock
 
+import httpx
 import pytest
 import requests
 
-from discogs_alert.util import constants as dac, currency as da_currency
+from discogs_alert.util import constants as dac, currency as da_currency, rates_store as da_rates_store
 
 
 @pytest.fixture(autouse=True)
@@ -21,7 +24,10 @@ def _isolate_caches(monkeypatch: pytest.MonkeyPatch, tmp_path):
     if hasattr(da_currency.get_currency_rates, "cache_clear"):
         da_currency.get_currency_rates.cache_clear()
     monkeypatch.setattr(da_currency, "CACHE_DIR", tmp_path / "currency_cache")
+    monkeypatch.setattr(da_currency, "_stores", {})
     yield
+    for store in da_currency._stores.values():
+        store.close()
     if hasattr(da_currency.get_currency_rates, "cache_clear"):
         da_currency.get_currency_rates.cache_clear()
 
@@ -83,18 +89,15 @@ def test_get_currency_rates_calls_frankfurter(monkeypatch: pytest.MonkeyPatch):
 def test_get_currency_rates_writes_disk_cache(monkeypatch: pytest.MonkeyPatch):
     monkeypatch.setattr(requests, "get", _fake_response(200, {"base": "EUR", "rates": {"USD": 1.1}}))
     da_currency.get_currency_rates("EUR")
-    cache_file = da_currency._disk_cache_path("EUR")
-    assert cache_file.exists()
-    cached = json.load(cache_file.open("r"))
-    assert cached["USD"] == 1.1
+    store = da_rates_store.RatesStore(da_currency.CACHE_DIR / da_currency.RATES_STORE_FILE, "EUR")
+    assert store.get(date.today()) == {"USD": 1.1, "EUR": 1.0}
+    store.close()
 
 
 def test_get_currency_rates_uses_disk_cache(monkeypatch: pytest.MonkeyPatch):
-    """If the disk cache exists, we should not touch the network."""
+    """If the disk cache has this week's rates, we should not touch the network."""
 
-    cache_file = da_currency._disk_cache_path("EUR")
-    cache_file.parent.mkdir(parents=True, exist_ok=True)
-    json.dump({"USD": 9.99, "EUR": 1.0}, cache_file.open("w"))
+    da_currency._rates_store().put({"USD": 9.99}, date.today())
 
     def boom(*_a, **_kw):
         raise AssertionError("Frankfurter must not be called when disk cache is present")
@@ -128,10 +131,8 @@ def test_falls_back_to_stale_cache_on_network_error(monkeypatch: pytest.MonkeyPa
     short upstream outages.
     """
 
-    # Seed an old-week cache file directly under CACHE_DIR.
-    da_currency.CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    stale = da_currency.CACHE_DIR / "1999-1-EUR.json"
-    json.dump({"USD": 1.05, "EUR": 1.0}, stale.open("w"))
+    # Seed an old week's rates directly.
+    da_currency._rates_store().put({"USD": 1.05}, date(1999, 1, 6))
 
     monkeypatch.setattr(requests, "get", _fake_response(raise_exc=requests.ConnectionError("nope")))
     rates = da_currency.get_currency_rates("EUR")
@@ -139,31 +140,23 @@ def test_falls_back_to_stale_cache_on_network_error(monkeypatch: pytest.MonkeyPa
 
 
 def test_falls_back_to_stale_cache_on_5xx(monkeypatch: pytest.MonkeyPatch):
-    da_currency.CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    stale = da_currency.CACHE_DIR / "1999-1-EUR.json"
-    json.dump({"USD": 1.07, "EUR": 1.0}, stale.open("w"))
+    da_currency._rates_store().put({"USD": 1.07}, date(1999, 1, 6))
 
     monkeypatch.setattr(requests, "get", _fake_response(503, {"error": "down"}))
     rates = da_currency.get_currency_rates("EUR")
     assert rates == {"USD": 1.07, "EUR": 1.0}
 
 
-def test_stale_cache_fallback_picks_newest(monkeypatch: pytest.MonkeyPatch, tmp_path):
-    """If multiple stale caches exist, the most recently modified one wins."""
+def test_stale_cache_fallback_picks_newest(monkeypatch: pytest.MonkeyPatch):
+    """If several stale weeks are stored, the most recent one wins."""
 
-    import os
-    da_currency.CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    older = da_currency.CACHE_DIR / "1999-1-EUR.json"
-    newer = da_currency.CACHE_DIR / "1999-2-EUR.json"
-    json.dump({"USD": 1.0}, older.open("w"))
-    json.dump({"USD": 2.0}, newer.open("w"))
-    # Force `older` to look older than `newer`.
-    os.utime(older, (1, 1))
-    os.utime(newer, (1000, 1000))
+    store = da_currency._rates_store()
+    store.put({"USD": 2.0}, date(1999, 1, 13))
+    store.put({"USD": 1.0}, date(1999, 1, 6))
 
     monkeypatch.setattr(requests, "get", _fake_response(raise_exc=requests.ConnectionError("nope")))
     rates = da_currency.get_currency_rates("EUR")
-    assert rates == {"USD": 2.0}
+    assert rates == {"USD": 2.0, "EUR": 1.0}
 
 
 def test_no_stale_cache_means_we_still_raise(monkeypatch: pytest.MonkeyPatch):
@@ -176,6 +169,44 @@ def test_no_stale_cache_means_we_still_raise(monkeypatch: pytest.MonkeyPatch):
         da_currency.get_currency_rates("EUR")
 
 
+def test_get_currency_rates_derives_every_base_from_one_fetch(monkeypatch: pytest.MonkeyPatch):
+    captured = []
+
+    def fake_get(url, params=None, timeout=None):
+        captured.append(params)
+        return _fake_response(200, {"base": "EUR", "rates": {"USD": 1.1, "GBP": 0.8}})()
+
+    monkeypatch.setattr(requests, "get", fake_get)
+    gbp = da_currency.get_currency_rates("GBP")
+    usd = da_currency.get_currency_rates("USD")
+    assert captured == [{"base": "EUR"}]
+    assert gbp == pytest.approx({"GBP": 1.0, "EUR": 1.25, "USD": 1.375})
+    assert usd["GBP"] == pytest.approx(0.8 / 1.1)
+    # Only the reference rates are cached on disk.
+    store = da_currency._rates_store()
+    assert (store.reference, store.get(date.today())["USD"]) == ("EUR", 1.1)
+
+
+def test_stale_fallback_derives_cross_rates(monkeypatch: pytest.MonkeyPatch):
+    da_currency._rates_store().put({"USD": 1.25, "GBP": 0.5}, date(1999, 1, 6))
+    monkeypatch.setattr(requests, "get", _fake_response(503, {"error": "down"}))
+    assert da_currency.get_currency_rates("GBP") == pytest.approx({"GBP": 1.0, "EUR": 2.0, "USD": 2.5})
+
+
+def test_cross_rates():
+    reference = {"EUR": 1.0, "USD": 1.25, "GBP": 0.5}
+    assert da_currency.cross_rates(reference, "EUR") == reference
+    assert da_currency.cross_rates(reference, "USD") == pytest.approx({"EUR": 0.8, "USD": 1.0, "GBP": 0.4})
+    with pytest.raises(da_currency.CurrencyProviderError):
+        da_currency.cross_rates(reference, "CHF")
+
+
+def test_convert_currency_between_two_non_reference_currencies(mock_currency_rates, rates):
+    assert da_currency.convert_currency(10, "GBP", "USD") == pytest.approx(10 * rates["USD"] / rates["GBP"])
+    with pytest.raises(da_currency.InvalidCurrencyException):
+        da_currency.convert_currency(1, "EUR", "DOOT")
+
+
 def test_convert_currency_uses_rates(mock_currency_rates, rates: da_currency.CurrencyRates):
     assert da_currency.convert_currency(1, "GBP", "EUR") == 1 / rates["GBP"]
     assert da_currency.convert_currency(1, "CHF", "EUR") == 1 / rates["CHF"]
@@ -196,6 +227,42 @@ def test_convert_currency_rejects_unknown_source(mock_currency_rates):
         da_currency.convert_currency(1, "DOOT", "EUR")
 
 
+def test_conversion_table_fetches_rates_once(monkeypatch: pytest.MonkeyPatch, rates: da_currency.CurrencyRates):
+    calls = []
+
+    def counting_rates(base):
+        calls.append(base)
+        return rates
+
+    monkeypatch.setattr(da_currency, "get_currency_rates", counting_rates)
+    table = da_currency.ConversionTable("EUR")
+    assert table.convert(7, "EUR") == 7
+    assert calls == []  # nothing to convert yet
+    assert table.convert(10, "GBP") == pytest.approx(da_currency.convert_currency(10, "GBP", "EUR"))
+    assert table.convert(10, "CHF") == pytest.approx(10 / rates["CHF"])
+    assert calls == ["EUR", "EUR"]  # once for the table, once for the comparison
+
+
+def test_conversion_table_remembers_provider_failure(monkeypatch: pytest.MonkeyPatch):
+    calls = []
+
+    def failing_rates(base):
+        calls.append(base)
+        raise da_currency.CurrencyProviderError("down")
+
+    monkeypatch.setattr(da_currency, "get_currency_rates", failing_rates)
+    table = da_currency.ConversionTable("EUR")
+    for _ in range(2):
+        with pytest.raises(da_currency.CurrencyProviderError):
+            table.convert(1, "GBP")
+    assert calls == ["EUR"]
+
+
+def test_conversion_table_rejects_unknown_source(mock_currency_rates):
+    with pytest.raises(da_currency.InvalidCurrencyException):
+        da_currency.ConversionTable("EUR").convert(1, "DOOT")
+
+
 def test_currency_choices_subset_of_fixture(rates: da_currency.CurrencyRates):
     """If Frankfurter drops a currency we use, this test forces us to update
     `CURRENCY_CHOICES` in lockstep with the fixture.
@@ -203,3 +270,127 @@ def test_currency_choices_subset_of_fixture(rates: da_currency.CurrencyRates):
 
     for code in dac.CURRENCY_CHOICES:
         assert code in rates, f"{code} is in CURRENCY_CHOICES but missing from the rates fixture"
+
+
+# -- RatesProvider ------------------------------------------------------------
+
+
+def _provider(handler, now: list) -> da_currency.RatesProvider:
+    """A `RatesProvider` on a fake clock whose Frankfurter requests go to `handler`."""
+
+    provider = da_currency.RatesProvider(ttl=100, refresh_ahead=10, clock=lambda: now[0])
+    provider._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return provider
+
+
+def _no_disk_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Every fetch goes to Frankfurter (the weekly disk cache would answer refreshes otherwise)."""
+
+    monkeypatch.setattr(da_currency, "_read_disk_cache", lambda: None)
+
+
+async def test_rates_provider_shares_one_fetch_between_concurrent_callers(monkeypatch: pytest.MonkeyPatch):
+    _no_disk_cache(monkeypatch)
+    requests_seen = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"rates": {"GBP": 0.85}})
+
+    async with _provider(handler, [0.0]) as provider:
+        results = await asyncio.gather(*(provider.get_rates("EUR") for _ in range(5)))
+    assert len(requests_seen) == 1
+    assert requests_seen[0].url.params["base"] == "EUR"
+    assert results == [{"GBP": 0.85, "EUR": 1.0}] * 5
+
+
+async def test_rates_provider_refreshes_in_background_before_expiry(monkeypatch: pytest.MonkeyPatch):
+    _no_disk_cache(monkeypatch)
+    gbp = iter([0.85, 0.9])
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"rates": {"GBP": next(gbp)}})
+
+    now = [0.0]
+    async with _provider(handler, now) as provider:
+        assert (await provider.get_rates("EUR"))["GBP"] == 0.85
+        now[0] = 50
+        assert (await provider.get_rates("EUR"))["GBP"] == 0.85  # still fresh, no fetch
+        now[0] = 95
+        # Nearly expired: the cached rates come back at once, and a refresh starts.
+        assert (await provider.get_rates("EUR"))["GBP"] == 0.85
+        await asyncio.sleep(0.01)
+        assert (await provider.get_rates("EUR"))["GBP"] == 0.9
+
+
+async def test_rates_provider_keeps_old_rates_when_refresh_fails(monkeypatch: pytest.MonkeyPatch):
+    _no_disk_cache(monkeypatch)
+
+    def no_stale_rates(exc):
+        raise da_currency.CurrencyProviderError("down") from exc
+
+    monkeypatch.setattr(da_currency, "_stale_rates_or_raise", no_stale_rates)
+    statuses = iter([200, 503, 200])
+    requests_seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        return httpx.Response(next(statuses), json={"rates": {"GBP": 0.85}})
+
+    now = [0.0]
+    async with _provider(handler, now) as provider:
+        await provider.get_rates("EUR")
+        now[0] = 200
+        assert (await provider.get_rates("EUR"))["GBP"] == 0.85
+        # The failure isn't retried straight away.
+        assert (await provider.get_rates("EUR"))["GBP"] == 0.85
+        assert len(requests_seen) == 2
+        now[0] += da_currency.RATES_RETRY_SECONDS
+        await provider.get_rates("EUR")
+        assert len(requests_seen) == 3
+
+
+async def test_rates_provider_fetches_once_for_every_base(monkeypatch: pytest.MonkeyPatch):
+    _no_disk_cache(monkeypatch)
+    requests_seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        return httpx.Response(200, json={"rates": {"GBP": 0.5, "USD": 1.25}})
+
+    async with _provider(handler, [0.0]) as provider:
+        gbp = await provider.get_rates("GBP")
+        assert await provider.get_rates("GBP") is gbp
+        usd = await provider.get_rates("USD")
+    assert [request.url.params["base"] for request in requests_seen] == ["EUR"]
+    assert gbp == pytest.approx({"GBP": 1.0, "EUR": 2.0, "USD": 2.5})
+    assert usd["GBP"] == pytest.approx(0.4)
+
+
+async def test_rates_provider_raises_without_any_rates(monkeypatch: pytest.MonkeyPatch):
+    _no_disk_cache(monkeypatch)
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    async with _provider(handler, [0.0]) as provider:
+        with pytest.raises(da_currency.CurrencyProviderError):
+            await provider.get_rates("EUR")
+        with pytest.raises(da_currency.InvalidCurrencyException):
+            await provider.get_rates("DOOT")
+
+
+async def test_conversion_table_loads_through_provider(monkeypatch: pytest.MonkeyPatch):
+    _no_disk_cache(monkeypatch)
+    monkeypatch.setattr(da_currency, "get_currency_rates", None)  # the blocking path isn't used
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"rates": {"GBP": 0.5}})
+
+    async with _provider(handler, [0.0]) as provider:
+        table = da_currency.ConversionTable("EUR", provider=provider)
+        await table.ensure_loaded(["EUR", None])
+        assert not table.loaded
+        await table.ensure_loaded(["EUR", "GBP"])
+        assert table.convert(10, "GBP") == 20
@@ -1,6 +1,8 @@
+import asyncio
+
 import pytest
 
-from discogs_alert.util.rate_limit import RateLimitGuard
+from discogs_alert.util.rate_limit import RateLimitGuard, TokenBucket
 
 
 def _guard(min_remaining=2, sleep_seconds=60):
@@ -94,3 +96,93 @@ def test_min_remaining_threshold_is_inclusive():
     guard.update_from_headers({"X-Discogs-Ratelimit-Remaining": "5"})
     guard.before_request()
     assert sleeps == [60]
+
+
+# -- TokenBucket ---------------------------------------------------------------
+
+
+class _FakeTime:
+    """Clock + async sleep pair where sleeping just advances the clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _bucket(rate_per_minute=60, burst=2, min_remaining=2):
+    fake = _FakeTime()
+    bucket = TokenBucket(
+        rate_per_minute, burst=burst, min_remaining=min_remaining, clock=fake.clock, sleep_fn=fake.sleep
+    )
+    return bucket, fake
+
+
+def test_token_bucket_validates_arguments():
+    with pytest.raises(ValueError):
+        TokenBucket(rate_per_minute=0)
+    with pytest.raises(ValueError):
+        TokenBucket(burst=0)
+    with pytest.raises(ValueError):
+        TokenBucket(min_remaining=-1)
+
+
+async def test_token_bucket_allows_a_burst_then_paces():
+    bucket, fake = _bucket(rate_per_minute=60, burst=2)
+    assert await bucket.acquire() == 0
+    assert await bucket.acquire() == 0
+    assert await bucket.acquire() == pytest.approx(1.0)
+    assert await bucket.acquire() == pytest.approx(1.0)
+
+
+async def test_token_bucket_spaces_concurrent_callers_evenly():
+    """Callers that arrive at the same instant get successive slots instead
+    of all waking together.
+    """
+
+    clock_now = 0.0
+    waits = []
+
+    async def record_sleep(seconds):
+        waits.append(seconds)
+
+    bucket = TokenBucket(30, burst=1, clock=lambda: clock_now, sleep_fn=record_sleep)
+    await asyncio.gather(*(bucket.acquire() for _ in range(4)))
+    assert waits == pytest.approx([2.0, 4.0, 6.0])
+
+
+async def test_token_bucket_refills_over_time():
+    bucket, fake = _bucket(rate_per_minute=60, burst=3)
+    for _ in range(3):
+        await bucket.acquire()
+    fake.now += 2
+    assert bucket.tokens == pytest.approx(2)
+    fake.now += 60
+    assert bucket.tokens == pytest.approx(3)  # capped at burst
+
+
+async def test_token_bucket_correct_drains_to_server_remaining():
+    bucket, fake = _bucket(rate_per_minute=60, burst=4, min_remaining=2)
+    bucket.correct(remaining=3)
+    assert bucket.tokens == pytest.approx(1)
+    await bucket.acquire()
+    assert await bucket.acquire() == pytest.approx(1.0)  # paced, not a minute-long stall
+
+
+def test_token_bucket_correct_ignores_higher_remaining_and_limit():
+    bucket, _ = _bucket(rate_per_minute=30, burst=2)
+    bucket.correct(limit=60, remaining=59)
+    assert bucket.rate_per_minute == 30
+    assert bucket.tokens == pytest.approx(2)
+
+
+def test_token_bucket_correct_lowers_rate_to_server_limit():
+    bucket, _ = _bucket(rate_per_minute=60)
+    bucket.correct(limit=25)
+    assert bucket.rate_per_minute == 25
@@ -0,0 +1,107 @@
+"""Tests for the memory-mapped weekly rates store."""
+
+import os
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from discogs_alert.util import rates_store as da_rates_store
+
+
+@pytest.fixture
+def store(tmp_path: Path):
+    s = da_rates_store.RatesStore(tmp_path / "rates.bin", "EUR")
+    yield s
+    s.close()
+
+
+def test_week_of_is_the_iso_monday():
+    assert da_rates_store.week_of(date(2026, 10, 17)) == date(2026, 10, 12)
+    assert da_rates_store.week_of(date(2026, 10, 12)) == date(2026, 10, 12)
+
+
+def test_reference_must_be_a_store_currency(tmp_path: Path):
+    with pytest.raises(ValueError):
+        da_rates_store.RatesStore(tmp_path / "rates.bin", "XXX")
+
+
+def test_empty_store_has_nothing(store: da_rates_store.RatesStore):
+    assert store.get(date(2026, 10, 17)) is None
+    assert store.latest() is None
+    assert store.weeks() == []
+
+
+def test_put_then_get_any_day_of_the_week(store: da_rates_store.RatesStore):
+    store.put({"USD": 1.1, "GBP": 0.85, "XXX": 3.0}, date(2026, 10, 14))
+    # Unknown currencies are dropped; the reference is always included.
+    assert store.get(date(2026, 10, 18)) == {"USD": 1.1, "GBP": 0.85, "EUR": 1.0}
+    assert store.get(date(2026, 10, 19)) is None
+
+
+def test_history_stays_queryable(store: da_rates_store.RatesStore):
+    store.put({"USD": 1.2}, date(2026, 10, 5))
+    store.put({"USD": 1.1}, date(2026, 10, 12))
+    store.put({"USD": 1.0}, date(2026, 9, 28))
+    assert store.weeks() == [date(2026, 9, 28), date(2026, 10, 5), date(2026, 10, 12)]
+    assert store.get(date(2026, 10, 5)) == {"USD": 1.2, "EUR": 1.0}
+    assert store.get(date(2026, 10, 12)) == {"USD": 1.1, "EUR": 1.0}
+    assert store.latest() == (date(2026, 10, 12), {"USD": 1.1, "EUR": 1.0})
+
+
+def test_put_overwrites_within_the_week(store: da_rates_store.RatesStore):
+    store.put({"USD": 1.1, "GBP": 0.85}, date(2026, 10, 12))
+    store.put({"USD": 1.2}, date(2026, 10, 13))
+    assert store.get(date(2026, 10, 12)) == {"USD": 1.2, "EUR": 1.0}
+
+
+def test_each_week_is_one_vector(store: da_rates_store.RatesStore):
+    store.put({"USD": 1.1}, date(2026, 10, 12))
+    size = store.path.stat().st_size
+    store.put({"USD": 1.2}, date(2026, 10, 12))
+    assert store.path.stat().st_size == size
+    store.put({"USD": 1.1}, date(2026, 10, 19))
+    assert store.path.stat().st_size == size + 8 + len(store.currencies) * 8
+
+
+def test_another_store_sees_writes(tmp_path: Path):
+    reader = da_rates_store.RatesStore(tmp_path / "rates.bin", "EUR")
+    writer = da_rates_store.RatesStore(tmp_path / "rates.bin", "EUR")
+    try:
+        assert reader.latest() is None
+        writer.put({"USD": 1.1}, date(2026, 10, 12))
+        assert reader.latest() == (date(2026, 10, 12), {"USD": 1.1, "EUR": 1.0})
+        writer.put({"USD": 1.2}, date(2026, 10, 19))
+        assert reader.get(date(2026, 10, 19)) == {"USD": 1.2, "EUR": 1.0}
+    finally:
+        reader.close()
+        writer.close()
+
+
+@pytest.mark.parametrize(
+    "old_reference, old_currencies", [("EUR", ["EUR", "USD"]), ("USD", da_rates_store.CURRENCY_CHOICES)]
+)
+def test_store_with_a_different_header_is_ignored(tmp_path: Path, old_reference, old_currencies):
+    old = da_rates_store.RatesStore(tmp_path / "rates.bin", old_reference, currencies=old_currencies)
+    old.put({"EUR": 0.9}, date(2026, 10, 12))
+    old.close()
+    store = da_rates_store.RatesStore(tmp_path / "rates.bin", "EUR")
+    try:
+        assert store.latest() is None
+        store.put({"USD": 1.2}, date(2026, 10, 12))
+        assert store.latest() == (date(2026, 10, 12), {"USD": 1.2, "EUR": 1.0})
+    finally:
+        store.close()
+
+
+def test_failed_write_leaves_the_store_intact(store: da_rates_store.RatesStore, monkeypatch: pytest.MonkeyPatch):
+    store.put({"USD": 1.1}, date(2026, 10, 12))
+
+    def failing_replace(*_args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        store.put({"USD": 1.2}, date(2026, 10, 19))
+    assert store.weeks() == [date(2026, 10, 12)]
+    assert list(store.path.parent.iterdir()) == [store.path]